@@ -1,41 +1,36 @@
 # actions.py
 import time
-import os
 import random
 import render
 import state
 import persistence
-
-# Skill point configuration for battles
-SKILL_POINT_START = 5
-SKILL_POINT_MAX = 8
-# costs per action (recover is special - it regenerates SP instead of costing)
-ACTION_COSTS = {
-    'execute': 1,
-    'defend': 2,
-    'hack': 2,
-    'debug': 2,
-    'recover': 0,
-}
+import idle
+import clicks
+import planner
+import production
+import battle_core
+import advisor
+import assets
+import encounter
+import effects
+import scheduler
+import tracing
+
+# how long the victory / death splash stays up before the game moves on
+WIN_SPLASH_DELAY = 2.0
+LOSE_SPLASH_DELAY = 3.0
+# auto-battle: advisor time per turn, and a cap so a stalemate cannot hang the game
+AUTO_TURN_BUDGET = 0.01
+MAX_AUTO_TURNS = 1000
 
 
 def on_space():
+    # ignore key auto-repeat while SPACE is held; every real press is counted and
+    # applied (and drawn) by the next logic tick (loops.tick)
     if state.space_pressed:
         return
     state.space_pressed = True
-    now = time.time()
-    min_interval = 1.0 / 15.0
-    if now - state.last_space_time < min_interval:
-        return
-    state.last_space_time = now
-    state.count += state.per_click
-    try:
-        if state.count > getattr(state, 'run_max_count', 0):
-            state.run_max_count = state.count
-    except Exception:
-        pass
-    if state.game_state == 'incremental':
-        render.display_incremental()
+    clicks.record_press()
 
 
 def on_space_release():
@@ -55,11 +50,32 @@ def load_game_from_menu():
         return
     if not persistence.has_save_file():
         return
-    persistence.load_game()
+    if not persistence.load_game():
+        # stay here (the start menu shows why): playing on would save defaults over the slot
+        render.display_start_menu()
+        return
     state.game_state = 'menu'
+    # the menu carries the welcome-back line for any offline earnings
     render.display_menu()
 
 
+def select_slot_from_menu(key: str):
+    """Start menu: number keys pick a save slot (load it, or start a new game there)."""
+    if state.game_state != 'start_menu':
+        return
+    try:
+        slot = int(key)
+    except ValueError:
+        return
+    if not 1 <= slot <= state.SAVE_SLOTS:
+        return
+    persistence.select_slot(slot)
+    if persistence.has_save_file():
+        load_game_from_menu()
+    else:
+        start_new_game()
+
+
 def buy_upgrade_key(key: str):
     if state.game_state != 'incremental':
         return
@@ -84,6 +100,28 @@ def buy_upgrade_key(key: str):
     render.display_incremental()
 
 
+def buy_generator(key: str):
+    if state.game_state != 'generators':
+        return
+    for i, gen in enumerate(state.idle_generators):
+        if gen['key'] == key:
+            # settle earnings at the old rate before the rate changes
+            idle.tick()
+            price = idle.generator_cost(gen)
+            n = 1
+            if state.buy_max_mode:
+                n = planner.max_affordable(price, state.IDLE_COST_GROWTH, state.count)
+            cost = planner.series_cost(price, state.IDLE_COST_GROWTH, n).floor()
+            if n <= 0 or state.count < cost:
+                return
+            state.count -= cost
+            gen['count'] = gen.get('count', 0) + n
+            production.update_count(i)
+            persistence.save_game()
+            break
+    render.display_generators()
+
+
 def buy_shop_item(key: str):
     if state.game_state != 'shop':
         return
@@ -102,30 +140,10 @@ def buy_shop_item(key: str):
                 'ascii': ''
             }
             if item['type'] == 'weapon':
-                ascii_path = os.path.join(os.path.dirname(__file__), 'ascii', 'dart_monkey_small.txt')
-                try:
-                    with open(ascii_path, 'r', encoding='utf-8') as af:
-                        item_obj['ascii'] = af.read().rstrip('\n')
-                except Exception:
-                    item_obj['ascii'] = (
-                        '  /|\\\n'
-                        ' /_|_\\\n'
-                        '   |\n'
-                        '   |\n'
-                    )
-            elif item['type'] == 'armour':
-                item_obj['ascii'] = (
-                    '  ___\n'
-                    ' /___\n'
-                    ' |   |\n'
-                    ' |___|\n'
-                )
-            elif item['type'] == 'bag':
-                item_obj['ascii'] = (
-                    '  ____\n'
-                    ' /___/\\\n'
-                    ' |___|\n'
-                )
+                # ascii/dart_monkey_small.txt when present, else the built-in sword
+                item_obj['ascii'] = assets.get('dart_monkey_small') or assets.get('weapon')
+            elif item['type'] in ('armour', 'bag'):
+                item_obj['ascii'] = assets.get(item['type'])
             if item['type'] == 'bag':
                 state.has_bag = True
                 state.inventory_capacity += item['amount'] * 10
@@ -150,13 +168,21 @@ def buy_action_upgrade(key: str):
             if state.count < upg['cost']:
                 render.flash_message('Not enough currency')
                 return
-            state.count -= upg['cost']
-            upg['level'] = upg.get('level', 0) + 1
+            n = 1
+            if state.buy_max_mode:
+                cap = upg.get('max_level', 1) - upg.get('level', 0)
+                n = planner.max_affordable(upg['cost'], planner.ACTION_COST_GROWTH, state.count, cap)
+            # at most max_level steps; prices are truncated per level so charge them exactly
+            for _ in range(n):
+                if state.count < upg['cost']:
+                    break
+                state.count -= upg['cost']
+                upg['level'] = upg.get('level', 0) + 1
+                # increase cost for next level (simple scaling)
+                upg['cost'] = int(upg['cost'] * planner.ACTION_COST_GROWTH)
             new_level = upg['level']
             bonus = new_level * upg.get('amount', 0)
             upg_name = upg.get('name', 'Upgrade')
-            # increase cost for next level (simple scaling)
-            upg['cost'] = int(upg['cost'] * 1.8)
             persistence.save_game()
             # show visual confirmation with new level and bonus applied
             render.flash_message(f'{upg_name} upgraded to Lv:{new_level}! Bonus: +{bonus}')
@@ -187,7 +213,7 @@ def equip_inventory_index(key: str):
             try:
                 atk = int(atk + int(acc.get('amount', 0)))
             except Exception:
-                pass
+                tracing.swallowed('actions.equip_inventory_index')
         state.attack = atk
         persistence.save_game()
         render.display_inventory()
@@ -240,7 +266,7 @@ def equip_inventory_index(key: str):
                     base_atk = int(state.compute_weapon_attack(lvl))
                     state.attack = base_atk + int(amount)
                 except Exception:
-                    pass
+                    tracing.swallowed('actions.equip_inventory_index')
         state.equipped_accessory = dict(item, equipped=True)
         persistence.save_game()
         render.display_inventory()
@@ -256,7 +282,7 @@ def equip_inventory_index(key: str):
         try:
             del state.inventory[idx]
         except Exception:
-            pass
+            tracing.swallowed('actions.equip_inventory_index')
         persistence.save_game()
         render.display_inventory()
 
@@ -398,7 +424,7 @@ def trigger_exclaim(pos):
             if state.count > getattr(state, 'run_max_count', 0):
                 state.run_max_count = state.count
         except Exception:
-            pass
+            tracing.swallowed('actions.trigger_exclaim')
         persistence.save_game()
         render.flash_message(f'Treasure found! +{reward} coins')
         if state.game_state == 'explore':
@@ -411,7 +437,7 @@ def trigger_exclaim(pos):
             'hp': 100 + visits * 12,
             'atk': 6 + visits,
             'reward': int(150 * (1 + 0.2 * visits)),
-            'ascii': "(>_<)"
+            'ascii': assets.get('ambusher')
         }
     else:
         enemy = {
@@ -419,7 +445,7 @@ def trigger_exclaim(pos):
             'hp': 140 + visits * 18,
             'atk': 10 + visits * 2,
             'reward': int(300 * (1 + 0.2 * visits)),
-            'ascii': "(~)"
+            'ascii': assets.get('angry_monkey')
         }
     state.enemies[(y, x)] = enemy
     enter_battle((y, x))
@@ -440,7 +466,13 @@ def trigger_healing(pos):
         if state.game_state == 'explore':
             render.render_map()
         return
+    fountain = (state.current_room_index, y, x)
+    if fountain in state.fountain_cooldowns:
+        render.flash_message('The fountain is recharging...')
+        return
     state.player_hp = min(state.player_max_hp, state.player_hp + heal)
+    state.fountain_cooldowns.add(fountain)
+    scheduler.after(state.FOUNTAIN_COOLDOWN, state.fountain_cooldowns.discard, fountain)
     render.flash_message(f'Healed +{heal} HP')
     if state.game_state == 'explore':
         render.render_map()
@@ -520,26 +552,35 @@ def enter_battle(pos):
     enemy = state.enemies.get(pos)
     if not enemy:
         return
+    # the battle screen's log starts empty
+    state.message_log = []
     state.current_battle_enemy = dict(enemy)
+    state.current_battle_enemy.setdefault('max_hp', enemy.get('hp', 1))
     state.current_battle_pos = pos
+    # at deep floors nearby enemies join in
+    pack = encounter.gather_pack(state.enemies, pos, state.map_visit_count)
+    state.current_encounter = None
+    if len(pack) > 1:
+        state.current_encounter = encounter.Encounter(
+            [state.enemies[p] for p in pack], pack, getattr(state, 'player_speed', encounter.DEFAULT_SPEED))
+        state.current_battle_enemy = state.current_encounter.target_view()
     # initialize per-battle transient status (shield, buffs, debuffs, skill points)
-    base_sp = 5
-    try:
-        base_sp += int(state.map_visit_count // 2)
-    except Exception:
-        pass
-    state.current_battle_status = {
-        'player_shield': 0,
-        'player_buff': 0,
-        'enemy_debuff': 0,
-        'skill_points': base_sp,
-        'skill_points_max': SKILL_POINT_MAX,
-        # stun status applied by certain enemies (e.g., Teto)
-        'player_stunned': False,
-        'stun_duration': 0,
-    }
+    state.current_battle_status = battle_core.new_status(state.map_visit_count)
+    start_log = []
+    player = _battle_player()
+    if state.current_encounter is None:
+        effects.on_start(player, state.current_battle_enemy, state.current_battle_status, start_log)
+    else:
+        state.current_encounter.start(player, state.current_battle_status, start_log)
+    state.player_hp = player['hp']
+    for msg in start_log:
+        render.flash_message(msg)
     state.game_state = 'battle'
-    render.display_battle()
+    if state.auto_battle:
+        # draws the outcome itself
+        auto_battle()
+    else:
+        render.display_battle()
 
 
 def battle_attack():
@@ -555,11 +596,11 @@ def battle_attack():
             if state.count > getattr(state, 'run_max_count', 0):
                 state.run_max_count = state.count
         except Exception:
-            pass
+            tracing.swallowed('actions.battle_attack')
         try:
             del state.enemies[state.current_battle_pos]
         except Exception:
-            pass
+            tracing.swallowed('actions.battle_attack')
         state.current_battle_enemy = None
         state.current_battle_pos = None
         state.game_state = 'explore'
@@ -569,42 +610,40 @@ def battle_attack():
         return
     state.player_hp -= enemy.get('atk', 0)
     if state.player_hp <= 0:
-        render.display_death_splash()
-        time.sleep(3)
-        try:
-            run_best = int(getattr(state, 'run_max_count', 0))
-        except Exception:
-            run_best = 0
-        meta_reward = max(1, run_best // 1000)
-        state.meta_currency = getattr(state, 'meta_currency', 0) + meta_reward
-        persistence.save_game()
-        state.game_state = 'meta'
-        render.display_meta_upgrades(meta_reward)
+        _battle_lose()
         return
     render.display_battle()
     
 def _battle_win():
     enemy = state.current_battle_enemy or {}
     reward = enemy.get('reward', 0)
+    pack = state.current_encounter
+    if pack:
+        reward = pack.total_reward()
+        enemy = next((t for t in pack.templates if t.get('is_boss')), enemy)
     state.count += reward
-    # show victory splash with earned resources
+    # show victory splash with earned resources; the map comes back when it times out
+    state.game_state = 'transition'
     try:
         render.display_victory_splash(reward)
-        time.sleep(2)
     except Exception:
-        pass
+        tracing.swallowed('actions._battle_win')
     try:
         if state.count > getattr(state, 'run_max_count', 0):
             state.run_max_count = state.count
     except Exception:
-        pass
-    try:
-        del state.enemies[state.current_battle_pos]
-    except Exception:
-        pass
+        tracing.swallowed('actions._battle_win')
+    for pos in (pack.positions if pack else [state.current_battle_pos]):
+        try:
+            cleared = state.enemies.pop(pos)
+        except KeyError:
+            continue
+        if not cleared.get('is_boss'):
+            scheduler.after(state.RESPAWN_DELAY, _respawn, state.rooms, state.current_room_index, pos, cleared)
     state.current_battle_enemy = None
     state.current_battle_pos = None
     state.current_battle_status = {}
+    state.current_encounter = None
     # if this was a boss, move to the last room of the current floor (room 5 out of 5)
     # and prepare for the next floor on the next room transition
     try:
@@ -615,35 +654,56 @@ def _battle_win():
             # upgrade shop contents for deeper floors (append stronger items once)
             try:
                 existing_names = {i.get('name') for i in state.shop_items}
-                high_items = [
-                    {'key': '9', 'name': 'Greater Sword', 'cost': 800, 'type': 'weapon', 'amount': 20, 'purchased': False},
-                    {'key': '10', 'name': 'Elite Armour', 'cost': 700, 'type': 'armour', 'amount': 20, 'purchased': False},
-                    {'key': '11', 'name': 'Mega Potion', 'cost': 450, 'type': 'consumable', 'subtype': 'heal', 'amount': 400, 'purchased': False},
-                ]
-                for it in high_items:
+                for it in state.late_shop_items:
                     if it['name'] not in existing_names:
-                        state.shop_items.append(it)
+                        state.shop_items.append(dict(it))
             except Exception:
-                pass
+                tracing.swallowed('actions._battle_win')
             # increase the ceiling on action upgrades so players can progress further
             try:
                 for a in getattr(state, 'action_upgrades', []):
                     a['max_level'] = int(a.get('max_level', 1)) + 1
             except Exception:
-                pass
+                tracing.swallowed('actions._battle_win')
     except Exception:
-        pass
+        tracing.swallowed('actions._battle_win')
+    persistence.save_game()
+    scheduler.after(WIN_SPLASH_DELAY, _leave_victory_splash)
+
+
+def _leave_victory_splash():
+    if state.game_state != 'transition':
+        return
     state.game_state = 'explore'
     render.clear_screen()
     render.render_map()
-    persistence.save_game()
-    
+
+
+def _respawn(rooms, room_index, pos, enemy):
+    """Put a defeated enemy back, at full health, unless the floor has changed since."""
+    if state.rooms is not rooms:
+        return
+    enemy = dict(enemy, hp=enemy.get('max_hp', enemy.get('hp', 1)))
+    if room_index == state.current_room_index:
+        if pos in state.enemies or pos == (state.player_y, state.player_x):
+            return
+        state.enemies[pos] = enemy
+        if state.game_state == 'explore':
+            render.render_map()
+    else:
+        try:
+            rooms[room_index].setdefault('enemies', {}).setdefault(pos, enemy)
+        except Exception:
+            tracing.swallowed('actions._respawn')
+
+
 def _battle_lose():
+    state.game_state = 'transition'
     render.display_death_splash()
-    time.sleep(3)
     try:
         run_best = int(getattr(state, 'run_max_count', 0))
     except Exception:
+        tracing.swallowed('actions._battle_lose')
         run_best = 0
     meta_reward = max(1, run_best // 1000)
     state.meta_currency = getattr(state, 'meta_currency', 0) + meta_reward
@@ -651,212 +711,121 @@ def _battle_lose():
     state.current_battle_enemy = None
     state.current_battle_pos = None
     state.current_battle_status = {}
+    state.current_encounter = None
+    scheduler.after(LOSE_SPLASH_DELAY, _leave_death_splash, meta_reward)
+
+
+def _leave_death_splash(meta_reward):
+    if state.game_state != 'transition':
+        return
     state.game_state = 'meta'
     render.display_meta_upgrades(meta_reward)
     
-def _enemy_retaliate(enemy):
-    # compute enemy attack after debuff
-    atk = max(0, enemy.get('atk', 0) - state.current_battle_status.get('enemy_debuff', 0))
-    # compute block from defence and shield
-    shield = state.current_battle_status.get('player_shield', 0)
-    defense = getattr(state, 'defense', 0)
-    damage = max(0, atk - (defense + shield))
-    # consume shield
-    state.current_battle_status['player_shield'] = max(0, shield - max(0, atk - defense))
-    if damage > 0:
-        state.player_hp -= damage
-    # enemy may have special effects (e.g., Teto stun)
-    try:
-        special = enemy.get('special')
-    except Exception:
-        special = None
-    if special and isinstance(special, dict):
-        if special.get('type') == 'stun':
-            try:
-                import random as _random
-                if _random.random() < float(special.get('chance', 0)):
-                    # apply stun: mark player stunned for duration turns
-                    dur = int(special.get('duration', 1))
-                    state.current_battle_status['player_stunned'] = True
-                    state.current_battle_status['stun_duration'] = dur
-                    render.flash_message(f"{enemy.get('name','Enemy')} stunned you for {dur} turn(s)!")
-            except Exception:
-                pass
-    # check death
-    if state.player_hp <= 0:
-        _battle_lose()
-        return False
-    return True
-    
-def _get_action_upgrade_bonus(action_id: str) -> int:
-    """Return the cumulative bonus amount for an action upgrade id."""
-    try:
-        total = 0
-        for upg in getattr(state, 'action_upgrades', []):
-            if upg.get('id') == action_id:
-                total += int(upg.get('level', 0)) * int(upg.get('amount', 0))
-        return total
-    except Exception:
-        return 0
+def _battle_player():
+    """The player's side of a battle as battle_core expects it."""
+    return {'hp': state.player_hp, 'max_hp': getattr(state, 'player_max_hp', state.player_hp),
+            'attack': state.attack, 'defense': getattr(state, 'defense', 0)}
+
+
+def _resolve(player, action, bonuses):
+    """One turn against the current enemy or pack."""
+    pack = state.current_encounter
+    if pack is None:
+        return battle_core.resolve_turn(player, state.current_battle_enemy, state.current_battle_status,
+                                        action, bonuses, state.map_visit_count, random)
+    result = pack.player_turn(player, state.current_battle_status, action, bonuses, state.map_visit_count, random)
+    if pack.alive:
+        state.current_battle_enemy = pack.target_view()
+    return result
+
+
+def next_target():
+    """In a pack fight, aim the next actions at the next living enemy."""
+    pack = state.current_encounter
+    if state.game_state != 'battle' or pack is None:
+        return
+    if pack.next_target():
+        state.current_battle_enemy = pack.target_view()
+    render.display_battle()
 
-def execute_code():
-    """Red: direct attack (resourceless)."""
+
+def _player_turn(action: str):
+    """Run one battle action through battle_core and show the outcome."""
     if state.game_state != 'battle' or not state.current_battle_enemy:
         return
-    # if stunned, player cannot perform this action (but enemy still retaliates)
-    if state.current_battle_status.get('player_stunned', False):
-        # consume one stun turn
-        state.current_battle_status['stun_duration'] = state.current_battle_status.get('stun_duration', 0) - 1
-        if state.current_battle_status['stun_duration'] <= 0:
-            state.current_battle_status['player_stunned'] = False
-            state.current_battle_status['stun_duration'] = 0
-        render.flash_message('You are stunned and cannot act this turn!')
-        alive = _enemy_retaliate(state.current_battle_enemy)
-        if alive:
-            render.display_battle()
-        return
-    cost = 1
-    sp = state.current_battle_status.get('skill_points', 0)
-    if sp < cost:
-        render.flash_message('Not enough Skill Points')
-        return
-    state.current_battle_status['skill_points'] = sp - cost
-    enemy = state.current_battle_enemy
-    # base damage from weapon/attack plus player buff and execute upgrades
-    base = int(state.attack + state.current_battle_status.get('player_buff', 0))
-    bonus = _get_action_upgrade_bonus('execute_power')
-    damage = max(1, int(base + bonus))
-    enemy['hp'] -= damage
-    render.flash_message(f'Execute Code deals {damage} damage (-{cost} SP)')
-    if enemy['hp'] <= 0:
+    player = _battle_player()
+    result, log = _resolve(player, action, battle_core.upgrade_bonuses(getattr(state, 'action_upgrades', [])))
+    state.player_hp = player['hp']
+    for msg in log:
+        render.flash_message(msg)
+    if result == battle_core.WIN:
         _battle_win()
-        return
-    # enemy retaliates
-    alive = _enemy_retaliate(enemy)
-    if alive:
+    elif result == battle_core.LOSE:
+        _battle_lose()
+    elif result == battle_core.CONTINUE:
         render.display_battle()
 
-def defend_code():
-    """Blue: gain a temporary shield that blocks incoming damage."""
+
+def auto_battle():
+    """Let the advisor play the current fight to the end, drawing only the outcome."""
     if state.game_state != 'battle' or not state.current_battle_enemy:
         return
-    # if stunned, player cannot perform this action (but enemy still retaliates)
-    if state.current_battle_status.get('player_stunned', False):
-        state.current_battle_status['stun_duration'] = state.current_battle_status.get('stun_duration', 0) - 1
-        if state.current_battle_status['stun_duration'] <= 0:
-            state.current_battle_status['player_stunned'] = False
-            state.current_battle_status['stun_duration'] = 0
-        render.flash_message('You are stunned and cannot act this turn!')
-        alive = _enemy_retaliate(state.current_battle_enemy)
-        if alive:
-            render.display_battle()
-        return
-    cost = 2
-    sp = state.current_battle_status.get('skill_points', 0)
-    if sp < cost:
-        render.flash_message('Not enough Skill Points')
-        return
-    state.current_battle_status['skill_points'] = sp - cost
-    # shield scales with player's defense stat plus defend upgrades
-    base = 8
-    shield_amount = base + int(getattr(state, 'defense', 0) * 0.5)
-    shield_amount += _get_action_upgrade_bonus('defend_power')
-    state.current_battle_status['player_shield'] = state.current_battle_status.get('player_shield', 0) + shield_amount
-    render.flash_message(f'Defend Code grants {shield_amount} shield (-{cost} SP)')
-    # enemy retaliates (shield will absorb)
-    alive = _enemy_retaliate(state.current_battle_enemy)
-    if alive:
+    player = _battle_player()
+    status = state.current_battle_status
+    bonuses = battle_core.upgrade_bonuses(getattr(state, 'action_upgrades', []))
+    player_max = getattr(state, 'player_max_hp', player['hp'])
+    result = battle_core.CONTINUE
+    turns = 0
+    while result == battle_core.CONTINUE and turns < MAX_AUTO_TURNS:
+        enemy = state.current_battle_enemy
+        if state.current_encounter is not None:
+            # the advisor plans one-on-one: fold the whole pack's attack into the target
+            enemy = dict(enemy, atk=round(state.current_encounter.pressure()))
+        action = advisor.best_action(player, enemy, status, bonuses, state.map_visit_count,
+                                     AUTO_TURN_BUDGET, player_max)
+        result, _ = _resolve(player, action, bonuses)
+        turns += 1
+    state.player_hp = player['hp']
+    # settle the fight before drawing anything
+    if result == battle_core.WIN:
+        _battle_win()
+    elif result == battle_core.LOSE:
+        _battle_lose()
+    else:
         render.display_battle()
+    render.flash_message(f'Auto-battle: {turns} turn(s)')
+
+
+def toggle_auto_battle():
+    state.auto_battle = not state.auto_battle
+    if state.auto_battle and state.game_state == 'battle':
+        auto_battle()
+    render.flash_message('Auto-battle: ON' if state.auto_battle else 'Auto-battle: OFF')
+
+
+def execute_code():
+    """Red: direct attack."""
+    _player_turn('execute')
+
+
+def defend_code():
+    """Blue: gain a temporary shield that blocks incoming damage."""
+    _player_turn('defend')
+
 
 def recover():
-    """White: heal the player."""
-    if state.game_state != 'battle' or not state.current_battle_enemy:
-        return
-    # Recover: regenerate skill points (does not heal HP)
-    sp = state.current_battle_status.get('skill_points', 0)
-    sp_max = state.current_battle_status.get('skill_points_max', sp)
-    regen = 3 + _get_action_upgrade_bonus('recover_power')
-    new_sp = min(sp_max, sp + regen)
-    gained = new_sp - sp
-    if gained <= 0:
-        render.flash_message('Skill Points already full')
-        return
-    state.current_battle_status['skill_points'] = new_sp
-    render.flash_message(f'Recover restores {gained} SP (+{gained} SP)')
-    # if player was stunned, this counts as the allowed action and reduces stun duration
-    if state.current_battle_status.get('player_stunned', False):
-        state.current_battle_status['stun_duration'] = state.current_battle_status.get('stun_duration', 0) - 1
-        if state.current_battle_status['stun_duration'] <= 0:
-            state.current_battle_status['player_stunned'] = False
-            state.current_battle_status['stun_duration'] = 0
-    # enemy retaliates
-    alive = _enemy_retaliate(state.current_battle_enemy)
-    if alive:
-        render.display_battle()
+    """White: regenerate skill points."""
+    _player_turn('recover')
+
 
 def hack():
     """Black: debuff enemy attack (reduce enemy atk for the fight)."""
-    if state.game_state != 'battle' or not state.current_battle_enemy:
-        return
-    # if stunned, player cannot perform this action (but enemy still retaliates)
-    if state.current_battle_status.get('player_stunned', False):
-        state.current_battle_status['stun_duration'] = state.current_battle_status.get('stun_duration', 0) - 1
-        if state.current_battle_status['stun_duration'] <= 0:
-            state.current_battle_status['player_stunned'] = False
-            state.current_battle_status['stun_duration'] = 0
-        render.flash_message('You are stunned and cannot act this turn!')
-        alive = _enemy_retaliate(state.current_battle_enemy)
-        if alive:
-            render.display_battle()
-        return
-    cost = 2
-    sp = state.current_battle_status.get('skill_points', 0)
-    if sp < cost:
-        render.flash_message('Not enough Skill Points')
-        return
-    state.current_battle_status['skill_points'] = sp - cost
-    reduce_amount = 3 + int(state.map_visit_count * 0.5) + _get_action_upgrade_bonus('hack_power')
-    # apply debuff but cap the total enemy_debuff to 10
-    prev = state.current_battle_status.get('enemy_debuff', 0)
-    new_debuff = prev + reduce_amount
-    DEBUFF_CAP = 10
-    if new_debuff > DEBUFF_CAP:
-        new_debuff = DEBUFF_CAP
-    state.current_battle_status['enemy_debuff'] = new_debuff
-    render.flash_message(f'Hack reduces enemy attack by {reduce_amount} (total debuff {new_debuff}/{DEBUFF_CAP}) (-{cost} SP)')
-    # enemy retaliates with reduced attack
-    alive = _enemy_retaliate(state.current_battle_enemy)
-    if alive:
-        render.display_battle()
+    _player_turn('hack')
+
 
 def debug_action():
     """Green: buff player's attack for the fight."""
-    if state.game_state != 'battle' or not state.current_battle_enemy:
-        return
-    # if stunned, player cannot perform this action (but enemy still retaliates)
-    if state.current_battle_status.get('player_stunned', False):
-        state.current_battle_status['stun_duration'] = state.current_battle_status.get('stun_duration', 0) - 1
-        if state.current_battle_status['stun_duration'] <= 0:
-            state.current_battle_status['player_stunned'] = False
-            state.current_battle_status['stun_duration'] = 0
-        render.flash_message('You are stunned and cannot act this turn!')
-        alive = _enemy_retaliate(state.current_battle_enemy)
-        if alive:
-            render.display_battle()
-        return
-    cost = 2
-    sp = state.current_battle_status.get('skill_points', 0)
-    if sp < cost:
-        render.flash_message('Not enough Skill Points')
-        return
-    state.current_battle_status['skill_points'] = sp - cost
-    buff = max(1, int(state.attack * 0.4)) + _get_action_upgrade_bonus('debug_power')
-    state.current_battle_status['player_buff'] = state.current_battle_status.get('player_buff', 0) + buff
-    render.flash_message(f'Debug increases your attack by {buff} (-{cost} SP)')
-    # enemy retaliates
-    alive = _enemy_retaliate(state.current_battle_enemy)
-    if alive:
-        render.display_battle()
+    _player_turn('debug')
 
 def flee_battle():
     if state.game_state != 'battle':
@@ -866,13 +835,25 @@ def flee_battle():
         state.player_x = px
         state.player_y = py
     except Exception:
-        pass
+        tracing.swallowed('actions.flee_battle')
     state.current_battle_enemy = None
     state.current_battle_pos = None
+    state.current_encounter = None
     state.game_state = 'explore'
     render.clear_screen()
     render.render_map()
 
+def toggle_buy_max():
+    if state.game_state not in ('generators', 'action_upgrade'):
+        return
+    state.buy_max_mode = not state.buy_max_mode
+    # both screens show the mode on their "Buy max" line
+    if state.game_state == 'generators':
+        render.display_generators()
+    else:
+        render.display_action_upgrades()
+
+
 def handle_number_key(key: str):
     # Battle context: numeric keys map to combat action types
     if state.game_state == 'battle':
@@ -888,10 +869,7 @@ def handle_number_key(key: str):
             debug_action()
         return
     if state.game_state == 'start_menu':
-        if key == '1':
-            start_new_game()
-        elif key == '2':
-            load_game_from_menu()
+        select_slot_from_menu(key)
         return
     if state.game_state == 'inventory':
         equip_inventory_index(key)
@@ -908,3 +886,6 @@ def handle_number_key(key: str):
     if state.game_state == 'action_upgrade':
         buy_action_upgrade(key)
         return
+    if state.game_state == 'generators':
+        buy_generator(key)
+        return
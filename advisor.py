@@ -0,0 +1,187 @@
+# advisor.py
+# Battle action advisor: depth-limited expectimax over battle_core, deepened iteratively
+# until the per-turn time budget runs out. Player moves are max nodes; the enemy's
+# specials (effects.py) are the only chance event, modelled as two branches: nothing
+# procs, or everything does with the chance that anything would. Evaluated positions
+# are memoised in a transposition table keyed by the full battle state, so repeated
+# positions across branches (and across turns of the same fight) are scored once.
+import time
+import battle_core
+import effects
+
+# seconds allowed per decision
+TURN_BUDGET = 0.05
+MAX_DEPTH = 12
+# later outcomes are worth slightly less, so quicker wins and later losses are preferred
+DISCOUNT = 0.98
+WIN_SCORE = 10000.0
+LOSE_SCORE = -10000.0
+# cleared when it grows past this many entries
+TABLE_LIMIT = 500000
+
+_table = {}
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _FixedRng:
+    """Stands in for random.Random: always rolls `roll` and notes whether it was asked."""
+    __slots__ = ('roll', 'used')
+
+    def __init__(self, roll):
+        self.roll = roll
+        self.used = False
+
+    def random(self):
+        self.used = True
+        return self.roll
+
+
+def _unpack(node, ctx):
+    p_hp, e_hp, shield, buff, debuff, sp, stunned, stun_dur = node
+    player = {'hp': p_hp, 'attack': ctx['attack'], 'defense': ctx['defense']}
+    enemy = {'hp': e_hp, 'atk': ctx['enemy_atk'], 'specials': ctx['specials'], 'max_hp': ctx['enemy_max']}
+    status = {'player_shield': shield, 'player_buff': buff, 'enemy_debuff': debuff,
+              'skill_points': sp, 'skill_points_max': ctx['sp_max'],
+              'player_stunned': stunned, 'stun_duration': stun_dur}
+    return player, enemy, status
+
+
+def _pack(player, enemy, status):
+    return (player['hp'], enemy['hp'], status.get('player_shield', 0), status.get('player_buff', 0),
+            status.get('enemy_debuff', 0), status.get('skill_points', 0),
+            bool(status.get('player_stunned', False)), status.get('stun_duration', 0))
+
+
+def _outcomes(node, action, ctx):
+    """[(probability, result, next node)] for taking `action` in `node`."""
+    chance = ctx['proc_chance']
+    player, enemy, status = _unpack(node, ctx)
+    rng = _FixedRng(1.0)
+    result, _ = battle_core.resolve_turn(player, enemy, status, action, ctx['bonuses'], ctx['visits'], rng, [])
+    if result == battle_core.INVALID:
+        return []
+    no_proc = (result, _pack(player, enemy, status))
+    if not rng.used or chance <= 0:
+        return [(1.0, ) + no_proc]
+    player, enemy, status = _unpack(node, ctx)
+    result, _ = battle_core.resolve_turn(player, enemy, status, action, ctx['bonuses'], ctx['visits'], _FixedRng(0.0), [])
+    return [(1.0 - chance, ) + no_proc, (chance, result, _pack(player, enemy, status))]
+
+
+def _evaluate(node, ctx):
+    """Heuristic for non-terminal leaves: who wins the damage race from here.
+
+    Assumes the player keeps executing (recovering when out of SP) and the enemy keeps
+    hitting at its current debuffed attack, then scores the margin between the turns
+    the player needs and the turns it can survive, plus a little for HP left.
+    """
+    p_hp, e_hp, shield, buff, debuff, sp, stunned, stun_dur = node
+    hit = max(1, ctx['attack'] + buff + ctx['bonuses'].get('execute_power', 0))
+    attacks = -(-e_hp // hit)
+    # every recover (3 SP) buys three more executes once the pool runs dry
+    need = attacks + max(0, attacks - sp) / 3.0 + (stun_dur if stunned else 0)
+    incoming = max(0, ctx['enemy_atk'] - debuff - ctx['defense'])
+    survive = (p_hp + shield) / incoming if incoming else need + 100.0
+    margin = (survive - need) / max(survive, need, 1.0)
+    return 200.0 * max(-1.0, min(1.0, margin)) + 20.0 * p_hp / ctx['player_max'] - 20.0 * e_hp / ctx['enemy_max']
+
+
+def _value(node, depth, ctx, deadline):
+    key = (ctx['key'], node, depth)
+    cached = _table.get(key)
+    if cached is not None:
+        return cached
+    if time.perf_counter() > deadline:
+        raise _Timeout
+    best = None
+    for action in battle_core.ACTION_TABLE:
+        v = _action_value(node, action, depth, ctx, deadline)
+        if v is not None and (best is None or v > best):
+            best = v
+    if best is None:
+        best = _evaluate(node, ctx)
+    _table[key] = best
+    return best
+
+
+def _action_value(node, action, depth, ctx, deadline):
+    outcomes = _outcomes(node, action, ctx)
+    if not outcomes:
+        return None
+    total = 0.0
+    for prob, result, child in outcomes:
+        if result == battle_core.WIN:
+            v = WIN_SCORE + child[0]
+        elif result == battle_core.LOSE:
+            v = LOSE_SCORE - child[1]
+        elif depth <= 1:
+            v = _evaluate(child, ctx)
+        else:
+            v = _value(child, depth - 1, ctx, deadline)
+        total += prob * v
+    return DISCOUNT * total
+
+
+def _context(player, enemy, bonuses, map_visit_count, sp_max, player_max=None, enemy_max=None):
+    specials = effects.specials(enemy)
+    proc_chance = effects.hit_chance(enemy)
+    ctx = {
+        'attack': player['attack'],
+        'defense': player['defense'],
+        'enemy_atk': enemy.get('atk', 0),
+        'specials': specials,
+        'proc_chance': proc_chance,
+        'bonuses': dict(bonuses),
+        'visits': map_visit_count,
+        'sp_max': sp_max,
+        'player_max': max(1, player_max or player['hp']),
+        'enemy_max': max(1, enemy_max or enemy.get('max_hp', enemy['hp'])),
+    }
+    # everything constant for the fight; positions from different fights never collide
+    ctx['key'] = (ctx['attack'], ctx['defense'], ctx['enemy_atk'], repr(specials),
+                  tuple(sorted(ctx['bonuses'].items())),
+                  map_visit_count, sp_max, ctx['player_max'], ctx['enemy_max'])
+    return ctx
+
+
+def best_action(player, enemy, status, bonuses, map_visit_count, budget: float = None,
+                player_max: int = None, enemy_max: int = None) -> str:
+    """The action with the highest expected value found within `budget` seconds.
+
+    `player` is the battle_core player dict; `player_max`/`enemy_max` scale the
+    heuristic (they default to the enemy's max_hp or the current values).
+    """
+    if budget is None:
+        budget = TURN_BUDGET
+    if len(_table) > TABLE_LIMIT:
+        _table.clear()
+    ctx = _context(player, enemy, bonuses, map_visit_count,
+                   status.get('skill_points_max', battle_core.SKILL_POINT_MAX), player_max, enemy_max)
+    node = _pack(player, enemy, status)
+    deadline = time.perf_counter() + budget
+    choice = None
+    for depth in range(1, MAX_DEPTH + 1):
+        try:
+            scored = []
+            for action in battle_core.ACTION_TABLE:
+                v = _action_value(node, action, depth, ctx, deadline)
+                if v is not None:
+                    scored.append((v, action))
+        except _Timeout:
+            break
+        if not scored:
+            break
+        choice = max(scored)[1]
+        # a forced win or loss at this depth won't change with more search
+        if abs(max(scored)[0]) >= WIN_SCORE * DISCOUNT ** depth:
+            break
+    if choice is None:
+        # out of time before depth 1 finished: anything legal beats nothing
+        for action in battle_core.ACTION_TABLE:
+            if _outcomes(node, action, ctx):
+                return action
+        return 'recover'
+    return choice
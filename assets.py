@@ -0,0 +1,152 @@
+# assets.py
+# ASCII art store. Built-in art (BUILTIN) plus every ASSET_DIR/*.txt file (file name
+# without .txt is the asset name; a file replaces the built-in of the same name) is
+# read once by load() at startup. After that, get() / art() / center() are dict lookups:
+# no file I/O happens on the gameplay path.
+#
+# Art strings are interned, so every enemy and item dict holding the same picture shares
+# one string object, and each piece is split into lines and measured only once.
+#
+# Enemies: the art for enemy key K is asset K when there is one, else the template's
+# 'ascii' (so content packs can ship art inline or as ascii/K.txt).
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.path.join(ROOT, 'ascii')
+
+BUILTIN = {
+    # enemies (enemies_data keys)
+    'human': "  ,      ,\n (\\_/)\n (o.o)\n  >^ ",
+    'dart_monkey': "  ,--.\n (____)\n /||\\\\\n  ||",
+    'teto_boss': (
+        "   .-=========-.\n"
+        "  .-===;  _   _  ;===-.\n"
+        " /_   _| (o) (o) |_   _\\\n"
+        "((_\\ (_ ,  .---.  , _) /_))\n"
+        "   `-.__\\_/`---'\\_/__.-'\n"
+        "       _/          \\_\n"
+        "     /`   .-----.   `\\\n"
+        "    /     |     |     \\\n"
+        "   /      |     |      \\\n"
+        "  |       '.___.'       |\n"
+        "   \\                   /\n"
+        "    `-.___________.-'\n"
+    ),
+    'mook': '(?)',
+    'room_boss': '(#B#)',
+    'ambusher': '(>_<)',
+    'angry_monkey': '(~)',
+    # shop items (by item type); ascii/dart_monkey_small.txt replaces the weapon art
+    'weapon': (
+        '  /|\\\n'
+        ' /_|_\\\n'
+        '   |\n'
+        '   |\n'
+    ),
+    'armour': (
+        '  ___\n'
+        ' /___\n'
+        ' |   |\n'
+        ' |___|\n'
+    ),
+    'bag': (
+        '  ____\n'
+        ' /___/\\\n'
+        ' |___|\n'
+    ),
+}
+
+
+class Art:
+    """One interned piece of art with its lines and their widths."""
+    __slots__ = ('text', 'lines', 'widths', 'width', 'height')
+
+    def __init__(self, text: str):
+        self.text = sys.intern(text)
+        self.lines = tuple(sys.intern(line) for line in text.split('\n'))
+        self.widths = tuple(len(line) for line in self.lines)
+        self.width = max(self.widths)
+        self.height = len(self.lines)
+
+    def center(self, width: int) -> list:
+        """The lines, each padded on the left to sit centred in `width` columns."""
+        off = max(0, (width - self.width) // 2)
+        pad = ' ' * off
+        return [pad + line for line in self.lines]
+
+
+_named = {}      # asset name -> Art
+_by_text = {}    # art text -> Art (the same picture always maps to one Art)
+_loaded = False
+
+
+def measure(text: str) -> Art:
+    """The shared Art for `text`, measured on first sight."""
+    a = _by_text.get(text)
+    if a is None:
+        a = _by_text[text] = Art(text)
+    return a
+
+
+def intern(text: str) -> str:
+    """The shared copy of art `text` (for art that does not come from the store)."""
+    return measure(text).text if text else ''
+
+
+def register(name: str, text: str) -> str:
+    _named[name] = measure(text)
+    return _named[name].text
+
+
+def load(asset_dir: str = None):
+    """Index the built-in art and every .txt file in `asset_dir` (once, at startup)."""
+    global _loaded
+    asset_dir = ASSET_DIR if asset_dir is None else asset_dir
+    for name, text in BUILTIN.items():
+        register(name, text)
+    try:
+        names = sorted(os.listdir(asset_dir))
+    except OSError:
+        names = []
+    for fname in names:
+        if not fname.endswith('.txt'):
+            continue
+        try:
+            with open(os.path.join(asset_dir, fname), 'r', encoding='utf-8') as f:
+                register(fname[:-4], f.read().rstrip('\n'))
+        except (OSError, UnicodeDecodeError):
+            continue
+    _loaded = True
+
+
+def art(name: str):
+    """The Art registered as `name`, or None."""
+    if not _loaded:
+        load()
+    return _named.get(name)
+
+
+def get(name: str, default: str = '') -> str:
+    """The (interned) text of asset `name`, or `default`."""
+    a = art(name)
+    return a.text if a is not None else default
+
+
+def enemy_art(key: str, tpl: dict) -> str:
+    """Art for enemy `key`: asset `key` if there is one, else the template's 'ascii'."""
+    a = art(key)
+    if a is not None:
+        return a.text
+    return intern(tpl.get('ascii', ''))
+
+
+def center(text: str, width: int) -> list:
+    """Lines of art `text` centred in `width` columns (measured once per picture)."""
+    return measure(text).center(width)
+
+
+def names() -> list:
+    if not _loaded:
+        load()
+    return sorted(_named)
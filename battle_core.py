@@ -0,0 +1,198 @@
+# battle_core.py
+# Battle rules with no rendering, sleeping or global state. Everything a turn touches is
+# passed in: the player (a small dict of hp/attack/defense), the enemy instance, the
+# per-battle status dict, the upgrade bonuses and a random.Random-like `rng`. The same
+# code drives live battles (actions.py) and headless balance runs (simulate.py).
+import effects
+
+# Skill point configuration for battles
+SKILL_POINT_START = 5
+SKILL_POINT_MAX = 8
+# costs per action (recover is special - it regenerates SP instead of costing)
+ACTION_COSTS = {
+    'execute': 1,
+    'defend': 2,
+    'hack': 2,
+    'debug': 2,
+    'recover': 0,
+}
+DEBUFF_CAP = 10
+
+# turn results
+CONTINUE = 'continue'
+WIN = 'win'
+LOSE = 'lose'
+INVALID = 'invalid'   # the action could not be taken; no turn passed
+
+
+def new_status(map_visit_count: int = 0) -> dict:
+    """Per-battle transient status (shield, buffs, debuffs, skill points)."""
+    base_sp = SKILL_POINT_START + int(map_visit_count // 2)
+    return {
+        'player_shield': 0,
+        'player_buff': 0,
+        'enemy_debuff': 0,
+        'skill_points': base_sp,
+        'skill_points_max': SKILL_POINT_MAX,
+        # stun status applied by certain enemies (e.g., Teto)
+        'player_stunned': False,
+        'stun_duration': 0,
+    }
+
+
+def upgrade_bonuses(action_upgrades) -> dict:
+    """Cumulative bonus per action upgrade id ({'execute_power': 4, ...})."""
+    bonuses = {}
+    for upg in action_upgrades or []:
+        # entries are validated when packs load (content.py); a bad one here is a bug
+        bonuses[upg['id']] = bonuses.get(upg['id'], 0) + int(upg.get('level', 0)) * int(upg.get('amount', 0))
+    return bonuses
+
+
+def _tick_stun(status):
+    status['stun_duration'] = status.get('stun_duration', 0) - 1
+    if status['stun_duration'] <= 0:
+        status['player_stunned'] = False
+        status['stun_duration'] = 0
+
+
+# Effects run after the action's cost has been paid. Each gets the bonus from its
+# action upgrade, appends its message and returns False if it could not happen
+# (the cost is refunded and no turn passes).
+
+def _execute(player, enemy, status, bonus, map_visit_count, log) -> bool:
+    # base damage from weapon/attack plus player buff and execute upgrades
+    damage = max(1, int(player['attack'] + status.get('player_buff', 0)) + bonus)
+    enemy['hp'] -= damage
+    log.append(f"Execute Code deals {damage} damage (-{ACTION_COSTS['execute']} SP)")
+    return True
+
+
+def _defend(player, enemy, status, bonus, map_visit_count, log) -> bool:
+    # shield scales with player's defense stat plus defend upgrades
+    shield_amount = 8 + int(player['defense'] * 0.5) + bonus
+    status['player_shield'] = status.get('player_shield', 0) + shield_amount
+    log.append(f"Defend Code grants {shield_amount} shield (-{ACTION_COSTS['defend']} SP)")
+    return True
+
+
+def _recover(player, enemy, status, bonus, map_visit_count, log) -> bool:
+    sp = status.get('skill_points', 0)
+    new_sp = min(status.get('skill_points_max', sp), sp + 3 + bonus)
+    gained = new_sp - sp
+    if gained <= 0:
+        log.append('Skill Points already full')
+        return False
+    status['skill_points'] = new_sp
+    log.append(f'Recover restores {gained} SP (+{gained} SP)')
+    return True
+
+
+def _hack(player, enemy, status, bonus, map_visit_count, log) -> bool:
+    reduce_amount = 3 + int(map_visit_count * 0.5) + bonus
+    new_debuff = min(DEBUFF_CAP, status.get('enemy_debuff', 0) + reduce_amount)
+    status['enemy_debuff'] = new_debuff
+    log.append(f"Hack reduces enemy attack by {reduce_amount} (total debuff {new_debuff}/{DEBUFF_CAP}) "
+               f"(-{ACTION_COSTS['hack']} SP)")
+    return True
+
+
+def _debug(player, enemy, status, bonus, map_visit_count, log) -> bool:
+    buff = max(1, int(player['attack'] * 0.4)) + bonus
+    status['player_buff'] = status.get('player_buff', 0) + buff
+    log.append(f"Debug increases your attack by {buff} (-{ACTION_COSTS['debug']} SP)")
+    return True
+
+
+# name -> cost, effect, upgrade id feeding its bonus, usable while stunned.
+# A new action is one entry here (plus a key binding); resolve_turn needs no changes.
+ACTION_TABLE = {
+    'execute': {'cost': ACTION_COSTS['execute'], 'effect': _execute, 'upgrade': 'execute_power', 'while_stunned': False},
+    'defend':  {'cost': ACTION_COSTS['defend'],  'effect': _defend,  'upgrade': 'defend_power',  'while_stunned': False},
+    'recover': {'cost': ACTION_COSTS['recover'], 'effect': _recover, 'upgrade': 'recover_power', 'while_stunned': True},
+    'hack':    {'cost': ACTION_COSTS['hack'],    'effect': _hack,    'upgrade': 'hack_power',    'while_stunned': False},
+    'debug':   {'cost': ACTION_COSTS['debug'],   'effect': _debug,   'upgrade': 'debug_power',   'while_stunned': False},
+}
+
+
+def enemy_retaliate(player, enemy, status, rng, log):
+    """Enemy hits back after debuff, defense and shield; may trigger its specials."""
+    atk = max(0, enemy.get('atk', 0) - status.get('enemy_debuff', 0))
+    shield = status.get('player_shield', 0)
+    defense = player['defense']
+    damage = max(0, atk - (defense + shield))
+    # consume shield
+    status['player_shield'] = max(0, shield - max(0, atk - defense))
+    if damage > 0:
+        player['hp'] -= damage
+    effects.on_hit(player, enemy, status, rng, log)
+
+
+def apply_action(player, enemy, status, action, bonuses, map_visit_count, log) -> str:
+    """The player's half of a turn: stun, SP cost and effect, without the enemy's reply.
+
+    Returns WIN, INVALID or CONTINUE.
+    """
+    spec = ACTION_TABLE[action]
+    stunned = status.get('player_stunned', False)
+    if stunned and not spec['while_stunned']:
+        # stunned: the turn is lost, but it wears the stun down
+        _tick_stun(status)
+        log.append('You are stunned and cannot act this turn!')
+        return CONTINUE
+    cost = spec['cost']
+    sp = status.get('skill_points', 0)
+    if sp < cost:
+        log.append('Not enough Skill Points')
+        return INVALID
+    status['skill_points'] = sp - cost
+    if not spec['effect'](player, enemy, status, bonuses.get(spec['upgrade'], 0), map_visit_count, log):
+        status['skill_points'] = sp
+        return INVALID
+    if enemy['hp'] <= 0:
+        return WIN
+    if stunned:
+        # acting while stunned counts as the allowed action
+        _tick_stun(status)
+    return CONTINUE
+
+
+def resolve_turn(player, enemy, status, action, bonuses, map_visit_count, rng, log=None):
+    """Resolve one player action from ACTION_TABLE and the enemy's reply.
+
+    Returns (result, log) where result is CONTINUE, WIN, LOSE or INVALID and log holds
+    the messages the turn produced, in order.
+    """
+    if log is None:
+        log = []
+    result = apply_action(player, enemy, status, action, bonuses, map_visit_count, log)
+    if result != CONTINUE:
+        return result, log
+    enemy_retaliate(player, enemy, status, rng, log)
+    effects.end_turn(player, enemy, status, log)
+    if player['hp'] <= 0:
+        return LOSE, log
+    # poison and the like can finish the enemy off at the end of the turn
+    if enemy['hp'] <= 0:
+        return WIN, log
+    return CONTINUE, log
+
+
+def resolve_turns(player, enemy, status, actions, bonuses, map_visit_count, rng, log=None):
+    """Resolve a queued sequence of actions in one call.
+
+    Stops at the first turn that ends the battle or cannot be taken. Returns
+    (result, turns_resolved, log); result is that of the last turn attempted.
+    """
+    if log is None:
+        log = []
+    result = CONTINUE
+    done = 0
+    for action in actions:
+        result, _ = resolve_turn(player, enemy, status, action, bonuses, map_visit_count, rng, log)
+        if result == INVALID:
+            break
+        done += 1
+        if result != CONTINUE:
+            break
+    return result, done, log
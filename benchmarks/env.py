@@ -0,0 +1,52 @@
+# benchmarks/env.py
+# Steps per second of env.VecEnv under random actions for a few batch sizes.
+# Usage: python benchmarks/env.py [--games 1 64 1024 4096] [--steps 500]
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+import env  # noqa: E402
+
+
+def run(n_games: int, steps: int, seed: int = 0) -> dict:
+    vec = env.VecEnv(n_games, seed=seed)
+    vec.reset()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, env.N_ACTIONS, size=(steps, n_games))
+    # fill the floor pools first so layout generation is not timed
+    for a in actions[:steps // 5]:
+        vec.step(a)
+    episodes = 0
+    t0 = time.perf_counter()
+    for a in actions[steps // 5:]:
+        _, _, terminated, truncated = vec.step(a)
+        episodes += int(terminated.sum() + truncated.sum())
+    elapsed = time.perf_counter() - t0
+    timed = steps - steps // 5
+    return {'games': n_games, 'steps_per_s': round(timed * n_games / elapsed),
+            'us_per_batch': round(1e6 * elapsed / timed, 1), 'episodes': episodes}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--games', type=int, nargs='*', default=[1, 64, 1024, 4096])
+    ap.add_argument('--steps', type=int, default=500)
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+    results = [run(n, args.steps) for n in args.games]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'games':>7} {'steps/s':>12} {'us/batch':>10} {'episodes':>9}")
+    for r in results:
+        print(f"{r['games']:>7} {r['steps_per_s']:>12,} {r['us_per_batch']:>10} {r['episodes']:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# benchmarks/loadtest.py
+# Load test for server.py: many bot clients each play their own session (pick a slot,
+# click, browse generators, walk the map) and record frame traffic and key-to-frame
+# latency. Usage: python benchmarks/loadtest.py [--bots 200] [--seconds 20] [--spawn]
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import frames  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# key -> weight; movement keys are held for a few frames
+BOT_KEYS = {'space': 30, 'g': 3, 'r': 3, '1': 4, '2': 2, 'm': 2, 'w': 2, 'a': 2, 's': 2, 'd': 2, 'q': 1}
+THINK_TIME = (0.02, 0.2)
+FRAME_TIMEOUT = 1.0
+
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.refused = []
+        self.keys = 0
+        self.keyframes = 0
+        self.diffs = 0
+        self.bytes = 0
+        self.latencies = []
+
+    def summary(self, seconds: float) -> dict:
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return round(1000 * lat[min(len(lat) - 1, int(p * len(lat)))], 2) if lat else None
+
+        return {
+            'sessions': self.connected,
+            'refused': len(self.refused),
+            'keys_per_s': round(self.keys / seconds, 1),
+            'frames_per_s': round((self.keyframes + self.diffs) / seconds, 1),
+            'keyframes': self.keyframes,
+            'diffs': self.diffs,
+            'kib_per_s': round(self.bytes / seconds / 1024, 1),
+            'latency_ms_p50': pct(0.50),
+            'latency_ms_p95': pct(0.95),
+            'latency_ms_p99': pct(0.99),
+        }
+
+
+async def _connect(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def bot(index: int, args, stats: Stats, deadline: float):
+    rng = random.Random(args.seed + index)
+    reader, writer = await _connect(args)
+    writer.write(frames.hello(f'bot-{index}'))
+    got_frame = asyncio.Event()
+    screen = None
+
+    async def read_frames():
+        nonlocal screen
+        while True:
+            msg = await frames.read_message(reader)
+            if msg is None:
+                return
+            kind, payload = msg
+            if kind == frames.BYE:
+                if screen is None:
+                    stats.refused.append(payload.decode('utf-8', 'replace'))
+                return
+            screen = frames.apply(screen, kind, payload)
+            stats.bytes += len(payload) + 5
+            if kind == frames.KEYFRAME:
+                stats.keyframes += 1
+            else:
+                stats.diffs += 1
+            got_frame.set()
+
+    reading = asyncio.create_task(read_frames())
+    try:
+        await asyncio.wait_for(got_frame.wait(), FRAME_TIMEOUT * 10)
+        stats.connected += 1
+        # start menu: slot 1
+        writer.write(frames.key('1') + frames.key('1', down=False))
+        keys, weights = zip(*BOT_KEYS.items())
+        while time.monotonic() < deadline and not reading.done():
+            name = rng.choices(keys, weights)[0]
+            got_frame.clear()
+            t0 = time.perf_counter()
+            writer.write(frames.key(name))
+            if name in 'wasd':
+                await asyncio.sleep(rng.uniform(0.05, 0.3))
+            writer.write(frames.key(name, down=False))
+            stats.keys += 1
+            try:
+                await asyncio.wait_for(got_frame.wait(), FRAME_TIMEOUT)
+                stats.latencies.append(time.perf_counter() - t0)
+            except asyncio.TimeoutError:
+                # not every key changes the screen
+                pass
+            await asyncio.sleep(rng.uniform(*THINK_TIME))
+        writer.write(frames.key('esc'))
+        await asyncio.wait_for(reading, FRAME_TIMEOUT * 10)
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        reading.cancel()
+        writer.close()
+
+
+async def run(args) -> dict:
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + args.seconds
+    bots = []
+    for i in range(args.bots):
+        bots.append(asyncio.create_task(bot(i, args, stats, deadline)))
+        # ramp up rather than connecting everyone in the same instant
+        await asyncio.sleep(args.ramp / max(1, args.bots))
+    await asyncio.gather(*bots, return_exceptions=True)
+    return stats.summary(time.monotonic() - start)
+
+
+def _spawn(args):
+    """Start server.py in a subprocess with a throwaway save dir."""
+    save_dir = tempfile.mkdtemp(prefix='loadtest-')
+    cmd = [sys.executable, os.path.join(ROOT, 'server.py'), '--save-dir', save_dir,
+           '--max-sessions', str(args.bots)]
+    cmd += ['--unix', args.unix] if args.unix else ['--host', args.host, '--port', str(args.port)]
+    proc = subprocess.Popen(cmd, stderr=subprocess.PIPE)
+    # the server reports once it listens
+    proc.stderr.readline()
+    return proc
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--bots', type=int, default=200)
+    ap.add_argument('--seconds', type=float, default=20.0)
+    ap.add_argument('--ramp', type=float, default=2.0, help='seconds over which bots connect')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=7777)
+    ap.add_argument('--unix', help='connect to this Unix socket instead of TCP')
+    ap.add_argument('--spawn', action='store_true', help='start a server for the run')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+    proc = _spawn(args) if args.spawn else None
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for k, v in result.items():
+        print(f'{k:>16}: {v}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/production.py
+# Cost of recomputing generator income with many tiers: the pure-Python path against the
+# NumPy path, both after a load (arrays built from the generator dicts) and after a
+# purchase (one count updated in the persistent arrays), plus the cached per-tick read.
+# Usage: python benchmarks/production.py [--tiers 10 100 1000]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import production  # noqa: E402
+import state  # noqa: E402
+
+
+def synthetic_generators(n_tiers: int, seed: int = 0) -> list:
+    """Generator dicts shaped like state.idle_generators, `n_tiers` long."""
+    rng = random.Random(seed)
+    return [{'key': str(i), 'id': f'gen_{i}', 'name': f'Tier {i}', 'cost': 10.0 * 8 ** min(i, 300),
+             'type': 'clicks' if i == 0 else 'income', 'rate': 0.5 * 7 ** min(i, 300),
+             'count': rng.randint(0, 400), 'synergy': 0.01}
+            for i in range(n_tiers)]
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(n_tiers: int, repeat: int) -> dict:
+    gens = synthetic_generators(n_tiers)
+    state.idle_generators = gens
+    result = {'tiers': n_tiers,
+              'python_ms': _best(lambda: production._compute_python(gens), repeat) * 1000}
+    if production._numpy():
+        arrays = production._build_arrays(gens)
+        vec, py = production._compute_numpy(arrays), production._compute_python(gens)
+        assert all(abs(x.log10() - y.log10()) <= 1e-12 * abs(y.log10()) for x, y in zip(vec[:2], py[:2]) if y), \
+            'numpy/python mismatch'
+        result['numpy_load_ms'] = _best(
+            lambda: production._compute_numpy(production._build_arrays(gens)), repeat) * 1000
+
+        def purchase():
+            arrays[0][n_tiers // 2] += 1
+            production._compute_numpy(arrays)
+        result['numpy_ms'] = _best(purchase, repeat) * 1000
+    # the per-tick path once the totals are current
+    production.invalidate()
+    production.income_rate()
+    result['cached_tick_us'] = _best(production.income_rate, repeat) * 1e6
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--tiers', type=int, nargs='*', default=[10, 100, 1000])
+    ap.add_argument('--repeat', type=int, default=50)
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+    results = [run(n, args.repeat) for n in args.tiers]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"tiers":>6} {"python":>10} {"numpy":>10} {"np load":>10} {"tick":>9}')
+    for r in results:
+        if 'numpy_ms' in r:
+            vec = f'{r["numpy_ms"]:>8.3f}ms {r["numpy_load_ms"]:>8.3f}ms'
+        else:
+            vec = f'{"n/a":>10} {"n/a":>10}'
+        print(f'{r["tiers"]:>6} {r["python_ms"]:>8.3f}ms {vec} {r["cached_tick_us"]:>7.2f}us')
+
+if __name__ == '__main__':
+    main()
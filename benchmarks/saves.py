@@ -0,0 +1,101 @@
+# benchmarks/saves.py
+# Round-trip benchmark of the binary save format against the JSON path on large
+# synthetic saves. Usage: python benchmarks/saves.py [--items 5000] [--repeat 20]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import savefmt  # noqa: E402
+
+
+def synthetic_save(n_items: int, n_keys: int, seed: int = 0) -> dict:
+    """A save dict shaped like persistence._collect_state(), but huge."""
+    rng = random.Random(seed)
+    names = ['Sword', 'Armour', 'Health Potion', 'Large Potion', 'Health Amulet', 'Ring of Strength']
+    inventory = []
+    for i in range(n_items):
+        name = rng.choice(names)
+        item = {'name': name, 'type': 'weapon' if name == 'Sword' else 'consumable',
+                'level': rng.randint(1, 40), 'ascii': '  /|\\\n /_|_\\\n   |\n   |\n'}
+        if i % 3 == 0:
+            item['subtype'] = 'heal'
+            item['amount'] = rng.randint(10, 400)
+        inventory.append(item)
+    return {
+        'count': rng.randint(0, 10 ** 12),
+        'per_click': 1.5 * rng.randint(1, 10 ** 6),
+        'current_room_index': 4,
+        'player_x': 24, 'player_y': 26,
+        'player_hp': 80, 'player_max_hp': 120,
+        'map_visit_count': n_keys,
+        'upgrades': {str(k): bool(k % 2) for k in range(n_keys)},
+        'shop': {str(k): bool(k % 3) for k in range(n_keys)},
+        'attack': 40, 'defense': -3, 'has_bag': True,
+        'inventory': inventory,
+        'equipped_accessory': None,
+        'action_upgrades': {f'power_{k}': k % 7 for k in range(n_keys)},
+        'equipped_weapon': inventory[0] if inventory else None,
+        'equipped_armour': None,
+        'meta_currency': 1234,
+        'meta_upgrades': {f'meta_{k}': True for k in range(n_keys)},
+        'meta_start_per_click': 3, 'meta_start_attack': 10,
+        'inventory_capacity': n_items,
+        'journal_seq': 7,
+        'play_time': 3600.5,
+        'idle_generators': {f'gen_{k}': k for k in range(n_keys)},
+        'last_seen': 1760000000,
+        'run_max_count': [1.2345, 67],
+    }
+
+
+def _best(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def run(n_items: int, n_keys: int, repeat: int) -> dict:
+    data = synthetic_save(n_items, n_keys)
+    raw_json = json.dumps(data).encode('utf-8')
+    raw_bin = savefmt.encode(data)
+    assert savefmt.coerce(savefmt.decode(raw_bin)) == savefmt.coerce(data), 'binary round-trip mismatch'
+    return {
+        'items': n_items,
+        'keys': n_keys,
+        'json_bytes': len(raw_json),
+        'binary_bytes': len(raw_bin),
+        'json_encode_ms': _best(lambda: json.dumps(data).encode('utf-8'), repeat) * 1000,
+        'binary_encode_ms': _best(lambda: savefmt.encode(data), repeat) * 1000,
+        'json_load_ms': _best(lambda: savefmt.loads(raw_json), repeat) * 1000,
+        'binary_load_ms': _best(lambda: savefmt.loads(raw_bin), repeat) * 1000,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument('--items', type=int, nargs='*', default=[100, 1000, 5000])
+    ap.add_argument('--keys', type=int, default=200, help='entries per upgrade/meta map')
+    ap.add_argument('--repeat', type=int, default=10)
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+    results = [run(n, args.keys, args.repeat) for n in args.items]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f'{"items":>7} {"json B":>9} {"bin B":>9} {"json enc":>9} {"bin enc":>9} {"json load":>10} {"bin load":>9}')
+    for r in results:
+        print(f'{r["items"]:>7} {r["json_bytes"]:>9} {r["binary_bytes"]:>9} '
+              f'{r["json_encode_ms"]:>7.2f}ms {r["binary_encode_ms"]:>7.2f}ms '
+              f'{r["json_load_ms"]:>8.2f}ms {r["binary_load_ms"]:>7.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/startup.py
+# Startup cost of the game: an `-X importtime` breakdown of `import main` and the wall
+# time from spawning the interpreter to the start menu being drawn (first frame).
+# Each run is appended to a history file so regressions show up over time.
+# Usage: python benchmarks/startup.py [--runs 10] [--top 15] [--no-record] [--json]
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY = os.path.join(ROOT, 'benchmarks', 'startup_history.jsonl')
+
+# child: import the game and draw the start menu into a null terminal, then tell the
+# parent on stderr. No keyboard is needed; main only imports it once the runtime starts.
+FIRST_FRAME = '''
+import sys
+class _Null:
+    def write(self, s): return len(s)
+    def flush(self): pass
+    def clear_screen(self): pass
+sys.stdout = _Null()
+import main
+main.render.display_start_menu()
+sys.stderr.write('FIRST_FRAME\\n')
+sys.stderr.flush()
+'''
+
+
+def import_times(python: str = sys.executable) -> list:
+    """(module, self_us, cumulative_us) for every module `import main` loads."""
+    proc = subprocess.run([python, '-X', 'importtime', '-c', 'import main'], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    out = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cum_us, name = line[len('import time:'):].split('|', 2)
+        out.append((name.strip(), int(self_us), int(cum_us)))
+    return out
+
+
+def first_frame(python: str = sys.executable) -> float:
+    """Milliseconds from spawning the interpreter until the start menu is drawn."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([python, '-c', FIRST_FRAME], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    for line in proc.stderr:
+        if line.strip() == 'FIRST_FRAME':
+            elapsed = time.perf_counter() - t0
+            break
+    else:
+        proc.wait()
+        raise RuntimeError('start menu was never drawn')
+    proc.wait()
+    return 1000 * elapsed
+
+
+def _revision() -> str:
+    """Short HEAD hash, with '+dirty' if tracked files have uncommitted changes."""
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+    return (rev + '+dirty' if dirty else rev) or None
+
+
+def measure(runs: int, top: int) -> dict:
+    # median over runs: process spawn is noisy; the first run also warms the .pyc cache
+    first_frame()
+    samples = [import_times() for _ in range(runs)]
+    frames = [first_frame() for _ in range(runs)]
+    per_run = [{name: (s, c) for name, s, c in run} for run in samples]
+    names = [name for name, _, _ in samples[0]]
+    modules = []
+    for name in names:
+        selfs = [run[name][0] for run in per_run if name in run]
+        cums = [run[name][1] for run in per_run if name in run]
+        modules.append({'module': name, 'self_ms': round(statistics.median(selfs) / 1000, 2),
+                        'cumulative_ms': round(statistics.median(cums) / 1000, 2)})
+    total = next((m['cumulative_ms'] for m in modules if m['module'] == 'main'), None)
+    modules.sort(key=lambda m: -m['self_ms'])
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': _revision(),
+        'python': platform.python_version(),
+        'runs': runs,
+        'import_main_ms': total,
+        'first_frame_ms': round(statistics.median(frames), 2),
+        'modules': len(modules),
+        'top': modules[:top],
+    }
+
+
+def load_history(path: str = HISTORY) -> list:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def record(result: dict, path: str = HISTORY):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result) + '\n')
+
+
+def _delta(now, before) -> str:
+    if now is None or before is None:
+        return ''
+    return f'  ({now - before:+.1f} ms vs {before:.1f})'
+
+
+def report(result: dict, previous: dict = None):
+    prev = previous or {}
+    print(f"import main:   {result['import_main_ms']:8.1f} ms"
+          f"{_delta(result['import_main_ms'], prev.get('import_main_ms'))}")
+    print(f"first frame:   {result['first_frame_ms']:8.1f} ms"
+          f"{_delta(result['first_frame_ms'], prev.get('first_frame_ms'))}")
+    print(f"modules:       {result['modules']:8d}")
+    print()
+    print(f"{'self ms':>8} {'cum ms':>8}  module")
+    for m in result['top']:
+        print(f"{m['self_ms']:>8.2f} {m['cumulative_ms']:>8.2f}  {m['module']}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Startup time of the game')
+    ap.add_argument('--runs', type=int, default=10)
+    ap.add_argument('--top', type=int, default=15, help='modules to list by self time')
+    ap.add_argument('--history', default=HISTORY, help='JSON-lines history file')
+    ap.add_argument('--no-record', action='store_true', help='do not append to the history')
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+    history = load_history(args.history)
+    result = measure(max(1, args.runs), args.top)
+    if not args.no_record:
+        record(result, args.history)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    report(result, history[-1] if history else None)
+
+
+if __name__ == '__main__':
+    main()
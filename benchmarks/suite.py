@@ -0,0 +1,362 @@
+# benchmarks/suite.py
+# Benchmarks of the game's hot paths: room generation, moving across room boundaries,
+# drawing the map and battle screens, saving/loading a large game and whole battles
+# fought through the battle actions.
+#
+# Runs offline: a stub `keyboard` module is installed before the game is imported,
+# screens draw into a null terminal and saves go to a temporary directory. Scenarios
+# that test game logic (moves, battles) swap the screens out entirely so they time the
+# logic alone; the render scenarios time the drawing.
+#
+# Each scenario reports ops/s and latency percentiles. With --baseline, results are
+# compared against a stored run and the exit code is 1 when a scenario's median is
+# more than --tolerance slower. A scenario that raises stops the run with its traceback.
+# Usage: python benchmarks/suite.py [--only create_room ...] [--seconds 1.0] [--json]
+#        [--baseline benchmarks/suite_baseline.json] [--save-baseline FILE] [--tolerance 0.25]
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+BASELINE = os.path.join(ROOT, 'benchmarks', 'suite_baseline.json')
+
+
+def _stub_keyboard():
+    kb = types.ModuleType('keyboard')
+    kb.KEY_DOWN, kb.KEY_UP = 'down', 'up'
+    kb.hook = kb.on_press_key = kb.on_release_key = kb.add_hotkey = lambda *a, **k: None
+    kb.unhook = kb.unhook_all = kb.remove_hotkey = lambda *a, **k: None
+    kb.is_pressed = lambda key: False
+    sys.modules['keyboard'] = kb
+
+
+_stub_keyboard()
+
+import actions  # noqa: E402
+import persistence  # noqa: E402
+import render  # noqa: E402
+import state  # noqa: E402
+from bignum import Big  # noqa: E402
+
+VISITS = (0, 3, 6, 9)
+LARGE_INVENTORY = 5000
+MAX_BATTLE_TURNS = 500
+
+
+class NullTerminal:
+    """stdout replacement: accepts everything, shows nothing (render.clear uses clear_screen)."""
+
+    def write(self, s):
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def clear_screen(self):
+        pass
+
+
+class NullScreens:
+    """Stands in for the render module: every screen is a no-op."""
+
+    def __getattr__(self, name):
+        return _noop
+
+
+def _noop(*args, **kwargs):
+    return None
+
+
+# --- game setup ---
+
+def new_game(save_dir: str, seed: int = 0):
+    random.seed(seed)
+    state.SAVE_DIR = save_dir
+    state.SAVE_FILE = os.path.join(save_dir, 'save.dat')
+    state.SLOT_INDEX_FILE = os.path.join(save_dir, 'slots.json')
+    state.map_visit_count = 0
+    persistence.reset_game()
+    state.game_state = 'explore'
+    state.auto_battle = False
+
+
+def large_state():
+    rng = random.Random(1)
+    names = ['Sword', 'Armour', 'Health Potion', 'Large Potion', 'Health Amulet', 'Ring of Strength']
+    state.inventory = []
+    for i in range(LARGE_INVENTORY):
+        name = rng.choice(names)
+        item = {'name': name, 'type': 'weapon' if name == 'Sword' else 'consumable',
+                'level': rng.randint(1, 40), 'ascii': '  /|\\\n /_|_\\\n   |\n   |\n'}
+        if i % 3 == 0:
+            item['subtype'] = 'heal'
+            item['amount'] = rng.randint(10, 400)
+        state.inventory.append(item)
+    state.count = Big(1.5e120)
+    for g in state.idle_generators:
+        g['count'] = rng.randint(0, 500)
+
+
+# --- scenarios: (name, setup(save_dir) -> op) ---
+
+def _create_room(visits):
+    def setup(save_dir):
+        random.seed(visits)
+        return lambda: state.create_room(visits)
+    return setup
+
+
+def _create_rooms(visits):
+    def setup(save_dir):
+        random.seed(visits)
+        return lambda: state.create_rooms(5, visits=visits)
+    return setup
+
+
+def _move_boundary(save_dir):
+    new_game(save_dir)
+    last = len(state.rooms) - 1
+
+    def op():
+        # step across the east edge, or back across the west edge from the last room
+        state.last_move_time = 0.0
+        state.player_y = state.ROOM_HEIGHT // 2
+        if state.current_room_index < last:
+            state.player_x = state.ROOM_WIDTH - 2
+            actions.move(1, 0)
+        else:
+            state.player_x = 1
+            actions.move(-1, 0)
+    return op
+
+
+def _move_new_floor(save_dir):
+    new_game(save_dir)
+
+    def op():
+        # east edge of the last room: generates the next floor
+        state.map_visit_count = 0
+        state.current_room_index = len(state.rooms) - 1
+        state.load_room(state.current_room_index)
+        state.last_move_time = 0.0
+        state.player_y = state.ROOM_HEIGHT // 2
+        state.player_x = state.ROOM_WIDTH - 2
+        actions.move(1, 0)
+    return op
+
+
+def _render_map(save_dir):
+    new_game(save_dir)
+    return render.render_map
+
+
+def _display_battle(save_dir):
+    new_game(save_dir)
+    pos = next(iter(state.enemies), (1, 1))
+    state.enemies.setdefault(pos, state.create_enemy_instance('human', 0))
+    state.current_battle_enemy = dict(state.enemies[pos], max_hp=state.enemies[pos]['hp'])
+    state.current_battle_pos = pos
+    state.current_battle_status = actions.battle_core.new_status(0)
+    state.game_state = 'battle'
+    return render.display_battle
+
+
+def _save_game(save_dir):
+    new_game(save_dir)
+    large_state()
+    persistence.compact_save()
+
+    def op():
+        # a small change per save, as in play: journal delta on top of the snapshot
+        state.count += 1
+        persistence.save_game()
+    return op
+
+
+def _save_snapshot(save_dir):
+    new_game(save_dir)
+    large_state()
+    return persistence.compact_save
+
+
+def _load_game(save_dir):
+    new_game(save_dir)
+    large_state()
+    persistence.compact_save()
+    return persistence.load_game
+
+
+def _battle(save_dir):
+    new_game(save_dir)
+    pos = (state.ROOM_HEIGHT // 2, state.ROOM_WIDTH // 2)
+
+    def op():
+        state.game_state = 'explore'
+        state.attack, state.player_max_hp = 30, 200
+        state.player_hp = state.player_max_hp
+        state.enemies[pos] = state.create_enemy_instance('dart_monkey', 3)
+        actions.enter_battle(pos)
+        for _ in range(MAX_BATTLE_TURNS):
+            if state.game_state != 'battle':
+                break
+            # execute while skill points last, recover otherwise
+            sp = state.current_battle_status.get('skill_points', 0)
+            actions.handle_number_key('1' if sp >= actions.ACTION_COSTS['execute'] else '3')
+    return op
+
+
+SCENARIOS = (
+    [(f'create_room[visits={v}]', _create_room(v), False) for v in VISITS]
+    + [(f'create_rooms[visits={v}]', _create_rooms(v), False) for v in VISITS]
+    + [
+        ('move[room boundary]', _move_boundary, True),
+        ('move[new floor]', _move_new_floor, True),
+        ('render_map', _render_map, False),
+        ('display_battle', _display_battle, False),
+        (f'save_game[{LARGE_INVENTORY} items]', _save_game, False),
+        (f'save_snapshot[{LARGE_INVENTORY} items]', _save_snapshot, False),
+        (f'load_game[{LARGE_INVENTORY} items]', _load_game, False),
+        ('battle[dart_monkey, actions]', _battle, True),
+    ]
+)
+
+
+# --- timing ---
+
+def _percentile(sorted_ns, q):
+    i = min(len(sorted_ns) - 1, max(0, round(q * (len(sorted_ns) - 1))))
+    return sorted_ns[i] / 1000
+
+
+def time_op(op, seconds: float, warmup: int = 3, max_ops: int = 100000) -> dict:
+    for _ in range(warmup):
+        op()
+    samples = []
+    clock = time.perf_counter_ns
+    deadline = clock() + int(seconds * 1e9)
+    while len(samples) < max_ops:
+        t0 = clock()
+        op()
+        t1 = clock()
+        samples.append(t1 - t0)
+        if t1 >= deadline:
+            break
+    total = sum(samples)
+    samples.sort()
+    return {
+        'ops': len(samples),
+        'ops_per_s': round(len(samples) / (total / 1e9), 1) if total else None,
+        'mean_us': round(total / len(samples) / 1000, 2),
+        'p50_us': round(_percentile(samples, 0.50), 2),
+        'p90_us': round(_percentile(samples, 0.90), 2),
+        'p99_us': round(_percentile(samples, 0.99), 2),
+        'max_us': round(samples[-1] / 1000, 2),
+    }
+
+
+def run_scenario(setup, quiet_screens: bool, seconds: float) -> dict:
+    save_dir = tempfile.mkdtemp(prefix='bench-')
+    stdout, screens = sys.stdout, actions.render
+    sys.stdout = NullTerminal()
+    if quiet_screens:
+        actions.render = NullScreens()
+    try:
+        return time_op(setup(save_dir), seconds)
+    finally:
+        sys.stdout, actions.render = stdout, screens
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+
+def run(only=None, seconds: float = 1.0) -> dict:
+    results = {}
+    saved = {k: getattr(state, k) for k in ('SAVE_DIR', 'SAVE_FILE', 'SLOT_INDEX_FILE')}
+    try:
+        for name, setup, quiet in SCENARIOS:
+            if only and not any(name.startswith(o) for o in only):
+                continue
+            results[name] = run_scenario(setup, quiet, seconds)
+    finally:
+        for k, v in saved.items():
+            setattr(state, k, v)
+    return results
+
+
+# --- baseline ---
+
+def compare(results: dict, baseline: dict, tolerance: float) -> dict:
+    """Per scenario: ratio of median latency to the baseline's, and whether it regressed."""
+    out = {}
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = now['p50_us'] / before['p50_us'] if before['p50_us'] else None
+        out[name] = {'regressed': ratio is not None and ratio > 1 + tolerance,
+                     'ratio': None if ratio is None else round(ratio, 3)}
+    return out
+
+
+def _revision():
+    try:
+        import subprocess
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def report(results: dict, comparison: dict):
+    print(f"{'scenario':<32} {'ops/s':>11} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10}  vs baseline")
+    for name, r in results.items():
+        c = comparison.get(name, {})
+        vs = ''
+        if c.get('ratio') is not None:
+            vs = f"x{c['ratio']:.2f}" + ('  REGRESSION' if c['regressed'] else '')
+        print(f"{name:<32} {r['ops_per_s']:>11,.1f} {r['p50_us']:>10.1f} {r['p90_us']:>10.1f} "
+              f"{r['p99_us']:>10.1f}  {vs}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Benchmarks of the game hot paths')
+    ap.add_argument('--only', nargs='*', help='run scenarios whose name starts with one of these')
+    ap.add_argument('--seconds', type=float, default=1.0, help='timed seconds per scenario')
+    ap.add_argument('--baseline', nargs='?', const=BASELINE, help='compare against this run')
+    ap.add_argument('--save-baseline', nargs='?', const=BASELINE, help='store this run as the baseline')
+    ap.add_argument('--tolerance', type=float, default=0.25, help='allowed median slowdown (0.25 = 25%%)')
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+
+    results = run(args.only, args.seconds)
+    comparison = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            comparison = compare(results, json.load(f)['results'], args.tolerance)
+    doc = {
+        'meta': {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'revision': _revision(),
+                 'python': platform.python_version(), 'machine': platform.machine(),
+                 'seconds': args.seconds},
+        'results': results,
+    }
+    if comparison:
+        doc['comparison'] = comparison
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=2)
+            f.write('\n')
+    if args.json:
+        print(json.dumps(doc, indent=2))
+    else:
+        report(results, comparison)
+    return 1 if any(c['regressed'] for c in comparison.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
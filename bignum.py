@@ -0,0 +1,247 @@
+# bignum.py
+# Fixed-size currency number: a float mantissa and an int exponent (value = m * 10**e).
+# Below EXACT_LIMIT the value is kept as a plain float with e == 0, which is exact for
+# whole numbers, so early-game currency behaves exactly like before. Above it the
+# mantissa is normalised to [1, 10) and arithmetic stays O(1) however large it gets.
+import math
+
+EXACT_LIMIT = 1e15
+# exponent gap beyond which the smaller operand cannot change a sum
+_PRECISION_DIGITS = 17
+_SUFFIXES = ['', 'K', 'M', 'B', 'T']
+
+
+class Big:
+    __slots__ = ('m', 'e')
+
+    def __init__(self, value=0, exp=0):
+        if isinstance(value, Big):
+            self.m, self.e = value.m, value.e
+            return
+        m, e = _normalise(float(value) if isinstance(value, int) and abs(value) < EXACT_LIMIT else value, exp)
+        self.m = m
+        self.e = e
+
+    # --- conversion ---
+
+    @classmethod
+    def _raw(cls, m, e):
+        b = object.__new__(cls)
+        b.m, b.e = _normalise(m, e)
+        return b
+
+    def __float__(self):
+        try:
+            return self.m * 10.0 ** self.e
+        except OverflowError:
+            return math.copysign(math.inf, self.m)
+
+    def __int__(self):
+        if self.e == 0:
+            return int(self.m)
+        # keep the 15 significant digits the mantissa holds, then shift exactly
+        return int(round(self.m * 10 ** 15)) * 10 ** (self.e - 15)
+
+    def __bool__(self):
+        return self.m != 0
+
+    def floor(self):
+        """Round down to a whole number (a no-op once the value is past EXACT_LIMIT)."""
+        if self.e == 0:
+            return Big._raw(math.floor(self.m), 0)
+        return self
+
+    def log10(self) -> float:
+        """log10 of a positive value, without converting it to a (possibly inf) float."""
+        return math.log10(self.m) + self.e
+
+    def to_json(self):
+        """[mantissa, exponent] pair; exact (the mantissa is a double either way)."""
+        return [self.m, self.e]
+
+    @classmethod
+    def from_json(cls, v):
+        if isinstance(v, Big):
+            return v
+        if isinstance(v, (list, tuple)) and len(v) == 2:
+            return cls._raw(float(v[0]), int(v[1]))
+        if isinstance(v, str):
+            return cls(float(v)) if 'e' not in v.lower() else _parse_sci(v)
+        return cls(v)
+
+    # --- arithmetic ---
+
+    def __add__(self, other):
+        o = _big(other)
+        if o is NotImplemented:
+            return o
+        if self.e == o.e:
+            return Big._raw(self.m + o.m, self.e)
+        hi, lo = (self, o) if self.e > o.e else (o, self)
+        if hi.e - lo.e > _PRECISION_DIGITS:
+            return hi
+        return Big._raw(hi.m + lo.m * 10.0 ** (lo.e - hi.e), hi.e)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Big._raw(-self.m, self.e)
+
+    def __abs__(self):
+        return Big._raw(abs(self.m), self.e)
+
+    def __sub__(self, other):
+        o = _big(other)
+        if o is NotImplemented:
+            return o
+        return self + (-o)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        o = _big(other)
+        if o is NotImplemented:
+            return o
+        return Big._raw(self.m * o.m, self.e + o.e)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        o = _big(other)
+        if o is NotImplemented:
+            return o
+        return Big._raw(self.m / o.m, self.e - o.e)
+
+    def __rtruediv__(self, other):
+        return _big(other) / self
+
+    def __floordiv__(self, other):
+        return (self / other).floor()
+
+    # --- comparison ---
+
+    def _key(self):
+        # (sign, exponent, mantissa) in normalised scientific form, ordered for comparison
+        if self.m == 0:
+            return (0, 0, 0.0)
+        m, e = self.m, self.e
+        if e == 0:
+            exp = math.floor(math.log10(abs(m)))
+            m, e = m / 10.0 ** exp, exp
+        sign = 1 if m > 0 else -1
+        return (sign, sign * e, m)
+
+    def _cmp(self, other):
+        o = _big(other)
+        if o is NotImplemented:
+            return o
+        if self.e == 0 and o.e == 0:
+            a, b = self.m, o.m
+        else:
+            a, b = self._key(), o._key()
+        return (a > b) - (a < b)
+
+    def __eq__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c == 0
+
+    def __lt__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c < 0
+
+    def __le__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c <= 0
+
+    def __gt__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c > 0
+
+    def __ge__(self, other):
+        c = self._cmp(other)
+        return c if c is NotImplemented else c >= 0
+
+    def __hash__(self):
+        if self.e == 0:
+            return hash(self.m)
+        return hash((self.m, self.e))
+
+    # --- formatting ---
+
+    def __str__(self):
+        return short(self)
+
+    def __repr__(self):
+        return f'Big({self.m!r}, {self.e})'
+
+    def __format__(self, spec):
+        if not spec:
+            return short(self)
+        return format(float(self), spec)
+
+
+def _normalise(m, e):
+    if isinstance(m, int):
+        # exact big ints arrive here: split off the exponent without going through float
+        digits = len(str(abs(m))) - 1
+        if digits <= 15:
+            m = float(m)
+        else:
+            shift = digits - 15
+            m = (m // 10 ** shift) / 1e15
+            e += shift + 15
+            return m, e
+    if m == 0 or math.isinf(m) or math.isnan(m):
+        return (0.0 if m == 0 else m), 0
+    if e == 0 and abs(m) < EXACT_LIMIT:
+        return m, 0
+    exp = math.floor(math.log10(abs(m)))
+    m = m / 10.0 ** exp
+    e += exp
+    # float rounding can leave the mantissa at 10.0 or just under 1.0
+    if abs(m) >= 10.0:
+        m /= 10.0
+        e += 1
+    elif abs(m) < 1.0:
+        m *= 10.0
+        e -= 1
+    if e < 15:
+        return m * 10.0 ** e, 0
+    return m, e
+
+
+def _big(v):
+    if isinstance(v, Big):
+        return v
+    if isinstance(v, (int, float)):
+        return Big(v)
+    return NotImplemented
+
+
+def _parse_sci(text: str):
+    mant, _, exp = text.lower().partition('e')
+    return Big._raw(float(mant), int(exp))
+
+
+def pow_big(base: float, n) -> Big:
+    """base ** n as a Big, via logarithms so huge exponents cannot overflow."""
+    if n == 0:
+        return Big(1)
+    log = n * math.log10(base)
+    whole = math.floor(log)
+    return Big._raw(10.0 ** (log - whole), whole)
+
+
+def short(value) -> str:
+    """Short display form: 950, 12.3K, 4.56B, 1.23e45."""
+    b = _big(value)
+    if b is NotImplemented:
+        return str(value)
+    if b.e == 0:
+        v = b.m
+        if abs(v) < 1000:
+            return str(int(v)) if v == int(v) else f'{v:.1f}'
+        tier = min(int(math.log10(abs(v)) // 3), len(_SUFFIXES) - 1)
+        return f'{v / 10 ** (3 * tier):.2f}'.rstrip('0').rstrip('.') + _SUFFIXES[tier]
+    return f'{b.m:.2f}e{b.e}'
@@ -0,0 +1,98 @@
+# broadcast.py
+# Fan-out of one screen to many viewers. Each published frame is encoded once, as a
+# line diff against the previous one (frames.py), with a full keyframe every
+# KEYFRAME_EVERY frames, and the same bytes are queued for every subscriber.
+#
+# A subscriber's queue is bounded in bytes. When a slow viewer would go over, its
+# backlog is dropped and replaced by a keyframe of the latest screen, so it skips ahead
+# instead of falling further behind. That keyframe is also encoded at most once per
+# frame, however many viewers need it.
+import asyncio
+from collections import deque
+
+import frames
+
+KEYFRAME_EVERY = 100
+MAX_BACKLOG_BYTES = 64 * 1024
+
+
+class Subscriber:
+    def __init__(self, hub):
+        self.hub = hub
+        self.skipped = 0          # times the backlog was dropped for a keyframe
+        self.closed = False
+        self._queue = deque()
+        self._bytes = 0
+        self._ready = asyncio.Event()
+
+    def _push(self, msg: bytes):
+        if self._bytes + len(msg) > self.hub.max_backlog:
+            self._queue.clear()
+            self._bytes = 0
+            self.skipped += 1
+            msg = self.hub.keyframe()
+        self._queue.append(msg)
+        self._bytes += len(msg)
+        self._ready.set()
+
+    async def get(self):
+        """Next message to send, or None once the hub or subscriber is closed."""
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        msg = self._queue.popleft()
+        self._bytes -= len(msg)
+        return msg
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+        self.hub.subscribers.discard(self)
+
+
+class Hub:
+    def __init__(self, keyframe_every: int = KEYFRAME_EVERY, max_backlog: int = MAX_BACKLOG_BYTES):
+        self.keyframe_every = keyframe_every
+        self.max_backlog = max_backlog
+        self.subscribers = set()
+        self.lines = None
+        self.seq = 0
+        self._key_seq = -1
+        self._key = None
+
+    def keyframe(self) -> bytes:
+        """Keyframe of the latest screen (encoded once per frame)."""
+        if self._key_seq != self.seq:
+            self._key = frames.keyframe(self.lines or [])
+            self._key_seq = self.seq
+        return self._key
+
+    def publish(self, lines: list):
+        """Queue the change to `lines` for every subscriber; no-op if nothing changed."""
+        if self.lines is not None and lines == self.lines:
+            return
+        prev = self.lines
+        self.seq += 1
+        self.lines = list(lines)
+        if prev is None or self.seq % self.keyframe_every == 0:
+            msg = self.keyframe()
+        else:
+            msg = frames.frame(prev, self.lines)
+            if msg[:1] == frames.KEYFRAME:
+                self._key, self._key_seq = msg, self.seq
+        for sub in list(self.subscribers):
+            sub._push(msg)
+
+    def subscribe(self) -> Subscriber:
+        """A new viewer; it starts from a keyframe of the current screen."""
+        sub = Subscriber(self)
+        if self.lines is not None:
+            sub._push(self.keyframe())
+        self.subscribers.add(sub)
+        return sub
+
+    def close(self):
+        for sub in list(self.subscribers):
+            sub.close()
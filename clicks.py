@@ -0,0 +1,38 @@
+# clicks.py
+# Click accumulator. The keyboard thread only bumps a counter; the logic tick drains
+# it and applies every press since the last tick in one batch.
+#
+# next() on an itertools.count is a single C call, so it is atomic under the GIL and
+# needs no lock. The drainer can't peek at the counter without advancing it, so it
+# advances it too and subtracts its own calls.
+import itertools
+import state
+
+_presses = itertools.count()
+_drains = 0
+_applied = 0
+
+
+def record_press():
+    """Count one press. Safe to call from any thread."""
+    next(_presses)
+
+
+def drain() -> int:
+    """Number of presses since the last drain. Call from the logic tick only."""
+    global _drains, _applied
+    seen = next(_presses) - _drains
+    _drains += 1
+    n = seen - _applied
+    _applied = seen
+    return n
+
+
+def apply_pending() -> int:
+    """Apply all pending presses to the run in one step; returns how many there were."""
+    n = drain()
+    if n:
+        state.count += n * state.per_click
+        if state.count > getattr(state, 'run_max_count', 0):
+            state.run_max_count = state.count
+    return n
@@ -0,0 +1,65 @@
+# client.py
+# Terminal client for server.py: forwards local key events and draws the frames it gets
+# back. With --watch it spectates the session instead, sending nothing.
+# Usage: python client.py NAME [--watch] [--host 127.0.0.1 --port 7777 | --unix PATH]
+import argparse
+import asyncio
+import sys
+
+import keyboard
+import frames
+
+
+async def play(name: str, host: str, port: int, unix: str = None, watch: bool = False):
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    loop = asyncio.get_running_loop()
+
+    def forward(event):
+        if event.name:
+            msg = frames.key(event.name.lower(), event.event_type == keyboard.KEY_DOWN)
+            loop.call_soon_threadsafe(writer.write, msg)
+
+    if watch:
+        writer.write(frames.watch(name))
+        hook = None
+    else:
+        writer.write(frames.hello(name))
+        hook = keyboard.hook(forward)
+    screen = None
+    try:
+        while True:
+            msg = await frames.read_message(reader)
+            if msg is None:
+                break
+            kind, payload = msg
+            if kind == frames.BYE:
+                print(payload.decode('utf-8', 'replace'))
+                break
+            screen = frames.apply(screen, kind, payload)
+            sys.stdout.write('\x1b[H\x1b[2J' + '\n'.join(screen) + '\n')
+            sys.stdout.flush()
+    finally:
+        if hook is not None:
+            keyboard.unhook(hook)
+        writer.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Play a session hosted by server.py.')
+    ap.add_argument('name', help='session name (letters, digits, - and _)')
+    ap.add_argument('--host', default=frames.DEFAULT_HOST)
+    ap.add_argument('--port', type=int, default=frames.DEFAULT_PORT)
+    ap.add_argument('--unix')
+    ap.add_argument('--watch', action='store_true', help='spectate the session instead of playing it')
+    args = ap.parse_args(argv)
+    try:
+        asyncio.run(play(args.name, args.host, args.port, args.unix, args.watch))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
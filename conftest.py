@@ -0,0 +1,29 @@
+# conftest.py
+# Shared pytest fixtures. Tests run against the real modules; anything that touches
+# disk is pointed at a temporary save directory first.
+import os
+
+import pytest
+
+import journal
+import persistence
+import state
+import world
+
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    """Point the save file, slot index and trace at `tmp_path` and forget cached disk state."""
+    monkeypatch.setattr(state, 'SAVE_DIR', str(tmp_path))
+    monkeypatch.setattr(state, 'SAVE_FILE', os.path.join(str(tmp_path), 'save.dat'))
+    monkeypatch.setattr(state, 'SLOT_INDEX_FILE', os.path.join(str(tmp_path), 'slots.json'))
+    monkeypatch.setattr(state, 'TRACE_FILE', os.path.join(str(tmp_path), 'trace.json'))
+    monkeypatch.setattr(state, 'current_slot', 1)
+    monkeypatch.setattr(persistence, '_slot_index', None)
+    monkeypatch.setattr(persistence, 'last_load_error', None)
+    monkeypatch.setattr(journal, '_seq', 0)
+    journal.reset()
+    world.reset()
+    yield tmp_path
+    journal.reset()
+    world.reset()
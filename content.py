@@ -0,0 +1,436 @@
+# content.py
+# Content packs: JSON or TOML files in PACK_DIR that add enemies, upgrades, shop stock,
+# action upgrades and meta upgrades, or replace built-in ones with the same identity
+# (see SECTIONS). Packs are applied in file name order; a later pack wins.
+#
+#   {"enemies": {"goblin": {"name": "Goblin", "base_hp": 60, "base_atk": 6,
+#                           "base_reward": 150, "spawn": 0.3, "ascii": "(g)"}},
+#    "shop_items": [{"key": "9", "name": "Spear", "cost": 400, "type": "weapon", "amount": 12}]}
+#
+# Enemies: 'spawn' is a weight among the regular room enemies (built-ins: human 0.6,
+# dart_monkey 0.4), 'boss' makes the enemy a floor boss candidate. hp_scale, atk_scale
+# and reward_mult set how stats grow per floor visit: linearly for room spawns
+# (room_scale), with extra HP growth for create_enemy_instance (scale_enemy). Room
+# spawns and create_enemy_instance (floor bosses, simulate.py) both carry the template's
+# speed and specials (battle_fields).
+#
+# Parsing and validating every pack on each start would cost more than the rest of
+# startup, so the merged result is compiled once into CACHE_NAME inside PACK_DIR, with
+# the enemy index, spawn table, boss list and per-visit stat tables precomputed. The
+# cache is reused while every source keeps its mtime and size; if a file was only
+# touched (same sha256), the cache is kept and just re-stamped. It is a marshal blob
+# like a .pyc: machine-local and rebuilt freely, so it does not use savefmt.
+#
+# Usage: python content.py [--rebuild] [DIR]   (compile and summarise the packs in DIR)
+import json
+import marshal
+import os
+import struct
+import sys
+from bisect import bisect_right
+
+import assets
+import state
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PACK_DIR = os.path.join(ROOT, 'packs')
+BUILTIN_ENEMIES = os.path.join(ROOT, 'enemies_data.py')
+CACHE_NAME = '.content-cache'
+CACHE_MAGIC = b'CPTC'
+CACHE_VERSION = 1
+_CACHE_HEAD = struct.Struct('<4sHH')
+PACK_EXTENSIONS = ('.json', '.toml')
+# stat rows precomputed per enemy; deeper floors fall back to scale_enemy()
+STAT_VISITS = 64
+# (hp_scale, atk_scale, reward_mult) for templates that do not set them
+DEFAULT_SCALING = (8, 1, 0.15)
+
+# section -> field that identifies an entry (a pack entry with the same value replaces it)
+SECTIONS = {
+    'upgrades': 'key',
+    'shop_items': 'key',
+    'late_shop_items': 'name',
+    'action_upgrades': 'id',
+    'meta_upgrades': 'id',
+}
+# runtime fields every new entry starts with
+_RUNTIME = {
+    'upgrades': {'purchased': False},
+    'shop_items': {'purchased': False},
+    'late_shop_items': {'purchased': False},
+    'action_upgrades': {'level': 0},
+    'meta_upgrades': {'purchased': False},
+}
+
+_NUM = (int, float)
+_ITEM = {'key': (str, True), 'name': (str, True), 'cost': (_NUM, True), 'type': (str, True),
+         'amount': (_NUM, True), 'subtype': (str, False)}
+# field -> (type, required)
+FIELDS = {
+    'enemies': {'name': (str, True), 'base_hp': (int, True), 'base_atk': (int, True),
+                'base_reward': (int, True), 'hp_scale': (_NUM, False), 'atk_scale': (_NUM, False),
+                'reward_mult': (_NUM, False), 'speed': (int, False), 'spawn': (_NUM, False),
+                'boss': (bool, False), 'ascii': (str, False), 'special': (dict, False),
+                'specials': (list, False)},
+    'upgrades': {'key': (str, True), 'name': (str, True), 'cost': (_NUM, True), 'type': (str, True),
+                 'amount': (_NUM, True), 'meta_req': (str, False)},
+    'shop_items': _ITEM,
+    'late_shop_items': _ITEM,
+    'action_upgrades': {'key': (str, True), 'id': (str, True), 'name': (str, True), 'desc': (str, True),
+                        'cost': (_NUM, True), 'max_level': (int, True), 'amount': (_NUM, True)},
+    'meta_upgrades': {'key': (str, True), 'id': (str, True), 'name': (str, True), 'desc': (str, True),
+                      'cost': (int, True)},
+}
+CHOICES = {
+    ('upgrades', 'type'): ('add', 'mult'),
+    ('shop_items', 'type'): ('weapon', 'armour', 'bag', 'consumable', 'accessory'),
+    ('late_shop_items', 'type'): ('weapon', 'armour', 'bag', 'consumable', 'accessory'),
+}
+
+_compiled = None
+# one message per pack that was skipped as invalid
+errors = []
+
+
+class ContentError(ValueError):
+    pass
+
+
+# --- stats ---
+
+def room_scale(tpl: dict, visits: int) -> tuple:
+    """(hp, atk, reward) of a regular room spawn: linear growth per floor visit."""
+    d_hp, d_atk, d_reward = DEFAULT_SCALING
+    hp = int(tpl.get('base_hp', 50) + visits * tpl.get('hp_scale', d_hp))
+    atk = int(tpl.get('base_atk', 5) + visits * tpl.get('atk_scale', d_atk))
+    reward = int(tpl.get('base_reward', 100) * (1 + tpl.get('reward_mult', d_reward) * visits))
+    return hp, atk, reward
+
+
+def scale_enemy(tpl: dict, visits: int) -> tuple:
+    """(hp, atk, reward) of template `tpl` on floor visit `visits` (create_enemy_instance)."""
+    d_hp = DEFAULT_SCALING[0]
+    _, atk, reward = room_scale(tpl, visits)
+    hp_base = int(tpl.get('base_hp', 50)) + visits * tpl.get('hp_scale', d_hp)
+    if visits > 0:
+        # moderate exponential-ish growth but avoid insane numbers for small tests
+        hp = int(hp_base * (1 + visits * 0.5))
+    else:
+        hp = int(hp_base)
+    return hp, atk, reward
+
+
+# --- parsing and validation ---
+
+def _type_name(t) -> str:
+    return 'a number' if t is _NUM else {str: 'a string', int: 'an integer', bool: 'true/false',
+                                         dict: 'a table', list: 'a list'}[t]
+
+
+def _check_entry(section: str, where: str, entry) -> dict:
+    if not isinstance(entry, dict):
+        raise ContentError(f'{where}: expected a table')
+    fields = FIELDS[section]
+    for name in entry:
+        if name not in fields:
+            raise ContentError(f'{where}: unknown field {name!r}')
+    for name, (kind, required) in fields.items():
+        if name not in entry:
+            if required:
+                raise ContentError(f'{where}: missing {name!r}')
+            continue
+        v = entry[name]
+        # bool is an int subclass; only 'boss' may be one
+        if not isinstance(v, kind) or (isinstance(v, bool) and kind is not bool):
+            raise ContentError(f'{where}.{name}: expected {_type_name(kind)}')
+        choices = CHOICES.get((section, name))
+        if choices and v not in choices:
+            raise ContentError(f'{where}.{name}: {v!r} is not one of {", ".join(choices)}')
+    if section == 'enemies':
+        _check_specials(where, entry)
+        if entry.get('spawn', 0) < 0:
+            raise ContentError(f'{where}.spawn: must not be negative')
+    return entry
+
+
+def _check_specials(where: str, entry: dict):
+    import effects
+    specials = [entry['special']] if 'special' in entry else []
+    specials += entry.get('specials', [])
+    for sp in specials:
+        if not isinstance(sp, dict) or sp.get('type') not in effects.EFFECT_TYPES:
+            kind = sp.get('type') if isinstance(sp, dict) else sp
+            raise ContentError(f'{where}: unknown special {kind!r} (known: {", ".join(effects.EFFECT_TYPES)})')
+
+
+def _parse(path: str) -> dict:
+    name = os.path.basename(path)
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ContentError(f'{name}: TOML packs need Python 3.11+') from None
+        try:
+            return tomllib.loads(raw.decode('utf-8'))
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ContentError(f'{name}: {e}') from None
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise ContentError(f'{name}: {e}') from None
+
+
+def read_pack(path: str) -> dict:
+    """Parse and validate one pack file. Raises ContentError."""
+    name = os.path.basename(path)
+    pack = _parse(path)
+    if not isinstance(pack, dict):
+        raise ContentError(f'{name}: expected a table at the top level')
+    for section in pack:
+        if section not in FIELDS:
+            raise ContentError(f'{name}: unknown section {section!r}')
+    enemies = pack.get('enemies', {})
+    if not isinstance(enemies, dict):
+        raise ContentError(f'{name}: enemies: expected a table of key -> enemy')
+    for key, tpl in enemies.items():
+        _check_entry('enemies', f'{name}: enemies.{key}', tpl)
+    for section, ident in SECTIONS.items():
+        entries = pack.get(section, [])
+        if not isinstance(entries, list):
+            raise ContentError(f'{name}: {section}: expected a list')
+        for i, entry in enumerate(entries):
+            _check_entry(section, f'{name}: {section}[{i}]', entry)
+    return pack
+
+
+def _builtin_enemies() -> dict:
+    try:
+        from enemies_data import ENEMY_TEMPLATES
+    except ImportError:
+        # packs compiled outside the game tree (python content.py DIR) have no built-ins
+        return {}
+    return ENEMY_TEMPLATES
+
+
+def compile_packs(paths) -> dict:
+    """Merge the built-in enemies and the packs at `paths` into the cached form."""
+    enemies = {key: dict(tpl) for key, tpl in _builtin_enemies().items()}
+    sections = {section: {} for section in SECTIONS}
+    problems = []
+    for path in paths:
+        try:
+            pack = read_pack(path)
+        except (ContentError, OSError) as e:
+            problems.append(str(e))
+            continue
+        enemies.update(pack.get('enemies', {}))
+        for section, ident in SECTIONS.items():
+            for entry in pack.get(section, []):
+                sections[section][entry[ident]] = entry
+    spawn_keys, spawn_cum, total = [], [], 0.0
+    for key, tpl in enemies.items():
+        if tpl.get('spawn', 0) > 0:
+            total += tpl['spawn']
+            spawn_keys.append(key)
+            spawn_cum.append(total)
+    return {
+        'enemies': enemies,
+        'stats': {key: tuple(scale_enemy(tpl, v) for v in range(STAT_VISITS)) for key, tpl in enemies.items()},
+        'room_stats': {key: tuple(room_scale(enemies[key], v) for v in range(STAT_VISITS)) for key in spawn_keys},
+        'spawn_keys': spawn_keys,
+        'spawn_cum': spawn_cum,
+        'bosses': [key for key, tpl in enemies.items() if tpl.get('boss')],
+        'sections': {section: list(entries.values()) for section, entries in sections.items()},
+        'errors': problems,
+    }
+
+
+# --- cache ---
+
+def pack_files(pack_dir: str) -> list:
+    try:
+        names = sorted(n for n in os.listdir(pack_dir) if n.endswith(PACK_EXTENSIONS))
+    except OSError:
+        return []
+    return [os.path.join(pack_dir, n) for n in names]
+
+
+def _stamp(path: str) -> list:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return [path, 0, -1]
+    return [path, st.st_mtime_ns, st.st_size]
+
+
+def _digest(path: str) -> str:
+    import hashlib
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ''
+
+
+def _read_cache(path: str):
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        magic, version, marshal_version = _CACHE_HEAD.unpack_from(raw)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or marshal_version != marshal.version:
+            return None
+        return marshal.loads(raw[_CACHE_HEAD.size:])
+    except (OSError, struct.error, ValueError, EOFError, TypeError):
+        return None
+
+
+def _write_cache(path: str, compiled: dict):
+    tmp = path + '.tmp'
+    try:
+        with open(tmp, 'wb') as f:
+            f.write(_CACHE_HEAD.pack(CACHE_MAGIC, CACHE_VERSION, marshal.version))
+            f.write(marshal.dumps(compiled))
+        os.replace(tmp, path)
+    except OSError:
+        # read-only install: run from the in-memory compile
+        pass
+
+
+def load(pack_dir: str = None, rebuild: bool = False) -> dict:
+    """The compiled content for `pack_dir`, from its cache when still valid.
+
+    Without `pack_dir`: whatever was loaded last, else PACK_DIR.
+    """
+    global _compiled, errors
+    if _compiled is not None and not rebuild and pack_dir in (None, _compiled['dir']):
+        return _compiled
+    pack_dir = PACK_DIR if pack_dir is None else pack_dir
+    paths = [BUILTIN_ENEMIES] + pack_files(pack_dir)
+    stamps = [_stamp(p) for p in paths]
+    cache_file = os.path.join(pack_dir, CACHE_NAME)
+    cached = None if rebuild else _read_cache(cache_file)
+    if cached is not None and [s[:3] for s in cached.get('sources', [])] == stamps:
+        compiled = cached
+    else:
+        # nowhere to keep a cache without a pack directory: skip hashing too
+        can_cache = os.path.isdir(pack_dir)
+        digests = [_digest(p) if can_cache else '' for p in paths]
+        if cached is not None and \
+                [[s[0], s[3]] for s in cached.get('sources', [])] == [[p, d] for p, d in zip(paths, digests)]:
+            compiled = cached
+        else:
+            compiled = compile_packs(paths[1:])
+        compiled['sources'] = [stamp + [d] for stamp, d in zip(stamps, digests)]
+        if can_cache:
+            _write_cache(cache_file, compiled)
+    compiled['dir'] = pack_dir
+    _compiled = compiled
+    errors = list(compiled['errors'])
+    return compiled
+
+
+def enemies() -> dict:
+    """Enemy templates by key: built-ins plus packs."""
+    return load()['enemies']
+
+
+def enemy_stats(key: str, visits: int) -> tuple:
+    """(hp, atk, reward) for enemy `key` on floor visit `visits`; None if unknown."""
+    compiled = load()
+    table = compiled['stats'].get(key)
+    if table is None:
+        return None
+    if 0 <= visits < len(table):
+        return table[visits]
+    return scale_enemy(compiled['enemies'][key], visits)
+
+
+def spawn_key(r: float):
+    """Regular room enemy for a uniform draw r in [0, 1), by spawn weight."""
+    compiled = load()
+    cum = compiled['spawn_cum']
+    if not cum:
+        return None
+    return compiled['spawn_keys'][min(bisect_right(cum, r * cum[-1]), len(cum) - 1)]
+
+
+def room_enemy(r: float, visits: int):
+    """A regular room enemy (spawn_key(r)) on the linear room curve; None if none spawn."""
+    key = spawn_key(r)
+    if key is None:
+        return None
+    compiled = load()
+    tpl = compiled['enemies'][key]
+    table = compiled['room_stats'][key]
+    hp, atk, reward = table[visits] if 0 <= visits < len(table) else room_scale(tpl, visits)
+    enemy = {'name': tpl['name'], 'hp': hp, 'atk': atk, 'reward': reward, 'ascii': assets.enemy_art(key, tpl)}
+    enemy.update(battle_fields(tpl))
+    return enemy
+
+
+def battle_fields(tpl: dict) -> dict:
+    """The template fields battles read besides the stats: speed (pack initiative) and
+    specials (effects.py), copied so an instance never shares them with its template."""
+    out = {}
+    if 'speed' in tpl:
+        out['speed'] = int(tpl['speed'])
+    if 'special' in tpl:
+        out['special'] = dict(tpl['special'])
+    if 'specials' in tpl:
+        out['specials'] = [dict(sp) for sp in tpl['specials']]
+    return out
+
+
+def boss_keys() -> list:
+    return load()['bosses']
+
+
+def apply(pack_dir: str = None) -> list:
+    """Merge pack entries into state's content lists; returns the pack errors.
+
+    Call once at startup, before a game is started or loaded. Without a pack
+    directory this does nothing, so plain starts pay for no parsing at all.
+    """
+    pack_dir = PACK_DIR if pack_dir is None else pack_dir
+    if not os.path.isdir(pack_dir):
+        return []
+    compiled = load(pack_dir)
+    for section, ident in SECTIONS.items():
+        target = getattr(state, section)
+        index = {entry.get(ident): i for i, entry in enumerate(target)}
+        for entry in compiled['sections'][section]:
+            entry = dict(_RUNTIME[section], **entry)
+            i = index.get(entry[ident])
+            if i is None:
+                index[entry[ident]] = len(target)
+                target.append(entry)
+            else:
+                target[i] = entry
+    for m in state.meta_upgrades:
+        state.meta_upgrades_state.setdefault(m['id'], m['purchased'])
+    return errors
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    rebuild = '--rebuild' in argv
+    args = [a for a in argv if a != '--rebuild']
+    if len(args) > 1:
+        print('usage: python content.py [--rebuild] [DIR]', file=sys.stderr)
+        return 2
+    pack_dir = os.path.abspath(args[0]) if args else PACK_DIR
+    compiled = load(pack_dir, rebuild=rebuild)
+    print(f'{len(compiled["sources"]) - 1} pack(s) in {pack_dir}')
+    print(f'enemies: {len(compiled["enemies"])} ({len(compiled["spawn_keys"])} spawning, '
+          f'{len(compiled["bosses"])} boss)')
+    for section in SECTIONS:
+        print(f'{section}: {len(compiled["sections"][section])} from packs')
+    for err in errors:
+        print(f'skipped: {err}')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,194 @@
+# effects.py
+# Status effects for battles. Effect types live in a registry (EFFECT_TYPES): each one
+# names its default target and the handlers run when it is applied, each turn it is
+# active, and when it wears off. Live effects are small [type, magnitude, expires_turn]
+# lists per combatant in status['effects'], and their future events sit in a
+# turn-indexed bucket queue (status['effect_queue']), so ending a turn only touches the
+# effects that fire or expire on that turn.
+#
+# Enemy specials are plain data on the template: 'special' (one dict) or 'specials' (a
+# list), each {'type': <registered effect>, 'chance': p, 'amount': n, 'duration': t,
+# 'when': 'hit' | 'start'}. 'hit' rolls each time the enemy attacks, 'start' applies
+# once when the battle begins.
+
+EFFECT_TYPES = {}
+
+
+def register(name, target='player', apply=None, tick=None, expire=None, stacks=False):
+    """Register an effect type. Handlers are fn(target, status, inst, log).
+
+    Without `stacks`, reapplying a live effect refreshes it (larger magnitude, later
+    expiry) instead of adding a second instance.
+    """
+    EFFECT_TYPES[name] = {'target': target, 'apply': apply, 'tick': tick, 'expire': expire, 'stacks': stacks}
+
+
+# --- queue ---
+
+def _schedule(status, turn, who, inst, event):
+    status.setdefault('effect_queue', {}).setdefault(turn, []).append((who, inst, event))
+
+
+def add(status, who, target, kind, magnitude, duration, log):
+    """Apply effect `kind` to `who` ('player' or 'enemy'); `target` is that combatant's dict."""
+    spec = EFFECT_TYPES[kind]
+    turn = status.get('turn', 0)
+    expires = turn + max(1, int(duration))
+    live = status.setdefault('effects', {}).setdefault(who, [])
+    if not spec['stacks']:
+        for inst in live:
+            if inst[0] == kind:
+                if magnitude > inst[1] and spec['apply']:
+                    # undo the weaker application first, so expire gives back what apply took
+                    if spec['expire']:
+                        spec['expire'](target, status, inst, log)
+                    inst[1] = magnitude
+                    spec['apply'](target, status, inst, log)
+                inst[1] = max(inst[1], magnitude)
+                if expires > inst[2]:
+                    # the old expiry event goes stale and is skipped when its bucket comes up
+                    inst[2] = expires
+                    _schedule(status, expires, who, inst, 'expire')
+                return inst
+    inst = [kind, magnitude, expires]
+    live.append(inst)
+    if spec['apply']:
+        spec['apply'](target, status, inst, log)
+    if spec['tick']:
+        _schedule(status, turn + 1, who, inst, 'tick')
+    _schedule(status, expires, who, inst, 'expire')
+    return inst
+
+
+def _is_live(lst, inst) -> bool:
+    # identity, not ==: stacked instances of one effect compare equal
+    return any(x is inst for x in lst or ())
+
+
+def active(status, who, kind) -> bool:
+    return any(inst[0] == kind for inst in status.get('effects', {}).get(who, ()))
+
+
+def end_turn(player, enemy, status, log):
+    """Advance the effect clock one turn and run what is due on it."""
+    turn = status.get('turn', 0) + 1
+    status['turn'] = turn
+    queue = status.get('effect_queue')
+    if not queue:
+        return
+    events = queue.pop(turn, None)
+    if not events:
+        return
+    targets = {'player': player, 'enemy': enemy}
+    live = status.get('effects', {})
+    # ticks first, so an effect lasting N turns fires N times
+    for who, inst, event in events:
+        if event != 'tick' or not _is_live(live.get(who), inst):
+            continue
+        target = targets.get(who)
+        if target is not None:
+            EFFECT_TYPES[inst[0]]['tick'](target, status, inst, log)
+        if inst[2] > turn:
+            _schedule(status, turn + 1, who, inst, 'tick')
+    for who, inst, event in events:
+        if event != 'expire' or inst[2] != turn:
+            continue
+        lst = live.get(who)
+        if not _is_live(lst, inst):
+            continue
+        lst[:] = [x for x in lst if x is not inst]
+        spec = EFFECT_TYPES[inst[0]]
+        if spec['expire'] and targets.get(who) is not None:
+            spec['expire'](targets[who], status, inst, log)
+
+
+# --- specials ---
+
+def specials(enemy) -> list:
+    """The enemy's declared specials as a list of dicts."""
+    out = []
+    one = enemy.get('special')
+    if isinstance(one, dict):
+        out.append(one)
+    many = enemy.get('specials')
+    if isinstance(many, (list, tuple)):
+        out.extend(s for s in many if isinstance(s, dict))
+    return out
+
+
+def _trigger(special, player, enemy, status, log):
+    kind = special.get('type')
+    spec = EFFECT_TYPES.get(kind)
+    if spec is None:
+        return
+    who = special.get('target', spec['target'])
+    target = player if who == 'player' else enemy
+    add(status, who, target, kind, special.get('amount', 1), special.get('duration', 1), log)
+    if kind == 'stun':
+        log.append(f"{enemy.get('name', 'Enemy')} stunned you for {int(special.get('duration', 1))} turn(s)!")
+
+
+def on_hit(player, enemy, status, rng, log):
+    """Roll the enemy's on-hit specials after it attacks."""
+    for special in specials(enemy):
+        if special.get('when', 'hit') != 'hit':
+            continue
+        if rng.random() < float(special.get('chance', 1.0)):
+            _trigger(special, player, enemy, status, log)
+
+
+def on_start(player, enemy, status, log):
+    """Apply the enemy's battle-start specials (auras, regeneration, ...)."""
+    for special in specials(enemy):
+        if special.get('when') == 'start':
+            _trigger(special, player, enemy, status, log)
+
+
+def hit_chance(enemy) -> float:
+    """Chance that at least one on-hit special procs on an attack."""
+    miss = 1.0
+    for special in specials(enemy):
+        if special.get('when', 'hit') == 'hit' and special.get('type') in EFFECT_TYPES:
+            miss *= 1.0 - float(special.get('chance', 1.0))
+    return 1.0 - miss
+
+
+# --- built-in effects ---
+
+def _stun_apply(target, status, inst, log):
+    # stuns are consumed by the player's turns (battle_core.apply_action), not the clock
+    status['player_stunned'] = True
+    status['stun_duration'] = inst[2] - status.get('turn', 0)
+
+
+def _poison_tick(target, status, inst, log):
+    target['hp'] -= inst[1]
+    log.append(f'Poison deals {inst[1]} damage')
+
+
+def _regen_tick(target, status, inst, log):
+    cap = target.get('max_hp')
+    before = target['hp']
+    target['hp'] = min(cap, before + inst[1]) if cap else before + inst[1]
+    if target['hp'] > before:
+        log.append(f"{target.get('name', 'You')} regenerates {target['hp'] - before} HP")
+
+
+def _shield_decay_tick(target, status, inst, log):
+    status['player_shield'] = max(0, status.get('player_shield', 0) - inst[1])
+
+
+def _weaken_apply(target, status, inst, log):
+    status['player_buff'] = status.get('player_buff', 0) - inst[1]
+    log.append(f'Your attack is weakened by {inst[1]}')
+
+
+def _weaken_expire(target, status, inst, log):
+    status['player_buff'] = status.get('player_buff', 0) + inst[1]
+
+
+register('stun', apply=_stun_apply, stacks=True)
+register('poison', tick=_poison_tick, stacks=True)
+register('regen', target='enemy', tick=_regen_tick)
+register('shield_decay', tick=_shield_decay_tick)
+register('weaken', apply=_weaken_apply, expire=_weaken_expire)
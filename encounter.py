@@ -0,0 +1,173 @@
+# encounter.py
+# Multi-enemy battles. Combatant stats live in parallel arrays (one slot per enemy) and
+# turn order comes from a heap of (next action time, seq, slot): a combatant with speed s
+# acts every SPEED_SCALE / s time units, so faster enemies act more often. The player
+# is slot PLAYER.
+#
+# After each player action every enemy turn due before the player's next one is popped
+# and resolved as one batch: the raw hits are summed over the arrays and the player's
+# shield is applied to the total once, which gives the same damage as resolving the hits
+# one by one. A turn costs O(k log n) for k enemy turns and n combatants, with dead
+# enemies dropped lazily from the heap.
+import heapq
+from array import array
+
+import battle_core
+import effects
+
+PLAYER = -1
+SPEED_SCALE = 1000
+DEFAULT_SPEED = 10
+# packs only form from this map_visit_count on, within this many tiles of the engaged enemy
+PACK_MIN_VISITS = 3
+PACK_RADIUS = 4
+PACK_MAX = 12
+
+
+def gather_pack(enemies: dict, pos, map_visit_count: int) -> list:
+    """Positions of the enemies that join a fight started at `pos`, engaged enemy first."""
+    if map_visit_count < PACK_MIN_VISITS:
+        return [pos]
+    py, px = pos
+    near = sorted((abs(y - py) + abs(x - px), (y, x)) for (y, x) in enemies
+                  if (y, x) != pos and abs(y - py) <= PACK_RADIUS and abs(x - px) <= PACK_RADIUS)
+    return [pos] + [p for _, p in near[:PACK_MAX - 1]]
+
+
+class Encounter:
+    def __init__(self, enemies: list, positions: list = None, player_speed: int = DEFAULT_SPEED):
+        n = len(enemies)
+        self.names = [e.get('name', 'Enemy') for e in enemies]
+        self.templates = [dict(e) for e in enemies]
+        self.positions = list(positions) if positions else [None] * n
+        self.hp = array('l', (int(e.get('hp', 1)) for e in enemies))
+        self.max_hp = array('l', (int(e.get('max_hp', e.get('hp', 1))) for e in enemies))
+        self.atk = array('l', (int(e.get('atk', 0)) for e in enemies))
+        self.speed = array('l', (max(1, int(e.get('speed', DEFAULT_SPEED))) for e in enemies))
+        self.reward = array('l', (int(e.get('reward', 0)) for e in enemies))
+        # only enemies with specials need per-hit work
+        self.specials = [i for i, e in enumerate(enemies) if effects.specials(e)]
+        self.alive = n
+        self.target = 0
+        self.player_speed = max(1, player_speed)
+        self.now = 0
+        self._seq = 0
+        self._heap = []
+        self._push(PLAYER, 0)
+        for i in range(n):
+            self._push(i, SPEED_SCALE // self.speed[i])
+
+    def _push(self, slot, at):
+        self._seq += 1
+        heapq.heappush(self._heap, (at, self._seq, slot))
+
+    # --- views ---
+
+    def target_view(self) -> dict:
+        """The current target as an enemy dict (for battle_core and rendering)."""
+        i = self.target
+        view = dict(self.templates[i])
+        view.update(hp=self.hp[i], max_hp=self.max_hp[i], atk=self.atk[i], pack_size=self.alive)
+        return view
+
+    def pressure(self) -> float:
+        """Expected raw attack landing per player turn from every living enemy."""
+        per_turn = 0.0
+        for i in range(len(self.hp)):
+            if self.hp[i] > 0:
+                per_turn += self.atk[i] * self.speed[i] / self.player_speed
+        return per_turn
+
+    def total_reward(self) -> int:
+        return sum(self.reward)
+
+    def _retarget(self):
+        if self.hp[self.target] > 0:
+            return
+        for i in range(len(self.hp)):
+            if self.hp[i] > 0:
+                self.target = i
+                return
+
+    def select_target(self, index: int) -> bool:
+        if 0 <= index < len(self.hp) and self.hp[index] > 0:
+            self.target = index
+            return True
+        return False
+
+    def next_target(self) -> bool:
+        """Target the next living enemy after the current one (wrapping around)."""
+        n = len(self.hp)
+        return any(self.select_target((self.target + step) % n) for step in range(1, n))
+
+    def start(self, player, status, log=None):
+        """Apply every member's battle-start specials, as effects.on_start does for one enemy."""
+        if log is None:
+            log = []
+        for i in self.specials:
+            effects.on_start(player, self.templates[i], status, log)
+        return log
+
+    # --- turns ---
+
+    def player_turn(self, player, status, action, bonuses, map_visit_count, rng, log=None):
+        """One player action against the target, then every enemy turn due before the
+        player's next one. Returns (result, log) like battle_core.resolve_turn."""
+        if log is None:
+            log = []
+        view = {'hp': self.hp[self.target], 'atk': self.atk[self.target], 'name': self.names[self.target]}
+        result = battle_core.apply_action(player, view, status, action, bonuses, map_visit_count, log)
+        if result == battle_core.INVALID:
+            return result, log
+        self.hp[self.target] = view['hp']
+        if view['hp'] <= 0:
+            self.alive -= 1
+            log.append(f'{self.names[self.target]} is defeated!')
+            if not self.alive:
+                return battle_core.WIN, log
+            self._retarget()
+        # the player's entry is always on top between turns
+        self.now = heapq.heappop(self._heap)[0]
+        self._push(PLAYER, self.now + SPEED_SCALE // self.player_speed)
+        self._enemy_phase(player, status, rng, log)
+        # effects on pack members themselves (e.g. regen) do not tick; only the player's run
+        effects.end_turn(player, None, status, log)
+        if player['hp'] <= 0:
+            return battle_core.LOSE, log
+        return battle_core.CONTINUE, log
+
+    def _enemy_phase(self, player, status, rng, log):
+        """Pop enemy turns until the player is next, and resolve them as one batch."""
+        heap = self._heap
+        hp = self.hp
+        actors = []
+        while heap:
+            at, _, slot = heapq.heappop(heap)
+            if slot == PLAYER:
+                # put the player back on top; they act next
+                heapq.heappush(heap, (at, 0, PLAYER))
+                break
+            if hp[slot] <= 0:
+                continue
+            actors.append(slot)
+            self._push(slot, at + SPEED_SCALE // self.speed[slot])
+        if not actors:
+            return
+        debuff = status.get('enemy_debuff', 0)
+        defense = player['defense']
+        atk = self.atk
+        # per hit, shield absorbs what gets past defense; summed over the batch that is
+        # max(0, total excess - shield), with the shield reduced by the total excess
+        excess = sum(max(0, max(0, atk[i] - debuff) - defense) for i in actors)
+        shield = status.get('player_shield', 0)
+        damage = max(0, excess - shield)
+        status['player_shield'] = max(0, shield - excess)
+        if damage > 0:
+            player['hp'] -= damage
+        if len(actors) > 1:
+            log.append(f'{len(actors)} enemies hit you for {damage} total')
+        if self.specials:
+            templates = self.templates
+            for i in actors:
+                if 'special' in templates[i] or 'specials' in templates[i]:
+                    effects.on_hit(player, templates[i], status, rng, log)
@@ -1,71 +1,36 @@
 # enemies_data.py
-import random
-
-# Enemy templates: name, base_hp, base_atk, base_reward, optional special (dict), ascii
+# Enemy templates: name, base_hp, base_atk, base_reward, optional speed,
+# optional special (dict) / specials (list of dicts, see effects.py). Art is the asset
+# of the same key (assets.py), else an inline 'ascii'.
+# hp_scale / atk_scale / reward_mult: growth per floor visit (content.scale_enemy);
+# spawn: weight among regular room enemies; boss: floor boss candidate.
+# Content packs add to / override these (content.py).
 ENEMY_TEMPLATES = {
     'human': {
         'name': 'Human',
         'base_hp': 80,
         'base_atk': 4,
         'base_reward': 200,
-        'ascii': "  ,      ,\n (\\_/)\n (o.o)\n  >^ "
+        'hp_scale': 10, 'atk_scale': 1, 'reward_mult': 0.2,
+        'spawn': 0.6,
     },
     'dart_monkey': {
         'name': 'Dart Monkey',
         'base_hp': 130,
         'base_atk': 12,
         'base_reward': 450,
-        'ascii': "  ,--.\n (____)\n /||\\\\\n  ||"
+        'hp_scale': 18, 'atk_scale': 2, 'reward_mult': 0.2,
+        'spawn': 0.4,
+        'speed': 14,
     },
     'teto_boss': {
         'name': 'Teto (Boss)',
         'base_hp': 400,
         'base_atk': 25,
         'base_reward': 2000,
+        'hp_scale': 40, 'atk_scale': 4, 'reward_mult': 0.5,
+        'boss': True,
+        'speed': 8,
         'special': {'type': 'stun', 'chance': 0.25, 'duration': 1},
-        'ascii': (
-            "   .-=========-.\n"
-            "  .-===;  _   _  ;===-.\n"
-            " /_   _| (o) (o) |_   _\\\n"
-            "((_\\ (_ ,  .---.  , _) /_))\n"
-            "   `-.__\\_/`---'\\_/__.-'\n"
-            "       _/          \\_\n"
-            "     /`   .-----.   `\\\n"
-            "    /     |     |     \\\n"
-            "   /      |     |      \\\n"
-            "  |       '.___.'       |\n"
-            "   \\                   /\n"
-            "    `-.___________.-'\n"
-        )
     }
 }
-
-# Spawn pools by tier (safe: no missing keys)
-ENEMY_SPAWN_POOL = {
-    'common': ['human'],
-    'uncommon': ['dart_monkey'],
-    'boss_room': ['teto_boss']
-}
-
-def create_enemy_instance(key: str, visits: int = 0) -> dict:
-    tpl = ENEMY_TEMPLATES.get(key)
-    if not tpl:
-        # fallback generic enemy
-        return {'name': 'Mook', 'hp': 50 + visits * 10, 'atk': 5 + visits, 'reward': 50 + visits * 10, 'ascii': '(?)'}
-
-    # scale hp/atk/reward reasonably
-    base_hp = int(tpl['base_hp'] + visits * (tpl.get('hp_scale', 10)))
-    # make moderate scaling (linear then mild exponential)
-    hp = base_hp + visits * base_hp // 3
-    atk = int(tpl['base_atk'] + visits * (tpl.get('atk_scale', 1)))
-    reward = int(tpl['base_reward'] * (1 + 0.2 * visits))
-    inst = {
-        'name': tpl['name'],
-        'hp': hp,
-        'atk': atk,
-        'reward': reward,
-        'ascii': tpl.get('ascii', '')
-    }
-    if 'special' in tpl:
-        inst['special'] = dict(tpl['special'])
-    return inst
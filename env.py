@@ -0,0 +1,455 @@
+# env.py
+# The game as an environment for balance tests and RL agents (Gym-style reset/step, no
+# rendering). VecEnv steps N independent games in lock-step over NumPy arrays; Env is a
+# single game on top of it. Requires NumPy.
+#
+# An observation is one OBS_DTYPE record per game: the current room's tile codes
+# (world.TILES, OTHER_TILE for anything else), player (y, x), room and floor, the room's
+# enemies as MAX_ENEMIES rows of (y, x, hp, atk, reward) with hp 0 for an empty row, HP,
+# currency, per-click value, mode and the battle status (BATTLE_FIELDS).
+#
+# Actions mirror the key handlers: SPACE (actions.on_space), UP/LEFT/DOWN/RIGHT
+# (actions.move), KEY_1..KEY_9 (actions.handle_number_key: battle actions in a battle,
+# upgrades in the clicker) and CLICKER/MAP (the R and M screens). The rules are those of
+# actions.py and battle_core.py, minus what depends on the wall clock or on screens: no
+# move throttle, splash or respawn timers, shop and upgrade tiles are plain floor,
+# battles are one-on-one and currency is float64 rather than Big. Fights against enemies
+# with specials (the floor boss) go through battle_core itself, one game at a time;
+# everything else is batched.
+#
+# Floors come from state.create_rooms. Generating one takes milliseconds, so each depth
+# keeps a pool of up to `pool_size` encoded layouts and resets draw from it.
+import random
+
+import numpy as np
+
+import battle_core
+import effects
+import state
+import world
+
+ROOMS = 5
+HEIGHT = state.ROOM_HEIGHT
+WIDTH = state.ROOM_WIDTH
+MAX_ENEMIES = 32
+OTHER_TILE = len(world.TILES)
+_CODE = {ch: i for i, ch in enumerate(world.TILES)}
+FLOOR = _CODE[state.FLOOR_CHAR]
+FOUNTAIN = _CODE['H']
+EXCLAIM = _CODE['!']
+# tiles actions.move refuses to step on
+BLOCKED = np.zeros(OTHER_TILE + 1, dtype=bool)
+for _ch in (state.WALL_CHAR, state.H_WALL_CHAR, '^', '≈'):
+    BLOCKED[_CODE[_ch]] = True
+FOUNTAIN_HEAL = 10
+
+# actions
+SPACE, UP, LEFT, DOWN, RIGHT = range(5)
+KEY_1 = 5
+KEY_9 = KEY_1 + 8
+CLICKER = KEY_9 + 1
+MAP = CLICKER + 1
+N_ACTIONS = MAP + 1
+_DY = np.array([0, -1, 0, 1, 0] + [0] * (N_ACTIONS - 5), dtype=np.int16)
+_DX = np.array([0, 0, -1, 0, 1] + [0] * (N_ACTIONS - 5), dtype=np.int16)
+# number keys in a battle, as in handle_number_key
+BATTLE_ACTIONS = ('execute', 'defend', 'recover', 'hack', 'debug')
+_COSTS = np.array([battle_core.ACTION_COSTS[a] for a in BATTLE_ACTIONS], dtype=np.int32)
+
+# modes
+EXPLORE, INCREMENTAL, BATTLE = range(3)
+
+# enemy row columns
+E_Y, E_X, E_HP, E_ATK, E_REWARD = range(5)
+# battle status columns
+BATTLE_FIELDS = ('enemy_hp', 'enemy_max', 'enemy_atk', 'skill_points', 'skill_points_max',
+                 'shield', 'buff', 'debuff', 'stunned', 'stun_duration')
+B_HP, B_MAX, B_ATK, B_SP, B_SP_MAX, B_SHIELD, B_BUFF, B_DEBUFF, B_STUNNED, B_STUN = range(len(BATTLE_FIELDS))
+
+OBS_DTYPE = np.dtype([
+    ('tiles', np.uint8, (HEIGHT, WIDTH)),
+    ('player', np.int16, (2,)),
+    ('room', np.int8),
+    ('floor', np.int16),
+    ('enemies', np.int32, (MAX_ENEMIES, 5)),
+    ('hp', np.int32),
+    ('max_hp', np.int32),
+    ('count', np.float64),
+    ('per_click', np.float64),
+    ('mode', np.int8),
+    ('battle', np.int32, (len(BATTLE_FIELDS),)),
+])
+
+
+def encode_floor(rooms, specials: list):
+    """(tiles, enemies, special ids) arrays for a create_rooms floor.
+
+    Enemies with specials get the index of their template in `specials` (appended to
+    it as needed); 0 means none.
+    """
+    tiles = np.full((ROOMS, HEIGHT, WIDTH), FLOOR, dtype=np.uint8)
+    enemies = np.zeros((ROOMS, MAX_ENEMIES, 5), dtype=np.int32)
+    special = np.zeros((ROOMS, MAX_ENEMIES), dtype=np.int16)
+    for r, room in enumerate(rooms[:ROOMS]):
+        tiles[r] = [[_CODE.get(ch, OTHER_TILE) for ch in row] for row in room['map']]
+        for i, ((y, x), e) in enumerate(sorted(room.get('enemies', {}).items())[:MAX_ENEMIES]):
+            enemies[r, i] = (y, x, max(1, int(e.get('hp', 1))), int(e.get('atk', 0)), int(e.get('reward', 0)))
+            if effects.specials(e):
+                specials.append(e)
+                special[r, i] = len(specials) - 1
+    return tiles, enemies, special
+
+
+class VecEnv:
+    """N independent games stepped together. Finished games reset themselves."""
+
+    def __init__(self, n: int, seed: int = None, max_steps: int = 10000, pool_size: int = 256,
+                 attack: int = None, defense: int = None, hp: int = None, autoreset: bool = True):
+        self.n = n
+        self.max_steps = max_steps
+        self.pool_size = pool_size
+        self.autoreset = autoreset
+        self.attack = np.full(n, state.attack if attack is None else attack, dtype=np.int32)
+        self.defense = np.full(n, state.defense if defense is None else defense, dtype=np.int32)
+        self.start_hp = state.player_max_hp if hp is None else hp
+        self._rng = random.Random(seed)
+        self._pools = {}
+        self._specials = [None]
+        # special-enemy battles in progress: game -> battle_core status dict
+        self._status = {}
+
+        self.obs = np.zeros(n, dtype=OBS_DTYPE)
+        o = self.obs
+        self.tiles, self.player, self.room, self.floor = o['tiles'], o['player'], o['room'], o['floor']
+        self.enemies, self.hp, self.max_hp = o['enemies'], o['hp'], o['max_hp']
+        self.count, self.per_click, self.mode, self.battle = o['count'], o['per_click'], o['mode'], o['battle']
+        # the whole floor; the current room lives in the observation and is written back
+        # on room changes (like state.sync_room)
+        self.floor_tiles = np.zeros((n, ROOMS, HEIGHT, WIDTH), dtype=np.uint8)
+        self.floor_enemies = np.zeros((n, ROOMS, MAX_ENEMIES, 5), dtype=np.int32)
+        self.floor_special = np.zeros((n, ROOMS, MAX_ENEMIES), dtype=np.int16)
+        self.special = np.zeros((n, MAX_ENEMIES), dtype=np.int16)
+        self.target = np.zeros(n, dtype=np.int16)
+        self.steps = np.zeros(n, dtype=np.int64)
+
+        upgrades = state.upgrades[:9]
+        self._upg_cost = np.array([u['cost'] for u in upgrades], dtype=np.float64)
+        self._upg_amount = np.array([u['amount'] for u in upgrades], dtype=np.float64)
+        self._upg_mult = np.array([u['type'] != 'add' for u in upgrades])
+        # tiers behind meta upgrades stay locked: there is no meta progression here
+        self._upg_locked = np.array([bool(u.get('meta_req')) for u in upgrades])
+        self._upg_key = {int(u['key']) - 1: i for i, u in enumerate(upgrades)}
+        self.purchased = np.zeros((n, len(upgrades)), dtype=bool)
+
+    # --- floors ---
+
+    def _floor_layout(self, visits: int):
+        pool = self._pools.setdefault(visits, [])
+        if len(pool) < max(1, self.pool_size):
+            saved = random.getstate()
+            # create_rooms draws from the global random module; seed it from our rng
+            random.seed(self._rng.getrandbits(64))
+            try:
+                rooms = state.create_rooms(ROOMS, visits=visits)
+            finally:
+                random.setstate(saved)
+            layout = encode_floor(rooms, self._specials)
+            if self.pool_size:
+                pool.append(layout)
+            return layout
+        return pool[self._rng.randrange(len(pool))]
+
+    def _store_room(self, g):
+        r = self.room[g]
+        self.floor_tiles[g, r] = self.tiles[g]
+        self.floor_enemies[g, r] = self.enemies[g]
+        self.floor_special[g, r] = self.special[g]
+
+    def _load_room(self, g, r):
+        self.room[g] = r
+        self.tiles[g] = self.floor_tiles[g, r]
+        self.enemies[g] = self.floor_enemies[g, r]
+        self.special[g] = self.floor_special[g, r]
+
+    def _new_floor(self, g, visits):
+        tiles, enemies, special = self._floor_layout(visits)
+        self.floor[g] = visits
+        self.floor_tiles[g] = tiles
+        self.floor_enemies[g] = enemies
+        self.floor_special[g] = special
+        self._load_room(g, 0)
+
+    # --- reset ---
+
+    def _reset_game(self, g):
+        self._status.pop(g, None)
+        self._new_floor(g, int(state.map_visit_count))
+        # persistence.reset_game / _reset_run_state
+        self.player[g] = (HEIGHT // 2, WIDTH // 2)
+        self.hp[g] = self.max_hp[g] = self.start_hp
+        self.count[g] = 0.0
+        self.per_click[g] = 1.0
+        self.mode[g] = EXPLORE
+        self.battle[g] = 0
+        self.purchased[g] = False
+        self.steps[g] = 0
+
+    def reset(self, seed: int = None):
+        """Start every game over; returns the observations."""
+        if seed is not None:
+            self._rng.seed(seed)
+            self._pools.clear()
+        for g in range(self.n):
+            self._reset_game(g)
+        return self.obs
+
+    # --- step ---
+
+    def step(self, action):
+        """Apply one action per game.
+
+        Returns (obs, reward, terminated, truncated); reward is the currency earned this
+        step. With autoreset, finished games are already reset in `obs`. `obs` is
+        overwritten by the next step: copy it to keep it.
+        """
+        a = np.asarray(action, dtype=np.int64)
+        before = self.count.copy()
+        mode = self.mode.copy()
+        terminated = np.zeros(self.n, dtype=bool)
+
+        click = a == SPACE
+        self.count[click] += self.per_click[click]
+
+        not_battle = mode != BATTLE
+        self.mode[(a == CLICKER) & not_battle] = INCREMENTAL
+        self.mode[(a == MAP) & not_battle] = EXPLORE
+
+        moving = np.flatnonzero((a >= UP) & (a <= RIGHT) & (mode == EXPLORE))
+        if moving.size:
+            self._move(moving, a[moving])
+
+        key = a - KEY_1
+        buying = np.flatnonzero((a >= KEY_1) & (a <= KEY_9) & (mode == INCREMENTAL))
+        if buying.size:
+            self._buy(buying, key[buying])
+
+        fighting = np.flatnonzero((a >= KEY_1) & (a < KEY_1 + len(BATTLE_ACTIONS)) & (mode == BATTLE))
+        if fighting.size:
+            self._fight(fighting, key[fighting], terminated)
+
+        reward = (self.count - before).astype(np.float32)
+        self.steps += 1
+        truncated = self.steps >= self.max_steps
+        if self.autoreset:
+            for g in np.flatnonzero(terminated | truncated):
+                self._reset_game(g)
+        return self.obs, reward, terminated, truncated
+
+    def _move(self, games, a):
+        y = self.player[games, 0] + _DY[a]
+        x = self.player[games, 1] + _DX[a]
+        edge = (x <= 0) | (x >= WIDTH - 1) | (y <= 0) | (y >= HEIGHT - 1)
+        if edge.any():
+            keep = np.ones(games.size, dtype=bool)
+            for i in np.flatnonzero(edge):
+                clamped = self._edge_move(games[i], int(y[i]), int(x[i]))
+                if clamped is None:
+                    keep[i] = False
+                else:
+                    y[i], x[i] = clamped
+            games, y, x = games[keep], y[keep], x[keep]
+        tile = self.tiles[games, y, x]
+        free = ~BLOCKED[tile]
+        games, y, x, tile = games[free], y[free], x[free], tile[free]
+        self.player[games, 0] = y
+        self.player[games, 1] = x
+
+        fountain = tile == FOUNTAIN
+        if fountain.any():
+            g = games[fountain]
+            self.hp[g] = np.minimum(self.max_hp[g], self.hp[g] + FOUNTAIN_HEAL)
+        exclaim = tile == EXCLAIM
+        for i in np.flatnonzero(exclaim):
+            self._exclaim(games[i], int(y[i]), int(x[i]))
+        rest = ~(fountain | exclaim)
+        games, y, x = games[rest], y[rest], x[rest]
+        rows = self.enemies[games]
+        hit = (rows[:, :, E_Y] == y[:, None]) & (rows[:, :, E_X] == x[:, None]) & (rows[:, :, E_HP] > 0)
+        found = hit.any(axis=1)
+        if found.any():
+            self._enter_battle(games[found], hit[found].argmax(axis=1))
+
+    def _edge_move(self, g, y, x):
+        """actions.move at the room edges: change room or floor (None), or clamp."""
+        room = int(self.room[g])
+        if x <= 0 or y <= 0:
+            if room > 0:
+                self._store_room(g)
+                self._load_room(g, room - 1)
+                if x <= 0:
+                    self.player[g] = (max(1, min(HEIGHT - 2, y)), WIDTH - 2)
+                else:
+                    self.player[g] = (HEIGHT - 2, max(1, min(WIDTH - 2, x)))
+                return None
+            return (HEIGHT - 2 if y <= 0 else y), (1 if x <= 0 else x)
+        if room < ROOMS - 1:
+            self._store_room(g)
+            self._load_room(g, room + 1)
+        else:
+            self._new_floor(g, int(self.floor[g]) + 1)
+        if x >= WIDTH - 1:
+            self.player[g] = (max(1, min(HEIGHT - 2, y)), 1)
+        else:
+            self.player[g] = (1, max(1, min(WIDTH - 2, x)))
+        return None
+
+    def _exclaim(self, g, y, x):
+        """actions.trigger_exclaim: treasure, or an ambush that starts a battle."""
+        self.tiles[g, y, x] = FLOOR
+        visits = max(0, int(self.floor[g]))
+        rng = self._rng
+        if rng.random() < 0.5:
+            self.count[g] += rng.randint(50, 200) + visits * 20
+            return
+        if rng.random() < 0.6:
+            row = (y, x, 100 + visits * 12, 6 + visits, int(150 * (1 + 0.2 * visits)))
+        else:
+            row = (y, x, 140 + visits * 18, 10 + visits * 2, int(300 * (1 + 0.2 * visits)))
+        empty = np.flatnonzero(self.enemies[g, :, E_HP] <= 0)
+        if empty.size:
+            slot = empty[0]
+            self.enemies[g, slot] = row
+            self.special[g, slot] = 0
+            self._enter_battle(np.array([g]), np.array([slot]))
+
+    def _buy(self, games, key):
+        """actions.buy_upgrade_key for the upgrades behind keys 1-9."""
+        slot = np.array([self._upg_key.get(int(k), -1) for k in key])
+        ok = slot >= 0
+        games, slot = games[ok], slot[ok]
+        cost = self._upg_cost[slot]
+        ok = ~self.purchased[games, slot] & ~self._upg_locked[slot] & (self.count[games] >= cost)
+        games, slot, cost = games[ok], slot[ok], cost[ok]
+        self.count[games] -= cost
+        mult = self._upg_mult[slot]
+        amount = self._upg_amount[slot]
+        self.per_click[games] = np.where(mult, self.per_click[games] * amount, self.per_click[games] + amount)
+        self.purchased[games, slot] = True
+
+    # --- battles ---
+
+    def _enter_battle(self, games, slots):
+        e = self.enemies[games, slots]
+        b = self.battle
+        self.target[games] = slots
+        b[games] = 0
+        b[games, B_HP] = e[:, E_HP]
+        b[games, B_MAX] = e[:, E_HP]
+        b[games, B_ATK] = e[:, E_ATK]
+        b[games, B_SP] = battle_core.SKILL_POINT_START + self.floor[games] // 2
+        b[games, B_SP_MAX] = battle_core.SKILL_POINT_MAX
+        self.mode[games] = BATTLE
+        for g, slot in zip(games, slots):
+            special = self.special[g, slot]
+            if special:
+                status = battle_core.new_status(int(self.floor[g]))
+                player, enemy = self._battle_dicts(g, special)
+                effects.on_start(player, enemy, status, [])
+                self._status[g] = status
+                self._write_back(g, player, enemy, status)
+
+    def _battle_dicts(self, g, special):
+        b = self.battle[g]
+        player = {'hp': int(self.hp[g]), 'max_hp': int(self.max_hp[g]),
+                  'attack': int(self.attack[g]), 'defense': int(self.defense[g])}
+        enemy = dict(self._specials[special], hp=int(b[B_HP]), max_hp=int(b[B_MAX]), atk=int(b[B_ATK]))
+        return player, enemy
+
+    def _write_back(self, g, player, enemy, status):
+        b = self.battle[g]
+        self.hp[g] = player['hp']
+        b[B_HP] = enemy['hp']
+        b[B_SP] = status.get('skill_points', 0)
+        b[B_SHIELD] = status.get('player_shield', 0)
+        b[B_BUFF] = status.get('player_buff', 0)
+        b[B_DEBUFF] = status.get('enemy_debuff', 0)
+        b[B_STUNNED] = bool(status.get('player_stunned', False))
+        b[B_STUN] = status.get('stun_duration', 0)
+
+    def _fight(self, games, act, terminated):
+        special = self.special[games, self.target[games]] > 0
+        for g, k in zip(games[special], act[special]):
+            self._fight_one(g, int(k), terminated)
+        games, act = games[~special], act[~special]
+        if not games.size:
+            return
+        b = self.battle
+        # battle_core.apply_action; stuns only come from specials, which are handled above
+        sp = b[games, B_SP]
+        cost = _COSTS[act]
+        gain = np.minimum(b[games, B_SP_MAX], sp + 3) - sp
+        ok = (sp >= cost) & ((act != 2) | (gain > 0))
+        games, act, cost, gain = games[ok], act[ok], cost[ok], gain[ok]
+        b[games, B_SP] -= cost
+        attack = self.attack[games]
+        g = games[act == 0]
+        b[g, B_HP] -= np.maximum(1, self.attack[g] + b[g, B_BUFF])
+        g = games[act == 1]
+        b[g, B_SHIELD] += 8 + (self.defense[g] * 0.5).astype(np.int32)
+        b[games[act == 2], B_SP] += gain[act == 2]
+        g = games[act == 3]
+        b[g, B_DEBUFF] = np.minimum(battle_core.DEBUFF_CAP, b[g, B_DEBUFF] + 3 + (self.floor[g] * 0.5).astype(np.int32))
+        g = games[act == 4]
+        b[g, B_BUFF] += np.maximum(1, (attack[act == 4] * 0.4).astype(np.int32))
+
+        won = b[games, B_HP] <= 0
+        if won.any():
+            self._win(games[won])
+        games = games[~won]
+        # battle_core.enemy_retaliate
+        atk = np.maximum(0, b[games, B_ATK] - b[games, B_DEBUFF])
+        defense = self.defense[games]
+        shield = b[games, B_SHIELD]
+        self.hp[games] -= np.maximum(0, atk - (defense + shield))
+        b[games, B_SHIELD] = np.maximum(0, shield - np.maximum(0, atk - defense))
+        terminated[games[self.hp[games] <= 0]] = True
+
+    def _fight_one(self, g, k, terminated):
+        status = self._status[g]
+        player, enemy = self._battle_dicts(g, self.special[g, self.target[g]])
+        result, _ = battle_core.resolve_turn(player, enemy, status, BATTLE_ACTIONS[k], {},
+                                             int(self.floor[g]), self._rng, [])
+        self._write_back(g, player, enemy, status)
+        if result == battle_core.WIN:
+            self._win(np.array([g]))
+        elif result == battle_core.LOSE:
+            terminated[g] = True
+
+    def _win(self, games):
+        """actions._battle_win: reward, enemy removed, back to the map."""
+        slots = self.target[games]
+        self.count[games] += self.enemies[games, slots, E_REWARD]
+        self.enemies[games, slots, E_HP] = 0
+        self.mode[games] = EXPLORE
+        self.battle[games] = 0
+        for g in games:
+            self._status.pop(g, None)
+
+
+class Env:
+    """One game: reset(seed) -> (obs, info), step(action) -> (obs, reward, terminated,
+    truncated, info). Observations are OBS_DTYPE records (copies)."""
+
+    n_actions = N_ACTIONS
+
+    def __init__(self, seed: int = None, **kwargs):
+        self._vec = VecEnv(1, seed=seed, autoreset=False, **kwargs)
+        self._vec.reset()
+
+    def reset(self, seed: int = None):
+        obs = self._vec.reset(seed)
+        return obs[0].copy(), {}
+
+    def step(self, action: int):
+        obs, reward, terminated, truncated = self._vec.step([action])
+        return obs[0].copy(), float(reward[0]), bool(terminated[0]), bool(truncated[0]), {}
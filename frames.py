@@ -0,0 +1,124 @@
+# frames.py
+# Wire format shared by server.py and its clients. Every message is
+#   kind (1 byte) | payload length (4 bytes, big-endian) | payload
+#
+# Client -> server: HELLO (session name), KEY ("down space" / "up w"), or WATCH (name of
+# a session to spectate; nothing else is sent after it).
+# Server -> client: KEYFRAME (the whole screen as text), DIFF (only the lines that
+# changed since the previous frame), BYE (reason the server closed the session).
+#
+# DIFF payload: total line count (2 bytes), then per changed line its index (2 bytes),
+# byte length (4 bytes) and UTF-8 text. A diff larger than the keyframe it replaces is
+# sent as a keyframe instead.
+import struct
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 7777
+
+HELLO = b'H'
+KEY = b'E'
+WATCH = b'W'
+KEYFRAME = b'K'
+DIFF = b'D'
+BYE = b'X'
+
+_HEAD = struct.Struct('>cI')
+_COUNT = struct.Struct('>H')
+_LINE = struct.Struct('>HI')
+# larger messages are treated as a broken stream
+MAX_PAYLOAD = 1 << 20
+MAX_LINES = 0xFFFF
+
+
+class FrameError(Exception):
+    pass
+
+
+def pack(kind: bytes, payload: bytes = b'') -> bytes:
+    return _HEAD.pack(kind, len(payload)) + payload
+
+
+async def read_message(reader):
+    """(kind, payload) of the next message, or None at end of stream."""
+    try:
+        head = await reader.readexactly(_HEAD.size)
+        kind, length = _HEAD.unpack(head)
+        if length > MAX_PAYLOAD:
+            raise FrameError(f'message of {length} bytes')
+        return kind, await reader.readexactly(length)
+    except EOFError:
+        return None
+    except ConnectionError:
+        return None
+
+
+def hello(name: str) -> bytes:
+    return pack(HELLO, name.encode('utf-8'))
+
+
+def watch(name: str) -> bytes:
+    return pack(WATCH, name.encode('utf-8'))
+
+
+def key(name: str, down: bool = True) -> bytes:
+    return pack(KEY, f"{'down' if down else 'up'} {name}".encode('utf-8'))
+
+
+def decode_key(payload: bytes):
+    """(name, down) from a KEY payload."""
+    kind, _, name = payload.decode('utf-8', 'replace').partition(' ')
+    if kind not in ('down', 'up') or not name:
+        raise FrameError('bad key event')
+    return name, kind == 'down'
+
+
+def bye(reason: str) -> bytes:
+    return pack(BYE, reason.encode('utf-8'))
+
+
+def keyframe(lines: list) -> bytes:
+    return pack(KEYFRAME, '\n'.join(lines[:MAX_LINES]).encode('utf-8'))
+
+
+def frame(prev: list, lines: list):
+    """The message turning screen `prev` into `lines`: a DIFF, a KEYFRAME when `prev`
+    is None or the diff would not be smaller, or None when nothing changed."""
+    lines = lines[:MAX_LINES]
+    if prev is None:
+        return keyframe(lines)
+    if prev == lines:
+        return None
+    parts = [_COUNT.pack(len(lines))]
+    size = _COUNT.size
+    full = sum(len(line) for line in lines) + len(lines)
+    for i, line in enumerate(lines):
+        if i < len(prev) and prev[i] == line:
+            continue
+        raw = line.encode('utf-8')
+        parts.append(_LINE.pack(i, len(raw)))
+        parts.append(raw)
+        size += _LINE.size + len(raw)
+        if size >= full:
+            return keyframe(lines)
+    return pack(DIFF, b''.join(parts))
+
+
+def apply(lines: list, kind: bytes, payload: bytes) -> list:
+    """The client's screen after a KEYFRAME or DIFF message."""
+    if kind == KEYFRAME:
+        return payload.decode('utf-8', 'replace').split('\n')
+    if kind != DIFF:
+        raise FrameError(f'not a frame: {kind!r}')
+    if lines is None:
+        raise FrameError('diff before the first keyframe')
+    (count,) = _COUNT.unpack_from(payload, 0)
+    out = (list(lines) + [''] * count)[:count]
+    pos = _COUNT.size
+    while pos < len(payload):
+        index, length = _LINE.unpack_from(payload, pos)
+        pos += _LINE.size
+        if index >= count or pos + length > len(payload):
+            raise FrameError('diff out of range')
+        out[index] = payload[pos:pos + length].decode('utf-8', 'replace')
+        pos += length
+    return out
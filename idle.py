@@ -0,0 +1,88 @@
+# idle.py
+# Passive income. Between purchases the income rate is constant, so earnings over any
+# interval are computed in closed form (rate x time, weighted by the offline efficiency
+# brackets) instead of being simulated tick by tick.
+import time
+import state
+import production
+from bignum import Big, pow_big
+
+# offline gains from the last load, for the welcome-back message
+last_offline_gain = Big(0)
+last_offline_seconds = 0.0
+
+
+def generator_cost(gen: dict, count: int = None) -> Big:
+    """Price of the next unit of `gen` when `count` are already owned."""
+    if count is None:
+        count = gen.get('count', 0)
+    return (pow_big(state.IDLE_COST_GROWTH, count) * gen['cost']).floor()
+
+
+def income_rate() -> Big:
+    """Currency per second from all auto-clickers and generators."""
+    return production.income_rate()
+
+
+def accrued(rate, seconds: float, brackets=None) -> Big:
+    """Currency earned at `rate` over `seconds`.
+
+    `brackets` is a list of (hours, efficiency) steps as in state.OFFLINE_BRACKETS;
+    each step's efficiency applies up to its hour mark and nothing accrues past the
+    last one. Without brackets the whole interval earns at full rate.
+    """
+    if rate <= 0 or seconds <= 0:
+        return Big(0)
+    if brackets is None:
+        return rate * seconds
+    # sum the efficiency-weighted seconds first: one Big multiply at the end
+    weighted = 0.0
+    start = 0.0
+    for hours, efficiency in brackets:
+        end = hours * 3600.0
+        if seconds <= start:
+            break
+        weighted += efficiency * (min(seconds, end) - start)
+        start = end
+    return rate * weighted
+
+
+def credit(amount):
+    """Add idle earnings to the run, tracking the run best like clicks do."""
+    amount = Big(amount).floor()
+    if amount <= 0:
+        return Big(0)
+    state.count += amount
+    if state.count > getattr(state, 'run_max_count', 0):
+        state.run_max_count = state.count
+    return amount
+
+
+def tick(now: float = None):
+    """Credit everything earned since the last tick. Returns the amount credited."""
+    if now is None:
+        now = time.time()
+    last = state.last_idle_time
+    state.last_idle_time = now
+    if last is None:
+        return Big(0)
+    # fractional currency carries over so slow generators still pay out
+    earned = accrued(income_rate(), now - last) + getattr(state, 'idle_remainder', 0.0)
+    whole = earned.floor()
+    state.idle_remainder = float(earned - whole)
+    return credit(whole)
+
+
+def apply_offline(last_seen, now: float = None):
+    """Credit time spent with the game closed since `last_seen` (a save timestamp)."""
+    global last_offline_gain, last_offline_seconds
+    if now is None:
+        now = time.time()
+    last_offline_gain = Big(0)
+    last_offline_seconds = 0.0
+    if last_seen:
+        last_offline_seconds = max(0.0, now - last_seen)
+        earned = accrued(income_rate(), last_offline_seconds, state.OFFLINE_BRACKETS)
+        last_offline_gain = credit(earned)
+    state.last_idle_time = now
+    return last_offline_gain
@@ -0,0 +1,143 @@
+# journal.py
+# Append-only save journal. Each save appends only the top-level keys that changed
+# since the last save; every COMPACT_EVERY records the journal is folded back into
+# a full snapshot (the regular save file) and truncated.
+import json
+import os
+import state
+
+COMPACT_EVERY = 50
+COMPACT_BYTES = 64 * 1024
+
+# last state known to be on disk (snapshot + replayed journal), as plain JSON data
+_last = None
+_seq = 0
+_records = 0
+
+
+def journal_path():
+    """Journal file living next to the current save file."""
+    return os.path.splitext(state.SAVE_FILE)[0] + '.journal'
+
+
+def _plain(data):
+    # detach from live state lists/dicts and normalise tuples the same way json would
+    return json.loads(json.dumps(data, default=_to_json))
+
+
+def _to_json(value):
+    # bignum.Big and anything else that knows its JSON form
+    to_json = getattr(value, 'to_json', None)
+    if to_json is None:
+        raise TypeError(f'{type(value).__name__} is not JSON serializable')
+    return to_json()
+
+
+def diff(old: dict, new: dict) -> dict:
+    """Return the top-level keys of `new` whose values differ from `old`."""
+    return {k: v for k, v in new.items() if k not in old or old[k] != v}
+
+
+def record(data: dict, write_snapshot):
+    """Persist `data` as a delta against the last saved state.
+
+    `write_snapshot(dict)` is used for the initial snapshot and for compaction.
+    Nothing is written when nothing changed since the last save.
+    """
+    global _last, _seq, _records
+    data = _plain(data)
+    if _last is None:
+        compact(data, write_snapshot)
+        return
+    delta = diff(_last, data)
+    if not delta:
+        return
+    _seq += 1
+    delta['journal_seq'] = _seq
+    path = journal_path()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(delta, separators=(',', ':')) + '\n')
+    _last.update(delta)
+    _records += 1
+    try:
+        too_big = os.path.getsize(path) > COMPACT_BYTES
+    except OSError:
+        too_big = False
+    if _records >= COMPACT_EVERY or too_big:
+        compact(data, write_snapshot)
+
+
+def compact(data: dict, write_snapshot):
+    """Fold everything into a fresh snapshot and truncate the journal."""
+    global _last, _seq, _records
+    data = _plain(data)
+    _seq += 1
+    data['journal_seq'] = _seq
+    write_snapshot(data)
+    # the snapshot carries the sequence number, so a crash before this truncate
+    # only leaves stale records that replay() skips
+    with open(journal_path(), 'w', encoding='utf-8'):
+        pass
+    _last = data
+    _records = 0
+
+
+def replay(snapshot: dict) -> dict:
+    """Apply journal records newer than `snapshot` and return the merged state."""
+    global _last, _seq, _records
+    merged = dict(snapshot)
+    base_seq = int(merged.get('journal_seq', 0))
+    seq = base_seq
+    applied = 0
+    try:
+        with open(journal_path(), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # torn write at the tail (crash mid-append): stop here
+                    break
+                if not isinstance(rec, dict):
+                    break
+                rec_seq = int(rec.get('journal_seq', 0))
+                if rec_seq <= seq:
+                    continue
+                merged.update(rec)
+                seq = rec_seq
+                applied += 1
+    except OSError:
+        pass
+    _last = _plain(merged)
+    _seq = seq
+    _records = applied
+    return merged
+
+
+def _disk_seq() -> int:
+    # highest sequence number in the current journal file (0 if none)
+    seq = 0
+    try:
+        with open(journal_path(), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    break
+                if not isinstance(rec, dict):
+                    break
+                seq = max(seq, int(rec.get('journal_seq', 0)))
+    except OSError:
+        pass
+    return seq
+
+
+def reset():
+    """Forget what is on disk; the next record() starts with a full snapshot.
+
+    The sequence restarts from the current journal file (e.g. after a slot switch),
+    so the new snapshot still outranks any stale records left in it.
+    """
+    global _last, _seq, _records
+    _last = None
+    _seq = _disk_seq()
+    _records = 0
@@ -1,34 +1,50 @@
 # loops.py
-import time
-import threading
-import keyboard
+# Per-tick game work; runtime.py drives it from its event loop tasks.
 import actions 
 import render
 import state
-import persistence
+import idle
+import clicks
+import scheduler
 
 MOVEMENT_DELAY = 0.05
 AUTOSAVE_DELAY = 30.0
+# idle income is paid out (and the screen redrawn) this often
+IDLE_PAYOUT_DELAY = 1.0
+# one logic tick per frame: apply batched clicks and run due timers, then redraw once
+TICK_DELAY = scheduler.TICK
 
-def movement_loop():
-    while True:
-        if state.game_state == 'explore':
-            dx = (1 if keyboard.is_pressed('d') else 0) - (1 if keyboard.is_pressed('a') else 0)
-            dy = (1 if keyboard.is_pressed('s') else 0) - (1 if keyboard.is_pressed('w') else 0)
-            if dx != 0 or dy != 0:
-                actions.move(dx, dy) if hasattr(actions, 'move') else None
-                render.render_map()
-        time.sleep(MOVEMENT_DELAY)
+def movement_step(dx, dy):
+    if state.game_state == 'explore':
+        if dx != 0 or dy != 0:
+            actions.move(dx, dy) if hasattr(actions, 'move') else None
+            render.render_map()
 
-def autosave_loop():
-    while True:
-        time.sleep(AUTOSAVE_DELAY)
-        # skip saving during battle or transition states
-        if state.game_state not in ('battle', 'transition'):
-            try:
-                persistence.save_game()
-            except Exception:
-                pass
+def can_autosave():
+    # skip saving during battle or transition states
+    return state.game_state not in ('battle', 'transition', 'start_menu')
 
-movement_thread = threading.Thread(target=movement_loop, daemon=True)
-autosave_thread = threading.Thread(target=autosave_loop, daemon=True)
+def idle_payout():
+    if state.game_state in ('start_menu', 'transition'):
+        return
+    if idle.tick():
+        redraw()
+
+def redraw():
+    if state.game_state == 'incremental':
+        render.display_incremental()
+    elif state.game_state == 'generators':
+        render.display_generators()
+
+def schedule_events():
+    """Register the recurring timers; call once at startup."""
+    scheduler.every(IDLE_PAYOUT_DELAY, idle_payout)
+
+def tick():
+    """Run due timers and apply batched clicks; True when the screen needs a redraw."""
+    scheduler.advance()
+    if state.game_state in ('start_menu', 'transition'):
+        # presses here count for nothing; drop them so the next run is not credited
+        clicks.drain()
+        return False
+    return clicks.apply_pending()
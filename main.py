@@ -1,30 +1,37 @@
-import keyboard
-import persistence
+import argparse
+import os
+
 import loops
 import render
 import actions
+import assets
+import content
 import state
+import tracing
+
+# key name -> handler, dispatched by the runtime's input task
+BINDINGS = {}
+RELEASE_BINDINGS = {}
 
-def safe_hotkey(key, func):
+def safe_hotkey(key, func, bindings=BINDINGS):
     def wrapped():
         if state.game_state == 'transition':
             return
         try:
             func()
         except Exception:
-            pass
-    keyboard.add_hotkey(key, wrapped)
+            tracing.swallowed(f'hotkey {key}')
+    bindings[key] = wrapped
 
-def main():
-    # start background loops
-    loops.movement_thread.start()
-    loops.autosave_thread.start()
+def write_trace():
+    """T: write the trace recorded so far to state.TRACE_FILE (only while tracing)."""
+    if tracing.ENABLED:
+        tracing.export(state.TRACE_FILE)
 
-    # load save on startup if present
-    persistence.load_game()
-
-    # register key bindings (some are global but handlers check state)
-    keyboard.on_release_key('space', lambda e: actions.on_space_release())
+def register_bindings():
+    """Fill BINDINGS / RELEASE_BINDINGS (also used by server.py for every session)."""
+    # key bindings are global but handlers check state
+    safe_hotkey('space', actions.on_space_release, RELEASE_BINDINGS)
     safe_hotkey('space', actions.on_space)
 
     # numeric keys
@@ -33,20 +40,50 @@ def main():
 
     safe_hotkey('r', render.switch_to_incremental)
     safe_hotkey('m', render.switch_to_map)
+    safe_hotkey('g', render.switch_to_generators)
     safe_hotkey('q', render.switch_to_menu)
+    safe_hotkey('x', actions.toggle_buy_max)
+    safe_hotkey('u', actions.toggle_auto_battle)
+    safe_hotkey('n', actions.next_target)
     safe_hotkey('b', actions.return_from_shop if hasattr(actions, 'return_from_shop') else (lambda: None))
     safe_hotkey('i', actions.toggle_inventory if hasattr(actions, 'toggle_inventory') else (lambda: None))
     safe_hotkey('f', actions.battle_attack if hasattr(actions, 'battle_attack') else (lambda: None))
     safe_hotkey('l', actions.flee_battle if hasattr(actions, 'flee_battle') else (lambda: None))
+    safe_hotkey('t', write_trace)
+
+# set to 1 to record a trace without --trace
+TRACE_ENV = 'CPT_TRACE'
+
+def configure(argv=None, environ=os.environ):
+    """Apply the command line (and TRACE_ENV) to state before the game starts."""
+    ap = argparse.ArgumentParser(description='Play the game in this terminal.')
+    ap.add_argument('--trace', action='store_true',
+                    help=f'record a trace (also {TRACE_ENV}=1); T or quitting writes it to trace.json')
+    args = ap.parse_args(argv)
+    if args.trace or environ.get(TRACE_ENV, '') not in ('', '0'):
+        state.TRACE = True
+
+def main(argv=None):
+    configure(argv)
+    # content packs (compiled and cached by content.py) and art, before any game starts
+    content.apply()
+    assets.load()
+    if state.TRACE:
+        tracing.enable()
+
+    # recurring timers run on the runtime's tick
+    loops.schedule_events()
+
+    # saves are loaded from the start menu once a slot is picked
+    register_bindings()
 
     # show start/menu
     render.display_start_menu()
 
-    try:
-        keyboard.wait('esc')
-    except KeyboardInterrupt:
-        pass
-    persistence.save_game()
+    # runs until Esc, then flushes a final save (imported here: server.py reuses the
+    # bindings above without a local keyboard)
+    import runtime
+    runtime.run(BINDINGS, RELEASE_BINDINGS)
 
 if __name__ == '__main__':
     main()
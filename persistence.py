@@ -0,0 +1,379 @@
+import json
+import os
+import threading
+import time
+import state
+import tracing
+import journal
+import savefmt
+import world
+import idle
+import production
+from bignum import Big
+
+# granularity (seconds) of the saved last-seen time used for offline earnings
+LAST_SEEN_STEP = 60
+# journal and file writes may come from the game thread or the runtime's save executor
+_save_lock = threading.RLock()
+
+# reason the last load_game() failed, if it did (shown by the start menu)
+last_load_error = None
+# saves used to be named save.json / save_<n>.json; they load, and the next save is .dat
+SAVE_EXT = '.dat'
+LEGACY_EXT = '.json'
+
+
+def _collect_state():
+    """Build the save dict from the live game state."""
+    return {
+        'count': Big.from_json(state.count).to_json(),
+        'per_click': Big.from_json(state.per_click).to_json(),
+        'run_max_count': Big.from_json(getattr(state, 'run_max_count', 0)).to_json(),
+        'current_room_index': getattr(state, 'current_room_index', 0),
+        'player_x': state.player_x,
+        'player_y': state.player_y,
+        'player_hp': state.player_hp,
+        'player_max_hp': state.player_max_hp,
+        'map_visit_count': state.map_visit_count,
+        'upgrades': {
+                upg['key']: upg['purchased']
+                for upg in state.upgrades},
+        'shop': {
+            item['key']: item['purchased']
+            for item in state.shop_items},
+        'attack': state.attack,
+        'defense': state.defense,
+        'has_bag': state.has_bag,
+        'inventory': state.inventory,
+        'equipped_accessory': getattr(state, 'equipped_accessory', None),
+        'action_upgrades': {
+            upg['id']: upg.get('level', 0)
+            for upg in getattr(state, 'action_upgrades', [])},
+        'equipped_weapon': state.equipped_weapon,
+        'equipped_armour': state.equipped_armour,
+        'meta_currency': state.meta_currency,
+        'meta_upgrades': {m['id']: m['purchased'] for m in state.meta_upgrades},
+        'meta_start_per_click': state.meta_start_per_click,
+        'meta_start_attack': state.meta_start_attack,
+        'inventory_capacity': state.inventory_capacity,
+        'play_time': total_play_time(),
+        'idle_generators': {g['id']: g.get('count', 0) for g in state.idle_generators},
+        # coarse so an otherwise idle save does not journal a new timestamp every time
+        'last_seen': int(time.time() // LAST_SEEN_STEP * LAST_SEEN_STEP),
+    }
+
+
+def _write_snapshot(state_dict):
+    """Write a full save document (atomically, via a temp file)."""
+    raw = savefmt.dumps(state_dict, getattr(state, 'SAVE_FORMAT', 'json'))
+    tmp_path = state.SAVE_FILE + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp_path, state.SAVE_FILE)
+
+
+def _read_snapshot(path):
+    """Read a save file (binary or JSON) as plain data; load_game coerces it."""
+    with open(path, 'rb') as f:
+        return savefmt.parse(f.read())
+
+
+def _existing_save(path=None):
+    """The file holding the save for `path` (default SAVE_FILE): the file itself, or
+    the legacy .json of the same name. None when neither exists."""
+    path = state.SAVE_FILE if path is None else path
+    for candidate in (path, os.path.splitext(path)[0] + LEGACY_EXT):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def prepare_save():
+    """Capture everything a save writes. Call from the game thread; see write_save."""
+    return _collect_state(), world.prepare_world()
+
+
+def write_save(prepared):
+    """Write a prepare_save() capture to disk. Safe to run off the game thread."""
+    state_dict, world_raw = prepared
+    with _save_lock:
+        if getattr(state, 'JOURNAL_SAVES', False):
+            journal.record(state_dict, _write_snapshot)
+        else:
+            _write_snapshot(state_dict)
+        world.write_world(world_raw)
+        _update_slot_index(state_dict)
+
+
+def save_game():
+    """Save player state to disk (snapshot, plus journal deltas when enabled)."""
+    try:
+        write_save(prepare_save())
+    except Exception:
+        tracing.swallowed('persistence.save_game')
+
+
+def compact_save(prepared=None):
+    """Fold the save journal into a fresh snapshot (e.g. on exit)."""
+    try:
+        state_dict, world_raw = prepared or prepare_save()
+        with _save_lock:
+            journal.compact(state_dict, _write_snapshot)
+            world.write_world(world_raw)
+            _update_slot_index(state_dict)
+    except Exception:
+        tracing.swallowed('persistence.compact_save')
+
+
+def prepare_final_save():
+    """prepare_save() for the save on quit; None when no game was started or loaded.
+
+    Until a slot is picked on the start menu the live state is the defaults, and
+    SAVE_FILE still points at whichever slot was last selected.
+    """
+    if state.game_state == 'start_menu':
+        return None
+    return prepare_save()
+
+
+def _apply_state(s):
+    """Apply a schema-normalised save dict (see savefmt) to the live state."""
+    state.count = s.get('count', state.count)
+    state.per_click = s.get('per_click', state.per_click)
+    state.run_max_count = s.get('run_max_count', state.count)
+    # restore current room index if present (and rooms are available)
+    saved_room_index = s.get('current_room_index', getattr(state, 'current_room_index', 0))
+    px = s.get('player_x', state.player_x)
+    py = s.get('player_y', state.player_y)
+    # if rooms are present, clamp and load the saved room
+    if getattr(state, 'rooms', None):
+        saved_room_index = max(0, min(saved_room_index, len(state.rooms) - 1))
+        state.current_room_index = saved_room_index
+        state.load_room(saved_room_index)
+    if 0 <= px < state.ROOM_WIDTH and 0 <= py < state.ROOM_HEIGHT:
+        state.player_x = px
+        state.player_y = py
+    state.player_max_hp = s.get('player_max_hp', state.player_max_hp)
+    state.player_hp = s.get('player_hp', state.player_hp)
+    state.map_visit_count = s.get('map_visit_count', state.map_visit_count)
+    saved_upgrades = s.get('upgrades', {})
+    for upg in state.upgrades:
+        upg['purchased'] = saved_upgrades.get(upg['key'], False)
+    shop_state = s.get('shop', {})
+    for item in state.shop_items:
+        item['purchased'] = shop_state.get(item['key'], False)
+    state.attack = s.get('attack', state.attack)
+    state.defense = s.get('defense', state.defense)
+    state.has_bag = s.get('has_bag', state.has_bag)
+    state.inventory = s.get('inventory', state.inventory)
+    state.equipped_accessory = s.get('equipped_accessory', getattr(state, 'equipped_accessory', None))
+    state.equipped_weapon = s.get('equipped_weapon', state.equipped_weapon)
+    state.equipped_armour = s.get('equipped_armour', state.equipped_armour)
+    # action upgrade levels; re-derive the escalated cost from the base cost
+    saved_actions = s.get('action_upgrades', {})
+    for upg in getattr(state, 'action_upgrades', []):
+        base_cost = upg.setdefault('base_cost', upg['cost'])
+        level = saved_actions.get(upg['id'], 0)
+        cost = base_cost
+        for _ in range(level):
+            cost = int(cost * 1.8)
+        upg['level'] = level
+        upg['cost'] = cost
+    # load meta progression
+    state.meta_currency = s.get('meta_currency', state.meta_currency)
+    saved_meta = s.get('meta_upgrades', {})
+    for m in state.meta_upgrades:
+        m['purchased'] = saved_meta.get(m['id'], False)
+    state.meta_upgrades_state = {m['id']: m['purchased'] for m in state.meta_upgrades}
+    state.meta_start_per_click = s.get('meta_start_per_click', state.meta_start_per_click)
+    state.meta_start_attack = s.get('meta_start_attack', state.meta_start_attack)
+    state.inventory_capacity = s.get('inventory_capacity', state.inventory_capacity)
+    state.play_time = s.get('play_time', 0.0)
+    saved_generators = s.get('idle_generators', {})
+    for gen in state.idle_generators:
+        gen['count'] = saved_generators.get(gen['id'], 0)
+    production.invalidate()
+    state.session_start = time.time()
+
+
+def load_game():
+    """Load player state from disk if present (snapshot, then journal tail).
+
+    Returns True on success. On failure the live state is left untouched and the
+    reason is kept in `last_load_error`.
+    """
+    global last_load_error
+    path = _existing_save()
+    if path is None:
+        return False
+    try:
+        s = savefmt.coerce(journal.replay(_read_snapshot(path)))
+        # the saved floor replaces whatever was generated; rooms decode on load_room
+        has_world = world.load_world()
+    except (OSError, ValueError, TypeError) as e:
+        # SaveFormatError is a ValueError; a journal record of the wrong shape is either
+        last_load_error = str(e) or type(e).__name__
+        return False
+    if not has_world:
+        # saves from before world files (or with theirs lost): generate the saved floor anew
+        state.map_visit_count = s.get('map_visit_count', state.map_visit_count)
+        new_floor()
+    _apply_state(s)
+    if path != state.SAVE_FILE:
+        # a legacy .json save: the next save writes a full snapshot under the new name
+        journal.reset()
+    # credit the time the game was closed in one closed-form step
+    idle.apply_offline(s.get('last_seen'))
+    last_load_error = None
+    return True
+
+
+def has_save_file():
+    """Check if a save file (or its legacy .json) exists."""
+    return _existing_save() is not None
+
+
+# --- save slots ---
+
+# rewrite the slot index for play time alone at most this often (seconds)
+SLOT_PLAY_TIME_STEP = 60.0
+
+
+def slot_path(slot: int) -> str:
+    if slot == 1:
+        return os.path.join(state.SAVE_DIR, 'save' + SAVE_EXT)
+    return os.path.join(state.SAVE_DIR, f'save_{slot}{SAVE_EXT}')
+
+
+def select_slot(slot: int):
+    """Point SAVE_FILE (and the journal/world files next to it) at `slot`."""
+    state.current_slot = slot
+    state.SAVE_FILE = slot_path(slot)
+    journal.reset()
+    world.reset()
+
+
+def total_play_time() -> float:
+    started = getattr(state, 'session_start', None)
+    elapsed = time.time() - started if started else 0.0
+    return getattr(state, 'play_time', 0.0) + elapsed
+
+
+def _read_slot_index() -> dict:
+    try:
+        with open(state.SLOT_INDEX_FILE, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+_slot_index = None
+
+
+def _update_slot_index(state_dict):
+    global _slot_index
+    if _slot_index is None:
+        _slot_index = _read_slot_index()
+    summary = {
+        'floor': state_dict.get('map_visit_count', 0),
+        'count': state_dict.get('count', 0),
+        'meta_currency': state_dict.get('meta_currency', 0),
+        'play_time': round(state_dict.get('play_time', 0.0)),
+    }
+    key = str(state.current_slot)
+    prev = _slot_index.get(key)
+    if prev is not None:
+        same = all(prev.get(k) == v for k, v in summary.items() if k != 'play_time')
+        if same and summary['play_time'] - prev.get('play_time', 0) < SLOT_PLAY_TIME_STEP:
+            return
+    summary['saved_at'] = int(time.time())
+    _slot_index[key] = summary
+    tmp_path = state.SLOT_INDEX_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_slot_index, f)
+    os.replace(tmp_path, state.SLOT_INDEX_FILE)
+
+
+def list_slots() -> dict:
+    """Return {slot: summary or None} for every slot from the index file alone.
+
+    Saves made before the index existed show up as {} (present, no summary).
+    """
+    index = _read_slot_index()
+    slots = {}
+    for slot in range(1, state.SAVE_SLOTS + 1):
+        summary = index.get(str(slot))
+        if summary is None and _existing_save(slot_path(slot)) is not None:
+            summary = {}
+        slots[slot] = summary
+    return slots
+
+
+def _reset_run_state():
+    state.player_x = state.ROOM_WIDTH // 2
+    state.player_y = state.ROOM_HEIGHT // 2
+    state.defense = 0
+    state.has_bag = False
+    state.inventory = []
+    state.inventory_capacity = 0
+    state.equipped_weapon = None
+    state.equipped_armour = None
+    state.equipped_accessory = None
+    for upg in state.upgrades:
+        upg['purchased'] = False
+    for item in state.shop_items:
+        item['purchased'] = False
+    for gen in state.idle_generators:
+        gen['count'] = 0
+    production.invalidate()
+    state.idle_remainder = 0.0
+    state.last_idle_time = time.time()
+    # no welcome-back line for a run that did not start from a load
+    idle.last_offline_gain = Big(0)
+    idle.last_offline_seconds = 0.0
+
+
+def new_floor():
+    """Generate a floor for the current map_visit_count and enter its first room."""
+    try:
+        state.rooms = state.create_rooms(5, visits=state.map_visit_count)
+        state.load_room(0)
+    except Exception:
+        # fallback to old single-map if multi-room fails
+        tracing.swallowed('persistence.new_floor')
+        state.current_map = state.create_map()
+
+
+def ensure_floor():
+    """Generate a floor unless one exists: state.current_map starts as a blank grid."""
+    if not state.rooms:
+        new_floor()
+
+def reset_game():
+    """Reset all game state to defaults for a new game."""
+    state.count = Big(0)
+    state.play_time = 0.0
+    state.session_start = time.time()
+    state.per_click = Big(1)
+    state.attack = 0
+    _reset_run_state()
+    # generate initial rooms for a fresh game
+    new_floor()
+    # the next save starts from a full snapshot
+    journal.reset()
+
+
+def reset_run():
+    """Reset run-specific state after a death (keep meta progression)."""
+    state.count = Big(0)
+    state.per_click = Big(1 + getattr(state, 'meta_start_per_click', 0))
+    state.attack = 0 + getattr(state, 'meta_start_attack', 0)
+    _reset_run_state()
+    # regenerate rooms and load the first room for the run
+    new_floor()
+    # reset run-specific tracking
+    try:
+        state.run_max_count = Big(0)
+    except Exception:
+        tracing.swallowed('persistence.reset_run')
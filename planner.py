@@ -0,0 +1,115 @@
+# planner.py
+# Purchase planning for escalating upgrades. Every price grows geometrically
+# (price_k = price_0 * r**k), so N levels cost price * (r**N - 1) / (r - 1) and the
+# number of affordable levels solves for N with a logarithm. No buy-one-at-a-time loops.
+import math
+import state
+import idle
+from bignum import Big, pow_big
+
+# action upgrades multiply their price by this per level (see actions.buy_action_upgrade)
+ACTION_COST_GROWTH = 1.8
+
+_cache_key = None
+_cache = {}
+
+
+def series_cost(price, growth: float, n: int) -> Big:
+    """Total cost of the next `n` levels when the next one costs `price`."""
+    if n <= 0:
+        return Big(0)
+    if growth == 1:
+        return Big(price) * n
+    return Big(price) * (pow_big(growth, n) - 1) / (growth - 1)
+
+
+def max_affordable(price, growth: float, budget, cap: int = None) -> int:
+    """Most levels buyable with `budget` (optionally capped at `cap`)."""
+    budget = Big(budget)
+    price = Big(price)
+    if budget < price or price <= 0:
+        return 0
+    if growth == 1:
+        n = int((budget / price).floor())
+    else:
+        # budget >= price * (r**n - 1) / (r - 1)  <=>  n <= log_r(1 + budget * (r - 1) / price)
+        x = budget * (growth - 1) / price + 1
+        n = int(math.floor(x.log10() / math.log10(growth)))
+        # float rounding can put us one off either way
+        while n > 0 and series_cost(price, growth, n) > budget:
+            n -= 1
+        while series_cost(price, growth, n + 1) <= budget and (cap is None or n < cap):
+            n += 1
+    if cap is not None:
+        n = min(n, cap)
+    return max(0, n)
+
+
+def time_to_afford(cost, budget=None, rate=None):
+    """Seconds of idle income until `cost` is affordable (0 if it already is, None if never)."""
+    if budget is None:
+        budget = state.count
+    missing = Big(cost) - budget
+    if missing <= 0:
+        return 0.0
+    if rate is None:
+        rate = idle.income_rate()
+    if rate <= 0:
+        return None
+    return float(missing / rate)
+
+
+def _items():
+    """(kind, item, next price, growth, level cap) for everything with escalating prices."""
+    for gen in state.idle_generators:
+        yield 'generator', gen, idle.generator_cost(gen), state.IDLE_COST_GROWTH, None
+    for upg in getattr(state, 'action_upgrades', []):
+        cap = max(0, upg.get('max_level', 1) - upg.get('level', 0))
+        yield 'action', upg, upg['cost'], ACTION_COST_GROWTH, cap
+    for upg in state.upgrades:
+        if not upg.get('purchased'):
+            yield 'upgrade', upg, upg['cost'], 1, 1
+
+
+def plan() -> dict:
+    """Estimates for every purchasable item, keyed by (kind, key).
+
+    Each entry: affordable levels now, their total cost, and the seconds until the
+    next level is affordable at the current income. Cached until count or per_click
+    (or anything bought) changes.
+    """
+    global _cache_key, _cache
+    key = (state.count, state.per_click,
+           tuple(g.get('count', 0) for g in state.idle_generators),
+           tuple(u.get('level', 0) for u in getattr(state, 'action_upgrades', [])),
+           tuple(u.get('purchased') for u in state.upgrades))
+    if key == _cache_key:
+        return _cache
+    rate = idle.income_rate()
+    result = {}
+    for kind, item, price, growth, cap in _items():
+        n = max_affordable(price, growth, state.count, cap)
+        result[(kind, item['key'])] = {
+            'name': item['name'],
+            'next_cost': Big(price),
+            'affordable': n,
+            'cost': series_cost(price, growth, n),
+            'eta': time_to_afford(price, state.count, rate) if not cap == 0 else None,
+        }
+    _cache_key = key
+    _cache = result
+    return result
+
+
+def format_eta(seconds) -> str:
+    if seconds is None:
+        return 'never'
+    if seconds <= 0:
+        return 'now'
+    if seconds < 60:
+        return f'{seconds:.0f}s'
+    if seconds < 3600:
+        return f'{seconds / 60:.0f}m'
+    if seconds < 86400 * 2:
+        return f'{seconds / 3600:.1f}h'
+    return f'{seconds / 86400:.1f}d'
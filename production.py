@@ -0,0 +1,162 @@
+# production.py
+# Vectorised generator production. The generator dicts in state.idle_generators stay the
+# source of truth for keys, names and owned counts; this module mirrors them as parallel
+# NumPy arrays (counts, base rates as base-2 mantissa/exponent, synergies, click flags)
+# that live as long as the generator list does. A purchase updates its tier's count in
+# place (update_count); only a load or reset rebuilds them (invalidate).
+#
+# Each tier's output is count x rate x synergy boost x 2**doublings. The array pass keeps
+# it as a mantissa array and a base-2 exponent array, so the milestone doublings are an
+# integer add and nothing overflows; the click and income sums are taken relative to the
+# largest exponent, and only those two totals (and a tier's output when it is shown)
+# become Big. Totals are cached until the next change, so the per-tick cost is a lookup.
+#
+# The pure-Python path does the same per tier with Big. It is also used below
+# NUMPY_MIN_TIERS, where NumPy's per-call overhead outweighs the loop.
+import math
+import state
+from bignum import Big, pow_big
+
+# fewer tiers than this are computed in Python (see benchmarks/production.py)
+NUMPY_MIN_TIERS = 16
+
+_dirty = True          # the arrays must be rebuilt from the generator dicts
+_stale = True          # the totals must be recomputed from the arrays
+_layout = None         # id() of the generator list the arrays were built from
+_arrays = None         # (counts, rate_m, rate_e, synergy, is_click) for _layout
+_clicks_rate = Big(0)  # auto-clicks per second across all click generators
+_income_rate = Big(0)  # currency per second across all income generators
+_output = None         # index -> output per second of that generator (before per_click)
+np = None              # numpy, imported on the first refresh (False if unavailable)
+
+
+def _numpy():
+    # numpy is most of the game's import time; the start menu never needs it
+    global np
+    if np is None:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = False
+    return np
+
+
+def invalidate():
+    """Rebuild everything on the next read; call after a load, reset or new generator list."""
+    global _dirty, _stale
+    _dirty = _stale = True
+
+
+def update_count(index: int):
+    """Pick up the new count of generator `index` (after a purchase) without a rebuild."""
+    global _stale
+    _stale = True
+    if _arrays is not None and not _dirty and _layout == id(state.idle_generators):
+        _arrays[0][index] = state.idle_generators[index].get('count', 0)
+
+
+def _build_arrays(gens):
+    """The persistent arrays for `gens`: (counts, rate_m, rate_e, synergy, is_click)."""
+    n = len(gens)
+    counts = np.fromiter((g.get('count', 0) for g in gens), dtype=np.float64, count=n)
+    rate_m, rate_e = np.frexp(np.fromiter((g['rate'] for g in gens), dtype=np.float64, count=n))
+    synergy = np.fromiter((g.get('synergy', 0.0) for g in gens), dtype=np.float64, count=n)
+    is_click = np.fromiter((g['type'] == 'clicks' for g in gens), dtype=bool, count=n)
+    return counts, rate_m, rate_e.astype(np.int64), synergy, is_click
+
+
+def _scaled(v: float, doublings: int) -> Big:
+    """v * 2**doublings as a Big; exact while it fits a double, through pow_big past that."""
+    if doublings < 1024:
+        x = v * 2.0 ** doublings
+        if not math.isinf(x):
+            return Big(x)
+    return Big(v) * pow_big(2.0, doublings)
+
+
+def _sum_scaled(m, e) -> Big:
+    # sum of m * 2**e, taken relative to the largest exponent
+    if not len(m):
+        return Big(0)
+    top = int(e.max())
+    return _scaled(float(np.ldexp(m, e - top).sum()), top)
+
+
+def _compute_numpy(arrays):
+    """(clicks, income, output) from _build_arrays() arrays; output(i) is tier i as a Big."""
+    counts, rate_m, rate_e, synergy, is_click = arrays
+    # each unit of a tier boosts the tier below it by that tier's synergy fraction
+    boost = np.ones_like(counts)
+    boost[:-1] += synergy[1:] * counts[1:]
+    m, e = np.frexp(counts * rate_m * boost)
+    e = e + rate_e
+    # every MILESTONE owned of one tier doubles that tier's output
+    milestone = state.GENERATOR_MILESTONE
+    if milestone:
+        e += (counts // milestone).astype(np.int64)
+    clicks = _sum_scaled(m[is_click], e[is_click])
+    income = _sum_scaled(m[~is_click], e[~is_click])
+    return clicks, income, lambda i: _scaled(float(m[i]), int(e[i]))
+
+
+def _compute_python(gens):
+    """(clicks, income, output) computed tier by tier with Big."""
+    out = []
+    clicks = income = Big(0)
+    milestone = state.GENERATOR_MILESTONE
+    for i, g in enumerate(gens):
+        n = g.get('count', 0)
+        boost = 1.0
+        if i + 1 < len(gens):
+            above = gens[i + 1]
+            boost += above.get('synergy', 0.0) * above.get('count', 0)
+        b = _scaled(n * g['rate'] * boost, n // milestone if milestone else 0)
+        out.append(b)
+        if g['type'] == 'clicks':
+            clicks += b
+        else:
+            income += b
+    return clicks, income, out.__getitem__
+
+
+def _refresh():
+    global _dirty, _stale, _layout, _arrays, _clicks_rate, _income_rate, _output
+    gens = state.idle_generators
+    if _layout != id(gens):
+        _dirty = True
+    if not _dirty and not _stale:
+        return
+    if len(gens) >= NUMPY_MIN_TIERS and _numpy():
+        if _dirty or _arrays is None:
+            _arrays = _build_arrays(gens)
+        _clicks_rate, _income_rate, _output = _compute_numpy(_arrays)
+    else:
+        _arrays = None
+        if gens:
+            _clicks_rate, _income_rate, _output = _compute_python(gens)
+        else:
+            _clicks_rate, _income_rate, _output = Big(0), Big(0), None
+    _layout = id(gens)
+    _dirty = _stale = False
+
+
+def rates():
+    """(auto-clicks per second, currency per second) across all generators."""
+    _refresh()
+    return _clicks_rate, _income_rate
+
+
+def income_rate() -> Big:
+    """Currency per second from every generator at the current per_click."""
+    _refresh()
+    return _clicks_rate * state.per_click + _income_rate
+
+
+def generator_output(index: int) -> Big:
+    """Currency per second produced by the generator at `index` (click tiers at per_click)."""
+    _refresh()
+    v = _output(index) if index < len(state.idle_generators) else Big(0)
+    if state.idle_generators[index]['type'] == 'clicks':
+        return v * state.per_click
+    return v
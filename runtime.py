@@ -0,0 +1,153 @@
+# runtime.py
+# The game's event loop. Everything runs as tasks on one asyncio loop instead of
+# daemon threads: key events arrive as an async stream, and the logic tick, movement,
+# rendering and autosave are each a task. Handlers and timers therefore never run
+# concurrently with each other, and only disk writes leave the loop (on a single-worker
+# executor). Esc cancels the tasks and flushes a final save (if a game was started or
+# loaded) before returning.
+#
+# The keyboard library still reads the OS on its own listener thread; its callback only
+# forwards events into the loop's queue.
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import keyboard
+import loops
+import persistence
+import shm_export
+import state
+import tracing
+
+EXIT_KEY = 'esc'
+MOVEMENT_KEYS = {'w': (0, -1), 'a': (-1, 0), 's': (0, 1), 'd': (1, 0)}
+
+
+async def key_events(loop):
+    """Yield (name, event_type) for every key event, in order."""
+    queue = asyncio.Queue()
+
+    def forward(event):
+        loop.call_soon_threadsafe(queue.put_nowait, (event.name, event.event_type))
+
+    hook = keyboard.hook(forward)
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        keyboard.unhook(hook)
+
+
+class Runtime:
+    def __init__(self, bindings: dict, release_bindings: dict = None):
+        self.bindings = bindings
+        self.release_bindings = release_bindings or {}
+        self.held = set()
+        self.stop = None
+        self.dirty = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='save')
+        self.exporter = None
+
+    # --- tasks ---
+
+    async def input_task(self, loop):
+        async for name, kind in key_events(loop):
+            if name is None:
+                continue
+            name = name.lower()
+            if kind == keyboard.KEY_DOWN:
+                if name == EXIT_KEY:
+                    self.stop.set()
+                    return
+                self.held.add(name)
+                handler = self.bindings.get(name)
+            else:
+                self.held.discard(name)
+                handler = self.release_bindings.get(name)
+            if handler is not None:
+                # handlers draw their own screens; the render task only covers ticks
+                with tracing.span('key', 'input', key=name, down=kind == keyboard.KEY_DOWN):
+                    handler()
+
+    async def tick_task(self):
+        while True:
+            await asyncio.sleep(loops.TICK_DELAY)
+            try:
+                if loops.tick():
+                    self.dirty.set()
+                if self.exporter is not None:
+                    self.exporter.publish()
+            except Exception:
+                tracing.swallowed('runtime.tick')
+
+    async def movement_task(self):
+        while True:
+            await asyncio.sleep(loops.MOVEMENT_DELAY)
+            dx = sum(MOVEMENT_KEYS[k][0] for k in self.held if k in MOVEMENT_KEYS)
+            dy = sum(MOVEMENT_KEYS[k][1] for k in self.held if k in MOVEMENT_KEYS)
+            try:
+                loops.movement_step(dx, dy)
+            except Exception:
+                tracing.swallowed('runtime.movement')
+
+    async def render_task(self):
+        while True:
+            await self.dirty.wait()
+            self.dirty.clear()
+            try:
+                loops.redraw()
+            except Exception:
+                tracing.swallowed('runtime.render')
+
+    async def autosave_task(self, loop):
+        while True:
+            await asyncio.sleep(loops.AUTOSAVE_DELAY)
+            if not loops.can_autosave():
+                continue
+            try:
+                # capture on the loop so no handler mutates state mid-save; write off it
+                prepared = persistence.prepare_save()
+                await loop.run_in_executor(self.executor, persistence.write_save, prepared)
+            except Exception:
+                tracing.swallowed('runtime.autosave')
+
+    # --- lifecycle ---
+
+    async def main(self):
+        loop = asyncio.get_running_loop()
+        self.stop = asyncio.Event()
+        self.dirty = asyncio.Event()
+        if state.SHM_EXPORT:
+            self.exporter = shm_export.Exporter(state.SHM_EXPORT)
+        tasks = [
+            asyncio.create_task(self.input_task(loop)),
+            asyncio.create_task(self.tick_task()),
+            asyncio.create_task(self.movement_task()),
+            asyncio.create_task(self.render_task()),
+            asyncio.create_task(self.autosave_task(loop)),
+        ]
+        try:
+            await self.stop.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # an autosave already on the executor finishes before this final flush
+            try:
+                prepared = persistence.prepare_final_save()
+                if prepared is not None:
+                    await loop.run_in_executor(self.executor, persistence.compact_save, prepared)
+            finally:
+                self.executor.shutdown(wait=True)
+                if self.exporter is not None:
+                    self.exporter.close()
+                if tracing.ENABLED:
+                    tracing.export(state.TRACE_FILE)
+
+
+def run(bindings: dict, release_bindings: dict = None):
+    """Run the game until Esc (or Ctrl+C)."""
+    runtime = Runtime(bindings, release_bindings)
+    try:
+        asyncio.run(runtime.main())
+    except KeyboardInterrupt:
+        pass
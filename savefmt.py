@@ -0,0 +1,409 @@
+# savefmt.py
+# Versioned binary save format. The save layout is declared once in SCHEMAS and both
+# the binary encoder/decoder and the JSON loader are driven by it.
+#
+# File layout:  MAGIC | version (uvarint) | string table | fields in schema order
+# Strings (dict keys, item names, ascii art...) are stored once in the string table
+# and referenced by index, so thousands of similar inventory items stay small.
+import json
+import struct
+from bignum import Big
+
+MAGIC = b'CPTS'
+FORMAT_VERSION = 4
+
+# field name -> kind, in encoding order. Append new fields in a new version only.
+SCHEMAS = {
+    1: [
+        ('count', 'num'),
+        ('per_click', 'num'),
+        ('current_room_index', 'uint'),
+        ('player_x', 'uint'),
+        ('player_y', 'uint'),
+        ('player_hp', 'int'),
+        ('player_max_hp', 'int'),
+        ('map_visit_count', 'uint'),
+        ('upgrades', 'flags'),
+        ('shop', 'flags'),
+        ('attack', 'int'),
+        ('defense', 'int'),
+        ('has_bag', 'bool'),
+        ('inventory', 'any'),
+        ('equipped_accessory', 'any'),
+        ('action_upgrades', 'uintmap'),
+        ('equipped_weapon', 'any'),
+        ('equipped_armour', 'any'),
+        ('meta_currency', 'int'),
+        ('meta_upgrades', 'flags'),
+        ('meta_start_per_click', 'int'),
+        ('meta_start_attack', 'int'),
+        ('inventory_capacity', 'uint'),
+        ('journal_seq', 'uint'),
+    ],
+}
+SCHEMAS[2] = SCHEMAS[1] + [
+    ('play_time', 'num'),
+]
+SCHEMAS[3] = SCHEMAS[2] + [
+    ('idle_generators', 'uintmap'),
+    ('last_seen', 'num'),
+]
+# currency moved to bignum.Big: stored as a double mantissa + svarint exponent
+SCHEMAS[4] = [(name, 'big' if name in ('count', 'per_click') else kind) for name, kind in SCHEMAS[3]] + [
+    ('run_max_count', 'big'),
+]
+
+# tags for 'any' values
+_T_NONE, _T_FALSE, _T_TRUE, _T_INT, _T_FLOAT, _T_STR, _T_LIST, _T_DICT = range(8)
+_DOUBLE = struct.Struct('<d')
+
+
+class SaveFormatError(ValueError):
+    """Raised when a save file cannot be decoded."""
+
+
+# --- varints ---
+# put_uvarint/get_uvarint and put_strings/get_strings are the shared codec: world.py
+# writes its room records with them too.
+
+def put_uvarint(buf: bytearray, n: int):
+    """Append `n` (>= 0) as a little-endian base-128 varint."""
+    if n < 0:
+        raise SaveFormatError(f'negative value for unsigned field: {n}')
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def _put_svarint(buf: bytearray, n: int):
+    # zigzag so small negatives stay small
+    put_uvarint(buf, (n << 1) if n >= 0 else ((-n << 1) - 1))
+
+
+def get_uvarint(data, pos: int):
+    """(value, next position) of the varint at `pos`."""
+    result = 0
+    shift = 0
+    while True:
+        try:
+            b = data[pos]
+        except IndexError:
+            raise SaveFormatError('truncated varint') from None
+        pos += 1
+        result |= (b & 0x7F) << shift
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _get_svarint(data, pos: int):
+    n, pos = get_uvarint(data, pos)
+    return ((n >> 1) if not n & 1 else -((n + 1) >> 1)), pos
+
+
+# --- encoding ---
+
+class _Writer:
+    def __init__(self):
+        self.body = bytearray()
+        self.strings = {}
+
+    def strref(self, s: str):
+        idx = self.strings.get(s)
+        if idx is None:
+            idx = self.strings[s] = len(self.strings)
+        put_uvarint(self.body, idx)
+
+    def any(self, v):
+        buf = self.body
+        if v is None:
+            buf.append(_T_NONE)
+        elif v is True:
+            buf.append(_T_TRUE)
+        elif v is False:
+            buf.append(_T_FALSE)
+        elif isinstance(v, int):
+            buf.append(_T_INT)
+            _put_svarint(buf, v)
+        elif isinstance(v, float):
+            buf.append(_T_FLOAT)
+            buf += _DOUBLE.pack(v)
+        elif isinstance(v, str):
+            buf.append(_T_STR)
+            self.strref(v)
+        elif isinstance(v, (list, tuple)):
+            buf.append(_T_LIST)
+            put_uvarint(buf, len(v))
+            for item in v:
+                self.any(item)
+        elif isinstance(v, dict):
+            buf.append(_T_DICT)
+            put_uvarint(buf, len(v))
+            for k, item in v.items():
+                self.strref(str(k))
+                self.any(item)
+        else:
+            raise SaveFormatError(f'cannot encode {type(v).__name__}')
+
+    def field(self, kind: str, v):
+        buf = self.body
+        if kind == 'uint':
+            put_uvarint(buf, int(v))
+        elif kind == 'int':
+            _put_svarint(buf, int(v))
+        elif kind == 'bool':
+            buf.append(1 if v else 0)
+        elif kind == 'num' or kind == 'any':
+            self.any(v)
+        elif kind == 'big':
+            b = Big.from_json(v)
+            buf += _DOUBLE.pack(b.m)
+            _put_svarint(buf, b.e)
+        elif kind == 'flags':
+            put_uvarint(buf, len(v))
+            for k, flag in v.items():
+                self.strref(str(k))
+                buf.append(1 if flag else 0)
+        elif kind == 'uintmap':
+            put_uvarint(buf, len(v))
+            for k, n in v.items():
+                self.strref(str(k))
+                put_uvarint(buf, int(n))
+        else:
+            raise SaveFormatError(f'unknown field kind {kind!r}')
+
+
+def encode(data: dict, version: int = FORMAT_VERSION) -> bytes:
+    """Encode a save dict (as built by persistence) into the binary format."""
+    w = _Writer()
+    for name, kind in SCHEMAS[version]:
+        if name not in data:
+            # missing fields are written as their neutral value
+            w.field(kind, _DEFAULTS[kind]())
+        else:
+            w.field(kind, data[name])
+    out = bytearray(MAGIC)
+    put_uvarint(out, version)
+    put_strings(out, w.strings)
+    out += w.body
+    return bytes(out)
+
+
+def put_strings(out: bytearray, strings):
+    """Append a string table: count, then each UTF-8 string with its length."""
+    put_uvarint(out, len(strings))
+    for s in strings:
+        raw = s.encode('utf-8')
+        put_uvarint(out, len(raw))
+        out += raw
+
+
+def encode_value(v) -> bytes:
+    """Encode one standalone value (with its own string table)."""
+    w = _Writer()
+    w.any(v)
+    out = bytearray()
+    put_strings(out, w.strings)
+    out += w.body
+    return bytes(out)
+
+
+_DEFAULTS = {
+    'uint': int, 'int': int, 'bool': bool, 'num': int, 'big': int, 'any': lambda: None,
+    'flags': dict, 'uintmap': dict,
+}
+
+
+# --- decoding ---
+
+def get_strings(data, pos: int):
+    """(list of strings, next position) of the string table at `pos`."""
+    nstrings, pos = get_uvarint(data, pos)
+    strings = []
+    for _ in range(nstrings):
+        n, pos = get_uvarint(data, pos)
+        if pos + n > len(data):
+            raise SaveFormatError('truncated string table')
+        strings.append(bytes(data[pos:pos + n]).decode('utf-8'))
+        pos += n
+    return strings, pos
+
+
+def _reader(data, strings):
+    """Build the (strref, read_any) decoding closures over `data`."""
+
+    def strref(pos):
+        idx = data[pos] if pos < len(data) else 0x80
+        if idx < 0x80:
+            # single-byte fast path: the common case for string tables < 128 entries
+            pos += 1
+        else:
+            idx, pos = get_uvarint(data, pos)
+        try:
+            return strings[idx], pos
+        except IndexError:
+            raise SaveFormatError(f'bad string reference {idx}') from None
+
+    def read_any(pos):
+        try:
+            tag = data[pos]
+        except IndexError:
+            raise SaveFormatError('truncated value') from None
+        pos += 1
+        if tag == _T_STR:
+            return strref(pos)
+        if tag == _T_INT:
+            n = data[pos] if pos < len(data) else 0x80
+            if n < 0x80:
+                return ((n >> 1) if not n & 1 else -((n + 1) >> 1)), pos + 1
+            return _get_svarint(data, pos)
+        if tag == _T_FLOAT:
+            if pos + 8 > len(data):
+                raise SaveFormatError('truncated float')
+            return _DOUBLE.unpack_from(data, pos)[0], pos + 8
+        if tag == _T_NONE:
+            return None, pos
+        if tag == _T_FALSE:
+            return False, pos
+        if tag == _T_TRUE:
+            return True, pos
+        if tag == _T_LIST:
+            n, pos = get_uvarint(data, pos)
+            out = []
+            for _ in range(n):
+                v, pos = read_any(pos)
+                out.append(v)
+            return out, pos
+        if tag == _T_DICT:
+            n, pos = get_uvarint(data, pos)
+            out = {}
+            for _ in range(n):
+                k, pos = strref(pos)
+                out[k], pos = read_any(pos)
+            return out, pos
+        raise SaveFormatError(f'bad value tag {tag}')
+
+    return strref, read_any
+
+
+def decode_value(data):
+    """Decode a value written by encode_value()."""
+    strings, pos = get_strings(data, 0)
+    return _reader(data, strings)[1](pos)[0]
+
+
+def decode(data) -> dict:
+    """Decode binary save bytes back into a save dict."""
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise SaveFormatError('not a binary save')
+    pos = len(MAGIC)
+    version, pos = get_uvarint(data, pos)
+    schema = SCHEMAS.get(version)
+    if schema is None:
+        raise SaveFormatError(f'unsupported save version {version}')
+    strings, pos = get_strings(data, pos)
+    strref, read_any = _reader(data, strings)
+
+    result = {}
+    for name, kind in schema:
+        if kind == 'uint':
+            v, pos = get_uvarint(data, pos)
+        elif kind == 'int':
+            v, pos = _get_svarint(data, pos)
+        elif kind == 'bool':
+            if pos >= len(data):
+                raise SaveFormatError('truncated bool')
+            v = bool(data[pos])
+            pos += 1
+        elif kind == 'num' or kind == 'any':
+            v, pos = read_any(pos)
+        elif kind == 'big':
+            # kept as a plain [m, e] pair here; coerce() turns it into a Big
+            if pos + 8 > len(data):
+                raise SaveFormatError('truncated number')
+            m = _DOUBLE.unpack_from(data, pos)[0]
+            e, pos = _get_svarint(data, pos + 8)
+            v = [m, e]
+        elif kind == 'flags':
+            n, pos = get_uvarint(data, pos)
+            v = {}
+            for _ in range(n):
+                k, pos = strref(pos)
+                if pos >= len(data):
+                    raise SaveFormatError('truncated flags')
+                v[k] = bool(data[pos])
+                pos += 1
+        else:  # uintmap
+            n, pos = get_uvarint(data, pos)
+            v = {}
+            for _ in range(n):
+                k, pos = strref(pos)
+                v[k], pos = get_uvarint(data, pos)
+        result[name] = v
+    return result
+
+
+# --- JSON path, normalised through the same schema ---
+
+def _coerce_num(v):
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        v = float(v)
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+
+_COERCE = {
+    'uint': int,
+    'int': int,
+    'bool': bool,
+    'num': _coerce_num,
+    'big': Big.from_json,
+    'any': lambda v: v,
+    'flags': lambda v: {str(k): bool(f) for k, f in dict(v).items()},
+    'uintmap': lambda v: {str(k): int(n) for k, n in dict(v).items()},
+}
+
+
+def coerce(s: dict, version: int = FORMAT_VERSION) -> dict:
+    """Type-check a JSON-loaded save dict against the schema.
+
+    Only fields present in `s` are returned; unknown keys are dropped.
+    """
+    out = {}
+    for name, kind in SCHEMAS[version]:
+        if name in s:
+            try:
+                out[name] = _COERCE[kind](s[name])
+            except (TypeError, ValueError) as e:
+                raise SaveFormatError(f'bad value for {name}: {s[name]!r}') from e
+    return out
+
+
+def parse(raw: bytes) -> dict:
+    """Decode save bytes, auto-detecting binary vs JSON, without coercing the values.
+
+    The result is plain JSON data (Big fields stay [m, e] pairs), so a journal can be
+    replayed over it before coerce() runs once on the merged dict.
+    """
+    if raw[:len(MAGIC)] == MAGIC:
+        return decode(raw)
+    try:
+        s = json.loads(raw.decode('utf-8'))
+    except ValueError as e:
+        raise SaveFormatError(f'corrupt save: {e}') from e
+    if not isinstance(s, dict):
+        raise SaveFormatError('save root is not an object')
+    return s
+
+
+def loads(raw: bytes) -> dict:
+    """Decode save bytes, auto-detecting binary vs JSON, and coerce them to the schema."""
+    return coerce(parse(raw))
+
+
+def dumps(data: dict, fmt: str = 'binary') -> bytes:
+    if fmt == 'json':
+        return json.dumps(data).encode('utf-8')
+    return encode(data)
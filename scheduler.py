@@ -0,0 +1,156 @@
+# scheduler.py
+# Hierarchical timing wheel for timed game events (autosave, respawns, cooldowns, splash
+# screens, idle payouts), driven by the logic tick instead of a sleep or thread each.
+#
+# LEVELS wheels of SLOTS slots each: wheel 0 covers the next SLOTS ticks one slot per
+# tick, wheel 1 the next SLOTS**2 ticks SLOTS ticks per slot, and so on. A timer goes
+# into the coarsest slot that still pins down its deadline; whenever a finer wheel wraps,
+# the next slot of the coarser one is emptied and its timers re-inserted further down.
+# Scheduling and cancelling are O(1) (cancelled timers are dropped when their slot comes
+# up); each tick only touches the slot that is due.
+import threading
+import time
+
+import tracing
+
+TICK = 1.0 / 30.0       # seconds per wheel tick (matches loops.TICK_DELAY)
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+LEVELS = 4              # 64**4 ticks at 30 Hz is about 6.5 days
+_MASK = SLOTS - 1
+_SPAN = SLOTS ** LEVELS
+# after a long stall, process at most this many ticks in one advance() (the rest later)
+MAX_CATCH_UP = 30 * 60
+
+
+class Timer:
+    __slots__ = ('deadline', 'fn', 'args', 'interval', 'cancelled')
+
+    def __init__(self, deadline, fn, args, interval):
+        self.deadline = deadline
+        self.fn = fn
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimingWheel:
+    def __init__(self, tick: float = TICK, start: float = None):
+        self.tick_seconds = tick
+        self.start = time.monotonic() if start is None else start
+        self.now = 0
+        self.pending = 0
+        self._wheels = [[[] for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._lock = threading.Lock()
+
+    def _ticks(self, seconds: float) -> int:
+        return max(1, int(round(seconds / self.tick_seconds)))
+
+    def _insert(self, timer):
+        delta = timer.deadline - self.now
+        if delta < 0:
+            delta = 0
+        deadline = timer.deadline if delta < _SPAN else self.now + _SPAN - 1
+        for level in range(LEVELS):
+            if delta < SLOTS ** (level + 1) or level == LEVELS - 1:
+                self._wheels[level][(deadline >> (SLOT_BITS * level)) & _MASK].append(timer)
+                return
+
+    def after(self, seconds: float, fn, *args) -> Timer:
+        """Run fn(*args) once, `seconds` from now (rounded to whole ticks, at least one)."""
+        with self._lock:
+            timer = Timer(self.now + self._ticks(seconds), fn, args, None)
+            self._insert(timer)
+            self.pending += 1
+        return timer
+
+    def every(self, seconds: float, fn, *args) -> Timer:
+        """Run fn(*args) every `seconds` until the returned timer is cancelled."""
+        ticks = self._ticks(seconds)
+        with self._lock:
+            timer = Timer(self.now + ticks, fn, args, ticks)
+            self._insert(timer)
+            self.pending += 1
+        return timer
+
+    def cancel(self, timer):
+        if timer is not None and not timer.cancelled:
+            timer.cancel()
+
+    def _step(self) -> list:
+        """Advance one tick; returns the timers due on it (called with the lock held)."""
+        self.now += 1
+        now = self.now
+        # cascade from the coarsest wheel that just wrapped down to wheel 1
+        top = 0
+        while top < LEVELS - 1 and not now & ((1 << (SLOT_BITS * (top + 1))) - 1):
+            top += 1
+        for level in range(top, 0, -1):
+            slot = (now >> (SLOT_BITS * level)) & _MASK
+            timers = self._wheels[level][slot]
+            if timers:
+                self._wheels[level][slot] = []
+                for timer in timers:
+                    if timer.cancelled:
+                        self.pending -= 1
+                    else:
+                        self._insert(timer)
+        slot = now & _MASK
+        due = self._wheels[0][slot]
+        if not due:
+            return due
+        self._wheels[0][slot] = []
+        ready = []
+        for timer in due:
+            if timer.cancelled:
+                self.pending -= 1
+            elif timer.deadline <= now:
+                ready.append(timer)
+            else:
+                # parked far away (beyond the span): goes round again
+                self._insert(timer)
+        return ready
+
+    def advance(self, now: float = None) -> int:
+        """Run every timer due up to wall time `now`; returns how many fired."""
+        if now is None:
+            now = time.monotonic()
+        target = int((now - self.start) / self.tick_seconds)
+        fired = 0
+        steps = 0
+        while self.now < target and steps < MAX_CATCH_UP:
+            steps += 1
+            with self._lock:
+                if not self.pending:
+                    # nothing scheduled: jump straight to the target tick
+                    self.now = target
+                    break
+                ready = self._step()
+            for timer in ready:
+                if timer.cancelled:
+                    with self._lock:
+                        self.pending -= 1
+                    continue
+                try:
+                    timer.fn(*timer.args)
+                except Exception:
+                    tracing.swallowed(f'scheduler timer {getattr(timer.fn, "__name__", timer.fn)}')
+                fired += 1
+                with self._lock:
+                    if timer.interval and not timer.cancelled:
+                        timer.deadline = self.now + timer.interval
+                        self._insert(timer)
+                    else:
+                        self.pending -= 1
+        return fired
+
+
+# the game's wheel, advanced by loops.tick from the runtime's tick task
+wheel = TimingWheel()
+after = wheel.after
+every = wheel.every
+cancel = wheel.cancel
+advance = wheel.advance
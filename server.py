@@ -0,0 +1,415 @@
+# server.py
+# Hosts many game sessions in one asyncio process. Clients connect over TCP or a Unix
+# socket, send key events and get the rendered screen back as frames (frames.py): a
+# keyframe first, then only the lines that changed.
+#
+# The game keeps its state in module globals (state.py and a few module-private caches),
+# so every session owns a copy of those globals and swaps them in around each piece of
+# work: key handlers, its logic tick and its timers (each session has its own timing
+# wheel). Work for one session never yields to the loop while it is swapped in, so one
+# loop thread is enough. While active, sys.stdout is the session's Screen, which is what
+# the render functions print into.
+#
+# Spectators connect with WATCH <name> and get that session's screen through a
+# broadcast.Hub: encoded once per frame, however many are watching.
+#
+# Each session saves into its own directory under --save-dir, keyed by the name it sends
+# in its HELLO. Its game state is measured every BUDGET_CHECK_DELAY seconds; over
+# --budget, the floor's rooms are packed into world.py's RLE records, and a session still
+# over budget after that is saved and disconnected.
+#
+# Usage: python server.py [--port 7777 | --unix PATH] [--save-dir DIR]
+import argparse
+import asyncio
+import contextlib
+import copy
+import itertools
+import os
+import re
+import sys
+import time
+import types
+
+import assets
+import broadcast
+import clicks
+import content
+import frames
+import idle
+import journal
+import loops
+import main as game
+import persistence
+import production
+import render
+import scheduler
+import state
+import tracing
+import world
+
+MAX_SESSIONS = 500
+# approximate bytes of game state one session may hold
+MEMORY_BUDGET = 2 * 1024 * 1024
+BUDGET_CHECK_DELAY = 10.0
+# idle sessions run their timers this often; sessions holding a movement key every
+# loops.MOVEMENT_DELAY
+SESSION_TICK = 0.25
+HELLO_TIMEOUT = 10.0
+# a client whose socket buffer holds more than this gets no diffs until it drains, then
+# a keyframe
+MAX_PENDING_BYTES = 256 * 1024
+MAX_SCREEN_CHARS = 64 * 1024
+EXIT_KEY = 'esc'
+MOVEMENT_KEYS = {'w': (0, -1), 'a': (-1, 0), 's': (0, 1), 'd': (1, 0)}
+SESSION_NAME = re.compile(r'[A-Za-z0-9_-]{1,32}')
+
+
+def _session_names(module) -> list:
+    return [n for n, v in vars(module).items()
+            if not n.startswith('__') and not isinstance(v, (types.ModuleType, types.FunctionType, type))]
+
+
+# module globals owned by each session; everything else is shared by all of them
+SWAPPED = {
+    state: _session_names(state),
+    clicks: ('_presses', '_drains', '_applied'),
+    journal: ('_last', '_seq', '_records'),
+    world: ('_last_written',),
+    persistence: ('_slot_index', 'last_load_error'),
+    idle: ('last_offline_gain', 'last_offline_seconds'),
+    scheduler: ('wheel', 'after', 'every', 'cancel', 'advance'),
+}
+# values as imported (content packs applied), before any session ran; new sessions start
+# from copies of these
+content.apply()
+assets.load()
+_PRISTINE = {module: {n: vars(module)[n] for n in names} for module, names in SWAPPED.items()}
+
+
+def _copy(value):
+    try:
+        return copy.deepcopy(value)
+    except (TypeError, copy.Error):
+        # locks and the like are shared
+        return value
+
+
+def _fresh_globals(save_dir: str) -> dict:
+    values = {module: {n: _copy(v) for n, v in names.items()} for module, names in _PRISTINE.items()}
+    values[state].update(SAVE_DIR=save_dir, SAVE_FILE=os.path.join(save_dir, 'save' + persistence.SAVE_EXT),
+                         SLOT_INDEX_FILE=os.path.join(save_dir, 'slots.json'))
+    values[clicks].update(_presses=itertools.count(), _drains=0, _applied=0)
+    wheel = scheduler.TimingWheel()
+    values[scheduler].update(wheel=wheel, after=wheel.after, every=wheel.every,
+                             cancel=wheel.cancel, advance=wheel.advance)
+    return values
+
+
+def footprint(objects) -> int:
+    """Approximate bytes reachable from `objects` (modules, classes and functions excluded)."""
+    seen = set()
+    stack = list(objects)
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (types.ModuleType, types.FunctionType, type)):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            # list.copy, not iter(): LazyRooms would decode every room
+            stack.extend(list.copy(obj))
+        elif isinstance(obj, (tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+    return total
+
+
+class Screen:
+    """Stands in for sys.stdout while a session is active; render.clear() empties it."""
+
+    def __init__(self):
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        if self._size + len(text) <= MAX_SCREEN_CHARS:
+            self._parts.append(text)
+            self._size += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def clear_screen(self):
+        self._parts = []
+        self._size = 0
+
+    def lines(self) -> list:
+        text = ''.join(self._parts)
+        self._parts = [text] if text else []
+        return text.rstrip('\n').split('\n') if text else []
+
+
+class Session:
+    def __init__(self, name: str, save_dir: str, writer):
+        self.name = name
+        self.writer = writer
+        self.screen = Screen()
+        self.sent = None          # lines of the last frame sent; None forces a keyframe
+        self.held = set()
+        self.next_tick = 0.0
+        self.closing = None       # reason, once the server decided to drop the session
+        self.hub = None           # broadcast.Hub, once someone watches
+        self.globals = _fresh_globals(os.path.join(save_dir, name))
+
+    @contextlib.contextmanager
+    def active(self):
+        for module, values in self.globals.items():
+            vars(module).update(values)
+        stdout = sys.stdout
+        sys.stdout = self.screen
+        production.invalidate()
+        try:
+            yield self
+        finally:
+            sys.stdout = stdout
+            for module, values in self.globals.items():
+                live = vars(module)
+                for n in values:
+                    values[n] = live[n]
+
+    def footprint(self) -> int:
+        """Bytes held by the session's game state and screen. Call while active."""
+        live = [vars(module)[n] for module, names in SWAPPED.items() for n in names
+                if module is not scheduler]
+        return footprint(live + [self.screen._parts, self.sent])
+
+
+def _pack_rooms():
+    """Swap the floor's rooms for RLE records, except the room being played."""
+    rooms = state.rooms
+    if not rooms:
+        return
+    state.sync_room()
+    state.rooms = world.pack_rooms(rooms, keep=(state.current_room_index,))
+
+
+class Server:
+    def __init__(self, save_dir: str, max_sessions: int = MAX_SESSIONS, budget: int = MEMORY_BUDGET):
+        self.save_dir = save_dir
+        self.max_sessions = max_sessions
+        self.budget = budget
+        self.sessions = {}
+        if not game.BINDINGS:
+            game.register_bindings()
+
+    # --- per-session work (each runs with the session swapped in) ---
+
+    def _start(self, session):
+        loops.schedule_events()
+        scheduler.every(loops.AUTOSAVE_DELAY, self._autosave)
+        scheduler.every(BUDGET_CHECK_DELAY, self._check_budget, session)
+        render.display_start_menu()
+
+    def _autosave(self):
+        if loops.can_autosave():
+            persistence.save_game()
+
+    def _check_budget(self, session):
+        if session.footprint() <= self.budget:
+            return
+        _pack_rooms()
+        if session.footprint() > self.budget:
+            self._close(session, 'memory budget exceeded')
+
+    def _input(self, session, name, down):
+        with session.active():
+            if down:
+                if name == EXIT_KEY:
+                    self._close(session, 'bye')
+                    return
+                session.held.add(name)
+                handler = game.BINDINGS.get(name)
+            else:
+                session.held.discard(name)
+                handler = game.RELEASE_BINDINGS.get(name)
+            if handler is not None:
+                with tracing.span('key', 'input', session=session.name, key=name, down=down):
+                    handler()
+            # apply the press now instead of at the session's next tick
+            if loops.tick():
+                loops.redraw()
+
+    def _tick(self, session, moving):
+        with session.active():
+            if moving:
+                dx = sum(MOVEMENT_KEYS[k][0] for k in moving)
+                dy = sum(MOVEMENT_KEYS[k][1] for k in moving)
+                loops.movement_step(dx, dy)
+            if loops.tick():
+                loops.redraw()
+
+    # --- connections ---
+
+    def _send(self, session):
+        writer = session.writer
+        if session.hub is not None:
+            session.hub.publish(session.screen.lines())
+        if writer.is_closing():
+            return
+        if writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            session.sent = None
+            return
+        lines = session.screen.lines()
+        msg = frames.frame(session.sent, lines)
+        if msg is not None:
+            writer.write(msg)
+            session.sent = lines
+
+    def _close(self, session, reason):
+        if session.closing is None:
+            session.closing = reason
+            if not session.writer.is_closing():
+                session.writer.write(frames.bye(reason))
+                # ends the read in handle(), which saves and drops the session
+                session.writer.close()
+
+    async def handle(self, reader, writer):
+        try:
+            msg = await asyncio.wait_for(frames.read_message(reader), HELLO_TIMEOUT)
+        except (asyncio.TimeoutError, frames.FrameError):
+            msg = None
+        if msg and msg[0] == frames.WATCH:
+            await self._watch(msg[1].decode('utf-8', 'replace'), writer)
+            return
+        name = msg[1].decode('utf-8', 'replace') if msg and msg[0] == frames.HELLO else ''
+        refusal = None
+        if not SESSION_NAME.fullmatch(name):
+            refusal = 'expected HELLO with a session name'
+        elif name in self.sessions:
+            refusal = 'session already connected'
+        elif len(self.sessions) >= self.max_sessions:
+            refusal = 'server full'
+        if refusal:
+            writer.write(frames.bye(refusal))
+            writer.close()
+            return
+        session = Session(name, self.save_dir, writer)
+        self.sessions[name] = session
+        try:
+            with session.active():
+                os.makedirs(state.SAVE_DIR, exist_ok=True)
+                self._start(session)
+            self._send(session)
+            while session.closing is None:
+                msg = await frames.read_message(reader)
+                if msg is None:
+                    break
+                if msg[0] != frames.KEY:
+                    continue
+                key_name, down = frames.decode_key(msg[1])
+                try:
+                    self._input(session, key_name.lower(), down)
+                except Exception:
+                    tracing.swallowed('server.input')
+                self._send(session)
+                await writer.drain()
+        except (frames.FrameError, ConnectionError):
+            pass
+        finally:
+            del self.sessions[name]
+            if session.hub is not None:
+                session.hub.close()
+            with session.active():
+                # nothing to keep for a session that never left the start menu
+                if state.game_state != 'start_menu':
+                    persistence.save_game()
+            if not writer.is_closing():
+                writer.close()
+
+    async def _watch(self, name, writer):
+        """Stream session `name` to a spectator until either side goes away."""
+        session = self.sessions.get(name)
+        if session is None or session.closing is not None:
+            writer.write(frames.bye('no such session'))
+            writer.close()
+            return
+        if session.hub is None:
+            session.hub = broadcast.Hub()
+            session.hub.publish(session.screen.lines())
+        sub = session.hub.subscribe()
+        try:
+            while True:
+                msg = await sub.get()
+                if msg is None:
+                    writer.write(frames.bye('session ended'))
+                    break
+                writer.write(msg)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            sub.close()
+            if not writer.is_closing():
+                writer.close()
+
+    async def tick_loop(self):
+        while True:
+            await asyncio.sleep(loops.MOVEMENT_DELAY)
+            now = time.monotonic()
+            for session in list(self.sessions.values()):
+                if session.closing is not None:
+                    continue
+                moving = [k for k in session.held if k in MOVEMENT_KEYS]
+                if not moving and now < session.next_tick:
+                    continue
+                if now >= session.next_tick:
+                    session.next_tick = now + SESSION_TICK
+                try:
+                    self._tick(session, moving)
+                except Exception:
+                    tracing.swallowed('server.tick')
+                self._send(session)
+
+
+async def serve(server: Server, host: str = frames.DEFAULT_HOST, port: int = frames.DEFAULT_PORT,
+                unix: str = None):
+    if unix:
+        listener = await asyncio.start_unix_server(server.handle, unix)
+        where = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f'{host}:{port}'
+    print(f'serving on {where} (save dir {server.save_dir})', file=sys.stderr)
+    ticker = asyncio.create_task(server.tick_loop())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        ticker.cancel()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Host many game sessions over TCP or a Unix socket.')
+    ap.add_argument('--host', default=frames.DEFAULT_HOST)
+    ap.add_argument('--port', type=int, default=frames.DEFAULT_PORT)
+    ap.add_argument('--unix', help='listen on this Unix socket path instead of TCP')
+    ap.add_argument('--save-dir', default=os.path.join(state.SAVE_DIR, 'sessions'))
+    ap.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    ap.add_argument('--budget', type=float, default=MEMORY_BUDGET / (1024 * 1024),
+                    help='per-session memory budget in MiB')
+    args = ap.parse_args(argv)
+    server = Server(args.save_dir, args.max_sessions, int(args.budget * 1024 * 1024))
+    try:
+        asyncio.run(serve(server, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,250 @@
+# shm_export.py
+# Publishes a fixed-layout snapshot of the live game into multiprocessing.shared_memory
+# so dashboards and bots in other processes can read it without scraping the terminal
+# or polling the save file.
+#
+# Layout (little-endian):  MAGIC | version | seq (u64) | fields (FIELDS) | tile grid
+# The grid is ROOM_HEIGHT x ROOM_WIDTH tile codes (world.TILES; OTHER_TILE for anything
+# else), row-major, at TILES_OFFSET.
+#
+# seq is a seqlock: the writer makes it odd, writes, then makes it even again. A reader
+# takes seq (retrying while odd), reads, and keeps what it read only if seq is still the
+# same afterwards. The writer never waits for readers. seq is an aligned 8-byte word
+# written in one store, so a reader never sees half of it.
+#
+# Usage: python shm_export.py NAME   (prints the snapshot published under NAME)
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+import state
+import tracing
+import world
+from bignum import Big
+
+# not savefmt's b'CPTS': this is a different layout
+MAGIC = b'CPTM'
+FORMAT_VERSION = 1
+OTHER_TILE = len(world.TILES)
+GAME_STATES = ('start_menu', 'menu', 'incremental', 'generators', 'explore', 'battle',
+               'transition', 'shop', 'inventory', 'meta', 'action_upgrade')
+UNKNOWN_STATE = 255
+
+_HEAD = struct.Struct('<4sHxxQ')
+_SEQ_OFFSET = 8
+# name -> struct code; currency is a Big as (mantissa, exponent)
+FIELDS = (
+    ('updated', 'd'),
+    ('count_m', 'd'), ('count_e', 'q'),
+    ('per_click_m', 'd'), ('per_click_e', 'q'),
+    ('player_y', 'i'), ('player_x', 'i'), ('room', 'i'), ('floor', 'i'),
+    ('hp', 'i'), ('max_hp', 'i'), ('game_state', 'i'), ('height', 'i'), ('width', 'i'),
+    ('enemy_hp', 'i'), ('enemy_max_hp', 'i'), ('enemy_atk', 'i'), ('pack_size', 'i'),
+    ('skill_points', 'i'), ('skill_points_max', 'i'), ('shield', 'i'), ('buff', 'i'),
+    ('debuff', 'i'), ('stunned', 'i'), ('stun_duration', 'i'),
+)
+_FIELDS = struct.Struct('<' + ''.join(code for _, code in FIELDS))
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+_FIELDS_OFFSET = _HEAD.size
+# tile grid starts on a cache line of its own
+TILES_OFFSET = -(-(_FIELDS_OFFSET + _FIELDS.size) // 64) * 64
+HEIGHT = state.ROOM_HEIGHT
+WIDTH = state.ROOM_WIDTH
+SIZE = TILES_OFFSET + HEIGHT * WIDTH
+# readers give up after this many torn reads in a row
+MAX_RETRIES = 1000
+
+
+class _TileCodes(dict):
+    """str.translate table: tile character -> one-byte code, OTHER_TILE if unknown."""
+
+    def __missing__(self, ch):
+        self[ch] = chr(OTHER_TILE)
+        return self[ch]
+
+
+_TILE_CODES = _TileCodes({ord(ch): chr(i) for i, ch in enumerate(world.TILES)})
+
+
+def _big(value):
+    value = value if isinstance(value, Big) else Big(value)
+    return float(value.m), int(value.e)
+
+
+def _encode_row(line: str) -> bytes:
+    line = line[:WIDTH].translate(_TILE_CODES)
+    return (line + chr(OTHER_TILE) * (WIDTH - len(line))).encode('latin-1')
+
+
+# encoded bytes per row string: a room has few distinct rows and they rarely change
+_rows = {}
+ROW_CACHE_LIMIT = 4096
+
+
+def encode_tiles(grid) -> bytes:
+    """HEIGHT*WIDTH tile codes for a map grid (list of rows of characters)."""
+    if len(_rows) > ROW_CACHE_LIMIT:
+        _rows.clear()
+    out = []
+    for row in grid[:HEIGHT]:
+        line = ''.join(row)
+        raw = _rows.get(line)
+        if raw is None:
+            raw = _rows[line] = _encode_row(line)
+        out.append(raw)
+    out.extend([bytes([OTHER_TILE]) * WIDTH] * (HEIGHT - len(out)))
+    return b''.join(out)
+
+
+def snapshot_fields() -> tuple:
+    """The FIELDS values for the current game state."""
+    enemy = state.current_battle_enemy or {}
+    status = state.current_battle_status or {}
+    count_m, count_e = _big(state.count)
+    click_m, click_e = _big(state.per_click)
+    code = GAME_STATES.index(state.game_state) if state.game_state in GAME_STATES else UNKNOWN_STATE
+    return (
+        time.time(), count_m, count_e, click_m, click_e,
+        int(state.player_y), int(state.player_x), int(state.current_room_index), int(state.map_visit_count),
+        int(state.player_hp), int(state.player_max_hp), code, HEIGHT, WIDTH,
+        int(enemy.get('hp', 0)), int(enemy.get('max_hp', enemy.get('hp', 0))), int(enemy.get('atk', 0)),
+        int(enemy.get('pack_size', 1 if enemy else 0)),
+        int(status.get('skill_points', 0)), int(status.get('skill_points_max', 0)),
+        int(status.get('player_shield', 0)), int(status.get('player_buff', 0)),
+        int(status.get('enemy_debuff', 0)), int(bool(status.get('player_stunned', False))),
+        int(status.get('stun_duration', 0)),
+    )
+
+
+class Exporter:
+    """Writer side: owns the shared memory block and publishes into it."""
+
+    def __init__(self, name: str = None):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=SIZE)
+        except FileExistsError:
+            # left behind by a game that did not exit cleanly (the name is ours): replace it
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=SIZE)
+        self.name = self.shm.name
+        self._buf = self.shm.buf
+        self._seq = 0
+        _HEAD.pack_into(self._buf, 0, MAGIC, FORMAT_VERSION, 0)
+
+    def publish(self):
+        """Write the current game state. Call from the game loop (the only writer)."""
+        fields = snapshot_fields()
+        tiles = encode_tiles(state.current_map)
+        buf = self._buf
+        self._seq += 1
+        struct.pack_into('<Q', buf, _SEQ_OFFSET, self._seq)
+        _FIELDS.pack_into(buf, _FIELDS_OFFSET, *fields)
+        buf[TILES_OFFSET:SIZE] = tiles
+        self._seq += 1
+        struct.pack_into('<Q', buf, _SEQ_OFFSET, self._seq)
+
+    def close(self):
+        self._buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _attach(name):
+    try:
+        # 3.13+: readers must not unlink the writer's block when they exit
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            # the tracker may then unlink the block when this reader exits
+            tracing.swallowed('shm_export.attach')
+        return shm
+
+
+class Reader:
+    """Reader side, for other processes.
+
+    read() returns a consistent copy. For zero-copy access, take seq = begin(), use
+    fields() and tiles (a HEIGHT x WIDTH memoryview into the block: tiles[y, x]), then
+    keep the results only if valid(seq).
+    """
+
+    def __init__(self, name: str):
+        self.shm = _attach(name)
+        self._buf = self.shm.buf
+        magic, version, _ = _HEAD.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.tiles = None
+            self.close()
+            raise ValueError(f'{name} is not a game snapshot')
+        self.tiles = self._buf[TILES_OFFSET:SIZE].cast('B', (HEIGHT, WIDTH))
+
+    def _seq(self) -> int:
+        return struct.unpack_from('<Q', self._buf, _SEQ_OFFSET)[0]
+
+    def begin(self) -> int:
+        """Wait out a write in progress; returns the seq to pass to valid()."""
+        for _ in range(MAX_RETRIES):
+            seq = self._seq()
+            if not seq & 1:
+                return seq
+            time.sleep(0)
+        raise TimeoutError('snapshot writer stuck mid-write')
+
+    def valid(self, seq: int) -> bool:
+        return self._seq() == seq
+
+    def fields(self) -> dict:
+        return dict(zip(FIELD_NAMES, _FIELDS.unpack_from(self._buf, _FIELDS_OFFSET)))
+
+    def read(self) -> dict:
+        """Consistent copy of the snapshot: fields plus 'tiles' (bytes) and 'seq'."""
+        for _ in range(MAX_RETRIES):
+            seq = self.begin()
+            out = self.fields()
+            out['tiles'] = bytes(self._buf[TILES_OFFSET:SIZE])
+            if self.valid(seq):
+                out['seq'] = seq
+                code = out['game_state']
+                out['game_state'] = GAME_STATES[code] if code < len(GAME_STATES) else None
+                out['count'] = Big(out.pop('count_m'), out.pop('count_e'))
+                out['per_click'] = Big(out.pop('per_click_m'), out.pop('per_click_e'))
+                return out
+        raise TimeoutError('snapshot kept changing while being read')
+
+    def close(self):
+        if self.tiles is not None:
+            self.tiles.release()
+            self.tiles = None
+        self._buf = None
+        self.shm.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print('usage: python shm_export.py NAME', file=sys.stderr)
+        return 2
+    reader = Reader(argv[0])
+    try:
+        while True:
+            snap = reader.read()
+            print(f"[{snap['seq']}] {snap['game_state']} room {snap['room']} floor {snap['floor']} "
+                  f"at ({snap['player_y']}, {snap['player_x']}) HP {snap['hp']}/{snap['max_hp']} "
+                  f"currency {snap['count']} enemy HP {snap['enemy_hp']}")
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
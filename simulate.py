@@ -0,0 +1,222 @@
+# simulate.py
+# Headless balance runs: fight many battles with battle_core across a process pool and
+# report win rate, turn counts and HP left.
+# Usage: python simulate.py --enemy teto_boss --visits 3 --attack 30 --defense 5 --battles 1000000
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+from collections import Counter
+
+import advisor
+import battle_core
+import effects
+import encounter
+import state
+from state import create_enemy_instance
+
+# battles still running after this many turns count as losses
+MAX_TURNS = 500
+# advisor policy: seconds per decision
+ADVISOR_BUDGET = 0.005
+
+
+def policy_execute(player, enemy, status, rng):
+    """Attack whenever possible, recover otherwise."""
+    if status.get('player_stunned') or status.get('skill_points', 0) < battle_core.ACTION_COSTS['execute']:
+        return 'recover'
+    return 'execute'
+
+
+def policy_balanced(player, enemy, status, rng):
+    """Debuff and buff early, shield when hurt, then attack."""
+    sp = status.get('skill_points', 0)
+    if status.get('player_stunned'):
+        return 'recover'
+    if status.get('enemy_debuff', 0) < battle_core.DEBUFF_CAP and enemy.get('atk', 0) > player['defense'] and sp >= 2:
+        return 'hack'
+    if status.get('player_buff', 0) == 0 and sp >= 3:
+        return 'debug'
+    if player['hp'] < player['max_hp'] // 3 and status.get('player_shield', 0) == 0 and sp >= 2:
+        return 'defend'
+    if sp >= 1:
+        return 'execute'
+    return 'recover'
+
+
+def policy_random(player, enemy, status, rng):
+    return rng.choice(list(battle_core.ACTION_TABLE))
+
+
+def policy_advisor(player, enemy, status, rng):
+    return advisor.best_action(player, enemy, status, player['bonuses'], player['visits'],
+                               ADVISOR_BUDGET, player['max_hp'])
+
+
+POLICIES = {
+    'execute': policy_execute,
+    'balanced': policy_balanced,
+    'random': policy_random,
+    'advisor': policy_advisor,
+}
+
+
+def fight(build: dict, enemy_key: str, visits: int, policy, rng) -> tuple:
+    """One battle (against a pack of build['pack'] enemies). Returns (won, turns, hp_left)."""
+    player = {'hp': build['hp'], 'max_hp': build['hp'], 'attack': build['attack'], 'defense': build['defense'],
+              'bonuses': build['bonuses'], 'visits': visits}
+    status = battle_core.new_status(visits)
+    bonuses = build['bonuses']
+    pack = None
+    enemy = create_enemy_instance(enemy_key, visits)
+    if build.get('pack', 1) > 1:
+        pack = encounter.Encounter([create_enemy_instance(enemy_key, visits) for _ in range(build['pack'])])
+    else:
+        enemy.setdefault('max_hp', enemy['hp'])
+    log = []
+    if pack is None:
+        effects.on_start(player, enemy, status, log)
+        log.clear()
+
+    def turn(action):
+        if pack is None:
+            result, _ = battle_core.resolve_turn(player, enemy, status, action, bonuses, visits, rng, log)
+        else:
+            result, _ = pack.player_turn(player, status, action, bonuses, visits, rng, log)
+        log.clear()
+        return result
+
+    turns = 0
+    while turns < MAX_TURNS:
+        if pack is not None:
+            enemy = dict(pack.target_view(), atk=round(pack.pressure()))
+        action = policy(player, enemy, status, rng)
+        result = turn(action)
+        if result == battle_core.INVALID:
+            # the policy picked something impossible; fall back so the battle progresses
+            result = turn('recover' if action != 'recover' else 'execute')
+            if result == battle_core.INVALID:
+                return False, turns, player['hp']
+        turns += 1
+        if result == battle_core.WIN:
+            return True, turns, player['hp']
+        if result == battle_core.LOSE:
+            return False, turns, 0
+    return False, turns, player['hp']
+
+
+def _run_chunk(args):
+    build, enemy_key, visits, policy_name, n, seed = args
+    rng = random.Random(seed)
+    policy = POLICIES[policy_name]
+    wins = 0
+    turns = Counter()
+    hp_left = Counter()
+    for _ in range(n):
+        won, t, hp = fight(build, enemy_key, visits, policy, rng)
+        wins += won
+        turns[t] += 1
+        if won:
+            hp_left[hp] += 1
+    return wins, turns, hp_left
+
+
+def simulate(build: dict, enemy_key: str, visits: int, battles: int, policy: str = 'balanced',
+             workers: int = None, seed: int = 0, chunk: int = 20000) -> dict:
+    """Fight `battles` battles across a process pool and summarise them."""
+    jobs = []
+    remaining = battles
+    i = 0
+    while remaining > 0:
+        n = min(chunk, remaining)
+        jobs.append((build, enemy_key, visits, policy, n, seed * 1_000_003 + i))
+        remaining -= n
+        i += 1
+    wins = 0
+    turns = Counter()
+    hp_left = Counter()
+    if workers == 1:
+        results = map(_run_chunk, jobs)
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(_run_chunk, jobs)
+    try:
+        for w, t, h in results:
+            wins += w
+            turns.update(t)
+            hp_left.update(h)
+    finally:
+        if workers != 1:
+            pool.close()
+            pool.join()
+    return {
+        'enemy': enemy_key,
+        'visits': visits,
+        'policy': policy,
+        'battles': battles,
+        'win_rate': wins / battles if battles else 0.0,
+        'turns': _summary(turns),
+        'hp_left_on_win': _summary(hp_left),
+    }
+
+
+def _summary(hist: Counter) -> dict:
+    """Mean and percentiles of a value histogram."""
+    total = sum(hist.values())
+    if not total:
+        return {}
+    values = sorted(hist)
+    mean = sum(v * c for v, c in hist.items()) / total
+    out = {'min': values[0], 'max': values[-1], 'mean': round(mean, 2)}
+    marks = [(p, p / 100 * (total - 1)) for p in (10, 50, 90, 99)]
+    seen = 0
+    for v in values:
+        seen += hist[v]
+        while marks and seen > marks[0][1]:
+            out[f'p{marks[0][0]}'] = v
+            marks.pop(0)
+    return out
+
+
+def _parse_upgrades(text: str) -> dict:
+    # "execute_power=4,hack_power=2": bonus amounts, as battle_core.upgrade_bonuses returns
+    bonuses = {}
+    for part in filter(None, (text or '').split(',')):
+        key, _, value = part.partition('=')
+        bonuses[key.strip()] = int(value)
+    return bonuses
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Headless battle simulator for balance runs.')
+    ap.add_argument('--enemy', default='human', help='enemy template key (%s)' % ', '.join(state.ENEMY_TEMPLATES))
+    ap.add_argument('--visits', type=int, default=0, help='map_visit_count (floor depth)')
+    ap.add_argument('--hp', type=int, default=100)
+    ap.add_argument('--attack', type=int, default=10)
+    ap.add_argument('--defense', type=int, default=0)
+    ap.add_argument('--upgrades', default='', help='bonus amounts, e.g. execute_power=4,hack_power=2')
+    ap.add_argument('--pack', type=int, default=1, help='enemies fought at once')
+    ap.add_argument('--policy', choices=sorted(POLICIES), default='balanced')
+    ap.add_argument('--battles', type=int, default=100000)
+    ap.add_argument('--workers', type=int, default=None, help='processes (default: all CPUs)')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--json', action='store_true', help='print raw JSON results')
+    args = ap.parse_args(argv)
+
+    build = {'hp': args.hp, 'attack': args.attack, 'defense': args.defense, 'pack': args.pack,
+             'bonuses': _parse_upgrades(args.upgrades)}
+    result = simulate(build, args.enemy, args.visits, args.battles, args.policy, args.workers, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(f"{result['battles']} battles vs {args.pack}x {args.enemy} (visits {args.visits}, policy {args.policy})")
+    print(f"win rate: {result['win_rate'] * 100:.2f}%")
+    for name in ('turns', 'hp_left_on_win'):
+        stats = result[name]
+        if stats:
+            print(f"{name}: " + ' '.join(f'{k}={v}' for k, v in stats.items()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import pytest
+
+import actions
+import persistence
+import render
+import state
+
+
+@pytest.fixture
+def battle(save_dir, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    persistence.reset_game()
+    monkeypatch.setattr(state, 'message_log', [])
+    pos = (2, 2)
+    state.enemies[pos] = {'name': 'Bug', 'hp': 1, 'atk': 0, 'reward': 7, 'ascii': ''}
+    monkeypatch.setattr(state, 'attack', 5)
+    return pos
+
+
+def test_battle_screen_draws_the_log(battle, capsys):
+    actions.enter_battle(battle)
+    assert state.game_state == 'battle'
+    render.flash_message('hello')
+    render.display_battle()
+    out = capsys.readouterr().out
+    assert 'BATTLE: Bug' in out and 'hello' in out
+
+
+def test_auto_battle_settles_the_fight_on_entry(battle, monkeypatch):
+    monkeypatch.setattr(state, 'auto_battle', True)
+    before = state.count
+    actions.enter_battle(battle)
+    assert state.game_state == 'transition'
+    assert state.count == before + 7
+    assert battle not in state.enemies
+    assert state.message_log[-1].startswith('Auto-battle:')
+
+
+def test_turning_auto_battle_on_mid_fight_resolves_it(battle, monkeypatch):
+    monkeypatch.setattr(state, 'auto_battle', False)
+    actions.enter_battle(battle)
+    actions.toggle_auto_battle()
+    assert state.game_state == 'transition'
+    assert state.message_log[-1] == 'Auto-battle: ON'
+
+
+def test_next_target_switches_the_pack_target(battle, monkeypatch):
+    monkeypatch.setattr(state, 'auto_battle', False)
+    monkeypatch.setattr(state, 'map_visit_count', 3)
+    state.enemies = {battle: state.enemies[battle], (2, 4): {'name': 'Bot', 'hp': 9, 'atk': 0, 'reward': 1}}
+    actions.enter_battle(battle)
+    assert state.current_battle_enemy['name'] == 'Bug'
+    actions.next_target()
+    assert state.current_battle_enemy['name'] == 'Bot'
@@ -0,0 +1,64 @@
+import random
+
+import battle_core
+
+
+def _fight(enemy_hp=50, enemy_atk=6, attack=10, defense=0):
+    player = {'hp': 30, 'max_hp': 30, 'attack': attack, 'defense': defense}
+    enemy = {'name': 'x', 'hp': enemy_hp, 'max_hp': enemy_hp, 'atk': enemy_atk}
+    return player, enemy, battle_core.new_status(0)
+
+
+def test_execute_hits_and_the_enemy_replies():
+    player, enemy, status = _fight()
+    result, log = battle_core.resolve_turn(player, enemy, status, 'execute', {}, 0, random.Random(1))
+    assert result == battle_core.CONTINUE
+    assert enemy['hp'] == 40
+    assert player['hp'] == 24
+    assert status['skill_points'] == battle_core.SKILL_POINT_START - battle_core.ACTION_COSTS['execute']
+    assert log[0].startswith('Execute Code deals 10 damage')
+
+
+def test_killing_blow_wins_without_a_reply():
+    player, enemy, status = _fight(enemy_hp=5)
+    result, _ = battle_core.resolve_turn(player, enemy, status, 'execute', {}, 0, random.Random(1))
+    assert result == battle_core.WIN
+    assert player['hp'] == 30
+
+
+def test_shield_absorbs_and_upgrades_add_their_bonus():
+    player, enemy, status = _fight(enemy_atk=10)
+    battle_core.resolve_turn(player, enemy, status, 'defend', {'defend_power': 4}, 0, random.Random(1))
+    # 8 + 4 shield against 10 attack: no damage, 2 shield left
+    assert player['hp'] == 30
+    assert status['player_shield'] == 2
+
+
+def test_actions_without_skill_points_are_invalid_and_free():
+    player, enemy, status = _fight()
+    status['skill_points'] = 1
+    result, log = battle_core.resolve_turn(player, enemy, status, 'hack', {}, 0, random.Random(1))
+    assert result == battle_core.INVALID
+    assert status['skill_points'] == 1 and player['hp'] == 30
+    assert log == ['Not enough Skill Points']
+
+
+def test_losing_and_queued_turns():
+    player, enemy, status = _fight(enemy_hp=10 ** 6, enemy_atk=20)
+    result, done, _ = battle_core.resolve_turns(player, enemy, status, ['execute'] * 5, {}, 0, random.Random(1))
+    assert result == battle_core.LOSE
+    assert done == 2
+
+
+def test_upgrade_bonuses_sum_levels():
+    upgrades = [{'id': 'execute_power', 'level': 2, 'amount': 3}, {'id': 'defend_power', 'level': 0, 'amount': 8}]
+    assert battle_core.upgrade_bonuses(upgrades) == {'execute_power': 6, 'defend_power': 0}
+
+
+def test_an_end_of_turn_effect_can_win_the_battle():
+    player, enemy, status = _fight(enemy_hp=12)
+    battle_core.effects.add(status, 'enemy', enemy, 'poison', 5, 3, [])
+    result, log = battle_core.resolve_turn(player, enemy, status, 'execute', {}, 0, random.Random(1))
+    assert enemy['hp'] <= 0
+    assert result == battle_core.WIN
+    assert log[-1] == 'Poison deals 5 damage'
@@ -0,0 +1,65 @@
+import asyncio
+
+import broadcast
+import frames
+
+
+def _screen(n):
+    return [f'frame {n}'] + [f'static line {i} ' + '-' * 30 for i in range(10)]
+
+
+def _drain(sub):
+    async def run():
+        sub.close()
+        out = []
+        while (msg := await sub.get()) is not None:
+            out.append(msg)
+        return out
+    return asyncio.run(run())
+
+
+def _replay(messages):
+    lines = None
+    for msg in messages:
+        lines = frames.apply(lines, msg[:1], msg[5:])
+    return lines
+
+
+def test_every_viewer_gets_the_same_encoded_frame():
+    hub = broadcast.Hub()
+    hub.publish(_screen(0))
+    a, b = hub.subscribe(), hub.subscribe()
+    hub.publish(_screen(1))
+    hub.publish(_screen(1))   # unchanged: nothing queued
+    got_a, got_b = _drain(a), _drain(b)
+    assert got_a == got_b
+    assert [m[:1] for m in got_a] == [frames.KEYFRAME, frames.DIFF]
+    assert got_a[1] is got_b[1]
+    assert _replay(got_a) == _screen(1)
+
+
+def test_keyframes_are_sent_periodically():
+    hub = broadcast.Hub(keyframe_every=3)
+    sub = hub.subscribe()
+    for n in range(6):
+        hub.publish(_screen(n))
+    kinds = [m[:1] for m in _drain(sub)]
+    assert kinds == [frames.KEYFRAME, frames.DIFF, frames.KEYFRAME, frames.DIFF, frames.DIFF, frames.KEYFRAME]
+
+
+def test_slow_viewer_skips_ahead_to_the_latest_screen():
+    hub = broadcast.Hub(max_backlog=1024)
+    sub = hub.subscribe()
+    for n in range(500):
+        hub.publish(_screen(n))
+    assert sub.skipped > 0
+    assert sub._bytes <= 1024
+    assert _replay(_drain(sub)) == _screen(499)
+
+
+def test_closing_the_hub_ends_every_viewer():
+    hub = broadcast.Hub()
+    subs = [hub.subscribe() for _ in range(3)]
+    hub.close()
+    assert not hub.subscribers
+    assert all(_drain(sub) == [] for sub in subs)
@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+import content
+import state
+
+GOBLIN = {'name': 'Goblin', 'base_hp': 60, 'base_atk': 6, 'base_reward': 150, 'spawn': 0.3, 'ascii': '(g)'}
+
+
+@pytest.fixture
+def packs(tmp_path, monkeypatch):
+    monkeypatch.setattr(content, '_compiled', None)
+    monkeypatch.setattr(content, 'errors', [])
+
+    def write(name, pack):
+        (tmp_path / name).write_text(json.dumps(pack))
+        return str(tmp_path / name)
+    write.dir = str(tmp_path)
+    return write
+
+
+@pytest.mark.parametrize('pack, message', [
+    ({'enemies': {'g': dict(GOBLIN, colour='red')}}, "unknown field 'colour'"),
+    ({'enemies': {'g': dict(GOBLIN, base_hp='lots')}}, 'base_hp: expected an integer'),
+    ({'enemies': {'g': dict(GOBLIN, base_atk=True)}}, 'base_atk: expected an integer'),
+    ({'enemies': {'g': dict(GOBLIN, spawn=-1)}}, 'spawn: must not be negative'),
+    ({'enemies': {'g': dict(GOBLIN, specials=[{'type': 'curse'}])}}, "unknown special 'curse'"),
+    ({'shop_items': [{'key': '9', 'name': 'Spear', 'cost': 400, 'type': 'polearm', 'amount': 12}]},
+     "'polearm' is not one of"),
+    ({'upgrades': [{'key': '9'}]}, "missing 'name'"),
+    ({'weather': {}}, "unknown section 'weather'"),
+])
+def test_invalid_packs_are_rejected(packs, pack, message):
+    with pytest.raises(content.ContentError, match=message):
+        content.read_pack(packs('bad.json', pack))
+
+
+def test_valid_packs_merge_and_invalid_ones_are_skipped(packs):
+    packs('a.json', {'enemies': {'goblin': GOBLIN}})
+    packs('b.json', {'enemies': {'goblin': dict(GOBLIN, name='Hobgoblin')}})
+    packs('c.json', {'enemies': {'imp': dict(GOBLIN, base_hp='x')}})
+    compiled = content.load(packs.dir)
+    assert compiled['enemies']['goblin']['name'] == 'Hobgoblin'
+    assert 'imp' not in compiled['enemies'] and 'human' in compiled['enemies']
+    assert 'goblin' in compiled['spawn_keys']
+    assert len(content.errors) == 1 and content.errors[0].startswith('c.json')
+
+
+def test_pack_enemies_reach_the_game(packs):
+    packs('a.json', {'enemies': {'goblin': GOBLIN}})
+    content.load(packs.dir)
+    assert 'goblin' in state.ENEMY_TEMPLATES
+    enemy = state.create_enemy_instance('goblin', 0)
+    assert (enemy['name'], enemy['hp'], enemy['atk']) == ('Goblin', 60, 6)
+
+
+# enemy template fields that become stats (name, hp/atk/reward, art) or only steer spawning
+NOT_CARRIED = ('name', 'base_hp', 'base_atk', 'base_reward', 'hp_scale', 'atk_scale', 'reward_mult',
+               'spawn', 'boss', 'ascii')
+
+
+def test_room_spawns_keep_every_battle_field(packs, monkeypatch):
+    spitter = dict(GOBLIN, speed=17, special={'type': 'stun', 'chance': 0.1, 'duration': 1},
+                   specials=[{'type': 'poison', 'chance': 0.5, 'amount': 2, 'duration': 2}])
+    packs('a.json', {'enemies': {'spitter': spitter}})
+    content.load(packs.dir)
+    monkeypatch.setattr(content, 'spawn_key', lambda r: 'spitter')
+    enemy = content.room_enemy(0.0, 2)
+    # every template field that is not turned into stats or only used for spawning
+    battle = set(content.FIELDS['enemies']) - set(NOT_CARRIED)
+    assert battle == {'speed', 'special', 'specials'}
+    for field in battle:
+        assert enemy[field] == spitter[field]
+    # copies: a fight must not change the template
+    assert enemy['specials'][0] is not content.enemies()['spitter']['specials'][0]
+    assert content.battle_fields(spitter) == {k: enemy[k] for k in ('speed', 'special', 'specials')}
+    boss = state.create_enemy_instance('spitter', 2)
+    assert {k: boss[k] for k in ('speed', 'special', 'specials')} == content.battle_fields(spitter)
+
+
+def test_touched_packs_reuse_the_cache(packs, monkeypatch):
+    path = packs('a.json', {'enemies': {'goblin': GOBLIN}})
+    content.load(packs.dir)
+    assert os.path.exists(os.path.join(packs.dir, content.CACHE_NAME))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    monkeypatch.setattr(content, 'compile_packs', lambda paths: pytest.fail('cache not reused'))
+    monkeypatch.setattr(content, '_compiled', None)
+    assert 'goblin' in content.load(packs.dir)['enemies']
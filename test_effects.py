@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+import effects
+
+
+class _Always:
+    def random(self):
+        return 0.0
+
+
+def _fight(specials):
+    player = {'hp': 20, 'defense': 0}
+    enemy = {'name': 'Bug', 'hp': 10, 'max_hp': 10, 'atk': 0, 'specials': specials}
+    return player, enemy, {}
+
+
+def test_poison_ticks_once_per_turn_then_expires():
+    player, enemy, status = _fight([{'type': 'poison', 'amount': 2, 'duration': 2}])
+    log = []
+    effects.on_hit(player, enemy, status, _Always(), log)
+    for _ in range(3):
+        effects.end_turn(player, enemy, status, log)
+    assert player['hp'] == 16
+    assert not effects.active(status, 'player', 'poison')
+
+
+def test_refreshing_a_non_stacking_effect_keeps_one_instance():
+    player, enemy, status = _fight([])
+    effects.add(status, 'player', player, 'weaken', 2, 1, [])
+    effects.add(status, 'player', player, 'weaken', 3, 3, [])
+    assert len(status['effects']['player']) == 1
+    effects.end_turn(player, enemy, status, [])
+    assert status['player_buff'] == -3   # the stale expiry is skipped
+    for _ in range(2):
+        effects.end_turn(player, enemy, status, [])
+    assert status['player_buff'] == 0
+
+
+def test_start_specials_apply_on_start_only():
+    player, enemy, status = _fight([{'type': 'regen', 'amount': 1, 'duration': 5, 'when': 'start'}])
+    effects.on_hit(player, enemy, status, _Always(), [])
+    assert not effects.active(status, 'enemy', 'regen')
+    effects.on_start(player, enemy, status, [])
+    assert effects.active(status, 'enemy', 'regen')
+
+
+def test_hit_chance_combines_procs():
+    enemy = {'specials': [{'type': 'stun', 'chance': 0.5}, {'type': 'poison', 'chance': 0.5}]}
+    assert effects.hit_chance(enemy) == pytest.approx(0.75)
+
+
+def test_bad_special_data_is_not_swallowed():
+    player, enemy, status = _fight([{'type': 'poison', 'chance': 'often'}])
+    with pytest.raises(ValueError):
+        effects.on_hit(player, enemy, status, random.Random(1), [])
+
+
+def test_room_spawns_bring_their_specials_into_battle(save_dir, tmp_path, monkeypatch):
+    import json
+
+    import actions
+    import content
+    import persistence
+    import render
+    import state
+
+    pack = {'enemies': {'spitter': {'name': 'Spitter', 'base_hp': 500, 'base_atk': 0, 'base_reward': 1,
+                                    'spawn': 1.0, 'specials': [{'type': 'poison', 'amount': 2, 'duration': 2}]}}}
+    (tmp_path / 'spit.json').write_text(json.dumps(pack))
+    monkeypatch.setattr(content, '_compiled', None)
+    monkeypatch.setattr(content, 'errors', [])
+    content.load(str(tmp_path))
+    monkeypatch.setattr(content, 'spawn_key', lambda r: 'spitter')
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    monkeypatch.setattr(state, 'auto_battle', False)
+    persistence.reset_game()
+    room = state.create_room(0)
+    pos, enemy = next(iter(room['enemies'].items()))
+    assert enemy['specials'][0]['type'] == 'poison'
+    state.enemies = {pos: enemy}
+    actions.enter_battle(pos)
+    actions.execute_code()
+    assert effects.active(state.current_battle_status, 'player', 'poison')
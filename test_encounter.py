@@ -0,0 +1,43 @@
+import random
+
+import battle_core
+import content
+import encounter
+
+
+def _player():
+    return {'hp': 100, 'max_hp': 100, 'attack': 1, 'defense': 0}
+
+
+def test_room_spawns_keep_their_speed(monkeypatch):
+    monkeypatch.setattr(content, 'spawn_key', lambda r: 'dart_monkey')
+    enemy = content.room_enemy(0.0, 3)
+    assert enemy['speed'] == content.enemies()['dart_monkey']['speed']
+
+
+def test_faster_pack_members_act_more_often():
+    fast = {'name': 'fast', 'hp': 50, 'atk': 3, 'speed': 30}
+    slow = {'name': 'slow', 'hp': 50, 'atk': 5, 'speed': 10}
+    pack = encounter.Encounter([fast, slow])
+    player, status = _player(), battle_core.new_status(0)
+    pack.player_turn(player, status, 'recover', {}, 0, random.Random(1))
+    # three fast hits and one slow one before the player's next turn
+    assert player['hp'] == 100 - (3 * 3 + 5)
+
+
+def test_next_target_skips_the_dead_and_wraps():
+    pack = encounter.Encounter([{'hp': 5}, {'hp': 5}, {'hp': 5}])
+    pack.hp[1] = 0
+    assert pack.next_target() and pack.target == 2
+    assert pack.next_target() and pack.target == 0
+    pack.hp[2] = 0
+    assert not pack.next_target() and pack.target == 0
+
+
+def test_pack_battles_apply_start_specials():
+    weakener = {'name': 'w', 'hp': 5, 'specials': [{'type': 'weaken', 'amount': 2, 'duration': 3, 'when': 'start'}]}
+    pack = encounter.Encounter([{'name': 'plain', 'hp': 5}, weakener])
+    status = battle_core.new_status(0)
+    log = pack.start(_player(), status)
+    assert status['player_buff'] == -2
+    assert log == ['Your attack is weakened by 2']
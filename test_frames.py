@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import frames
+
+SCREEN = [f'line {i} ' + '#' * 40 for i in range(20)]
+
+
+def _split(msg):
+    return msg[:1], msg[5:]
+
+
+def _read_all(data):
+    async def drain():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        out = []
+        while (msg := await frames.read_message(reader)) is not None:
+            out.append(msg)
+        return out
+    return asyncio.run(drain())
+
+
+def test_small_changes_go_out_as_diffs():
+    new = list(SCREEN)
+    new[3] = 'changed'
+    msg = frames.frame(SCREEN, new)
+    kind, payload = _split(msg)
+    assert kind == frames.DIFF
+    assert len(msg) < len(frames.keyframe(new))
+    assert frames.apply(SCREEN, kind, payload) == new
+
+
+def test_diff_handles_screens_changing_length():
+    for new in (SCREEN[:5], SCREEN + ['extra']):
+        assert frames.apply(SCREEN, *_split(frames.frame(SCREEN, new))) == new
+
+
+def test_unchanged_screen_sends_nothing_and_a_rewrite_sends_a_keyframe():
+    assert frames.frame(SCREEN, list(SCREEN)) is None
+    rewritten = [line.upper() for line in SCREEN]
+    assert frames.frame(SCREEN, rewritten)[:1] == frames.KEYFRAME
+    assert frames.frame(None, SCREEN)[:1] == frames.KEYFRAME
+
+
+def test_messages_survive_the_stream():
+    data = frames.hello('alice') + frames.key('w', down=False) + frames.keyframe(SCREEN)
+    (k1, p1), (k2, p2), (k3, p3) = _read_all(data)
+    assert (k1, p1) == (frames.HELLO, b'alice')
+    assert frames.decode_key(p2) == ('w', False)
+    assert frames.apply(None, k3, p3) == SCREEN
+
+
+def test_torn_stream_ends_cleanly():
+    assert _read_all(frames.keyframe(SCREEN)[:-3]) == []
+
+
+@pytest.mark.parametrize('kind, payload, lines', [
+    (frames.DIFF, b'\x00\x01', None),
+    (frames.DIFF, b'\x00\x01\x00\x05\x00\x00\x00\x01x', ['a']),
+    (frames.KEY, b'down w', ['a']),
+])
+def test_bad_frames_raise(kind, payload, lines):
+    with pytest.raises(frames.FrameError):
+        frames.apply(lines, kind, payload)
@@ -0,0 +1,50 @@
+import pytest
+
+import actions
+import idle
+import persistence
+import render
+import state
+from bignum import Big
+
+BRACKETS = [(2, 1.0), (24, 0.5)]
+
+
+def test_accrued_weights_offline_brackets():
+    assert idle.accrued(Big(10), 3600) == Big(36000)
+    # 2h at full rate, then 22h at half, then nothing
+    assert idle.accrued(Big(1), 48 * 3600, BRACKETS) == Big(2 * 3600 + 0.5 * 22 * 3600)
+    assert idle.accrued(Big(0), 3600, BRACKETS) == Big(0)
+
+
+def test_apply_offline_credits_the_run(monkeypatch):
+    monkeypatch.setattr(state, 'count', Big(5))
+    monkeypatch.setattr(state, 'run_max_count', Big(5))
+    monkeypatch.setattr(state, 'OFFLINE_BRACKETS', BRACKETS)
+    monkeypatch.setattr(idle, 'income_rate', lambda: Big(2))
+    gain = idle.apply_offline(1000.0, now=1000.0 + 3600)
+    assert gain == Big(7200)
+    assert state.count == Big(7205)
+    assert state.run_max_count == state.count
+    assert idle.last_offline_seconds == 3600
+
+
+@pytest.fixture
+def screen(capsys, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    return capsys
+
+
+def test_loading_shows_the_welcome_back_line(save_dir, screen, monkeypatch):
+    persistence.reset_game()
+    state.idle_generators[1]['count'] = 10
+    persistence.save_game()
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    monkeypatch.setattr(persistence.time, 'time', lambda real=persistence.time.time: real() + 3600)
+    actions.load_game_from_menu()
+    assert state.game_state == 'menu'
+    assert idle.last_offline_gain > 0
+    assert 'Welcome back! Earned' in screen.readouterr().out
+    persistence.reset_run()
+    render.display_menu()
+    assert 'Welcome back' not in screen.readouterr().out
@@ -0,0 +1,55 @@
+import json
+
+import journal
+
+
+def _snapshots():
+    written = []
+    # copies: the journal keeps updating the dict it last compacted
+    return written, lambda data: written.append(dict(data))
+
+
+def test_first_record_is_a_snapshot(save_dir):
+    written, write = _snapshots()
+    journal.record({'count': 1, 'hp': 20}, write)
+    assert written == [{'count': 1, 'hp': 20, 'journal_seq': 1}]
+    assert open(journal.journal_path()).read() == ''
+
+
+def test_deltas_only_carry_changed_keys(save_dir):
+    written, write = _snapshots()
+    journal.record({'count': 1, 'hp': 20}, write)
+    journal.record({'count': 5, 'hp': 20}, write)
+    journal.record({'count': 5, 'hp': 20}, write)   # unchanged: nothing appended
+    lines = open(journal.journal_path()).read().splitlines()
+    assert [json.loads(line) for line in lines] == [{'count': 5, 'journal_seq': 2}]
+    assert len(written) == 1
+
+
+def test_replay_merges_the_tail(save_dir):
+    written, write = _snapshots()
+    journal.record({'count': 1, 'hp': 20}, write)
+    journal.record({'count': 5, 'hp': 20}, write)
+    journal.record({'count': 5, 'hp': 12}, write)
+    journal.reset()
+    merged = journal.replay(written[-1])
+    assert merged['count'] == 5 and merged['hp'] == 12
+    assert merged['journal_seq'] == 3
+
+
+def test_replay_skips_stale_records_and_a_torn_tail(save_dir):
+    with open(journal.journal_path(), 'w') as f:
+        f.write('{"count": 2, "journal_seq": 1}\n')    # older than the snapshot
+        f.write('{"count": 7, "journal_seq": 4}\n')
+        f.write('{"count": 9, "jour')                  # crash mid-append
+    merged = journal.replay({'count': 3, 'journal_seq': 2})
+    assert merged['count'] == 7
+
+
+def test_compaction_truncates_the_journal(save_dir, monkeypatch):
+    monkeypatch.setattr(journal, 'COMPACT_EVERY', 2)
+    written, write = _snapshots()
+    for n in range(4):
+        journal.record({'count': n}, write)
+    assert written[-1]['count'] == 2
+    assert len(open(journal.journal_path()).read().splitlines()) == 1
@@ -0,0 +1,34 @@
+import actions
+import loops
+import render
+import state
+from bignum import Big
+
+
+def _press_space():
+    actions.on_space()
+    actions.on_space_release()
+
+
+def test_space_on_the_start_menu_is_not_credited_to_the_new_game(save_dir, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    loops.tick()
+    for _ in range(5):
+        _press_space()
+    loops.tick()
+    actions.start_new_game()
+    assert state.game_state != 'start_menu'
+    loops.tick()
+    assert state.count == Big(0)
+
+
+def test_space_in_play_is_applied_on_the_next_tick(save_dir, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    actions.start_new_game()
+    loops.tick()
+    for _ in range(3):
+        _press_space()
+    assert loops.tick()
+    assert state.count == 3 * state.per_click
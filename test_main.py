@@ -0,0 +1,16 @@
+import pytest
+
+import main
+import state
+
+
+@pytest.mark.parametrize('argv, environ, traced', [
+    ([], {}, False),
+    (['--trace'], {}, True),
+    ([], {'CPT_TRACE': '1'}, True),
+    ([], {'CPT_TRACE': '0'}, False),
+])
+def test_tracing_is_enabled_from_the_command_line_or_environment(monkeypatch, argv, environ, traced):
+    monkeypatch.setattr(state, 'TRACE', False)
+    main.configure(argv, environ)
+    assert state.TRACE is traced
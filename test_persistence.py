@@ -0,0 +1,63 @@
+import os
+import shutil
+
+import pytest
+
+import persistence
+import state
+from bignum import Big
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _play():
+    persistence.reset_game()
+    state.count = Big(1.25, 40)
+    state.per_click = Big(7)
+    state.player_hp = 13
+    state.map_visit_count = 2
+    state.inventory = [{'name': 'Sword', 'type': 'weapon', 'level': 1, 'ascii': ''}]
+    state.upgrades[0]['purchased'] = True
+
+
+@pytest.mark.parametrize('fmt', ['json', 'binary'])
+def test_save_round_trips_through_load_game(save_dir, monkeypatch, fmt):
+    monkeypatch.setattr(state, 'SAVE_FORMAT', fmt)
+    _play()
+    persistence.save_game()
+    state.player_hp = 9
+    persistence.save_game()          # journalled delta on top of the snapshot
+    persistence.reset_game()
+    assert persistence.load_game(), persistence.last_load_error
+    assert state.count == Big(1.25, 40)
+    assert state.per_click == Big(7)
+    assert state.player_hp == 9
+    assert state.map_visit_count == 2
+    assert state.inventory[0]['name'] == 'Sword'
+    assert state.upgrades[0]['purchased']
+
+
+def test_tracked_legacy_save_loads(save_dir):
+    legacy = os.path.join(state.SAVE_DIR, 'save.json')
+    shutil.copy(os.path.join(ROOT, 'save.json'), legacy)
+    assert persistence.has_save_file()
+    assert persistence.list_slots()[1] == {}
+    persistence.reset_game()
+    assert persistence.load_game(), persistence.last_load_error
+    assert state.count == Big(28)
+    assert state.rooms
+    # the next save goes to the new name; the legacy file is left alone
+    persistence.save_game()
+    assert os.path.exists(state.SAVE_FILE) and state.SAVE_FILE.endswith('.dat')
+    with open(legacy, 'rb') as f, open(os.path.join(ROOT, 'save.json'), 'rb') as g:
+        assert f.read() == g.read()
+
+
+def test_bad_journal_is_a_load_error(save_dir):
+    _play()
+    persistence.save_game()
+    with open(os.path.splitext(state.SAVE_FILE)[0] + '.journal', 'w') as f:
+        f.write('{"player_hp": "lots", "journal_seq": 99}\n')
+    persistence.reset_game()
+    assert not persistence.load_game()
+    assert 'player_hp' in persistence.last_load_error
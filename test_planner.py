@@ -0,0 +1,45 @@
+import pytest
+
+import actions
+import planner
+import render
+import state
+from bignum import Big
+
+
+def _brute_force(price, growth, budget, cap=None):
+    n, total, step = 0, 0.0, float(price)
+    while total + step <= budget and (cap is None or n < cap):
+        total += step
+        step *= growth
+        n += 1
+    return n
+
+
+@pytest.mark.parametrize('price, growth, budget, cap', [
+    (100, 1.15, 99, None),
+    (100, 1.15, 100, None),
+    (100, 1.15, 12345, None),
+    (500, 1.15, 10 ** 7, None),
+    (200, 1.8, 10 ** 6, 5),
+    (10, 1, 95, None),
+])
+def test_max_affordable_matches_buying_one_at_a_time(price, growth, budget, cap):
+    n = planner.max_affordable(price, growth, budget, cap)
+    assert n == _brute_force(price, growth, budget, cap)
+    assert planner.series_cost(price, growth, n) <= Big(budget)
+
+
+def test_huge_budgets_stay_finite():
+    n = planner.max_affordable(100, 1.15, Big(1, 300))
+    assert 0 < n < 10 ** 4
+    assert planner.series_cost(100, 1.15, n) <= Big(1, 300)
+
+
+def test_buy_max_toggle_redraws_the_generators(capsys, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    monkeypatch.setattr(state, 'game_state', 'generators')
+    monkeypatch.setattr(state, 'buy_max_mode', False)
+    actions.toggle_buy_max()
+    assert state.buy_max_mode
+    assert 'Buy max: ON' in capsys.readouterr().out
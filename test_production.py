@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+import production
+import state
+from bignum import Big
+
+GENS = [
+    {'key': '1', 'id': 'a', 'name': 'A', 'cost': 10, 'type': 'clicks', 'rate': 0.5, 'count': 3},
+    {'key': '2', 'id': 'b', 'name': 'B', 'cost': 50, 'type': 'income', 'rate': 4, 'count': 30, 'synergy': 0.01},
+    {'key': '3', 'id': 'c', 'name': 'C', 'cost': 90, 'type': 'income', 'rate': 30, 'count': 2, 'synergy': 0.5},
+]
+
+
+@pytest.fixture
+def gens(monkeypatch):
+    monkeypatch.setattr(state, 'idle_generators', [dict(g) for g in GENS])
+    monkeypatch.setattr(state, 'GENERATOR_MILESTONE', 25)
+    monkeypatch.setattr(state, 'per_click', Big(2))
+    production.invalidate()
+    yield state.idle_generators
+    production.invalidate()
+
+
+def test_rates_are_exact_for_ordinary_counts(gens):
+    clicks, income = production.rates()
+    # A: 3 * 0.5 * (1 + 0.01 * 30); B: 30 * 4 * 2 (one milestone) * (1 + 0.5 * 2); C: 2 * 30
+    assert clicks == Big(3 * 0.5 * 1.3)
+    assert income == Big(30 * 4 * 2 * 2.0 + 60)
+    assert production.income_rate() == Big(3 * 0.5 * 1.3 * 2 + 540)
+
+
+def _close(a, b):
+    return a.log10() == pytest.approx(b.log10(), rel=1e-12) if a and b else a == b
+
+
+@pytest.fixture
+def vectorised(gens, monkeypatch):
+    if not production._numpy():
+        pytest.skip('numpy not installed')
+    monkeypatch.setattr(production, 'NUMPY_MIN_TIERS', 0)
+    production.invalidate()
+    return gens
+
+
+def test_both_paths_agree(vectorised):
+    for count in (3, 10 ** 6):
+        vectorised[1]['count'] = count
+        vec = production._compute_numpy(production._build_arrays(vectorised))
+        py = production._compute_python(vectorised)
+        assert _close(vec[0], py[0]) and _close(vec[1], py[1])
+        assert all(_close(vec[2](i), py[2](i)) for i in range(len(vectorised)))
+
+
+def test_a_purchase_updates_the_arrays_in_place(vectorised):
+    production.rates()
+    arrays = production._arrays
+    vectorised[2]['count'] = 7
+    production.update_count(2)
+    _, income = production.rates()
+    assert production._arrays is arrays
+    # B: 30 * 4 * 2 * (1 + 0.5 * 7); C: 7 * 30
+    assert income == Big(30 * 4 * 2 * 4.5 + 210)
+
+
+@pytest.mark.parametrize('tiers', [0, production.NUMPY_MIN_TIERS])
+def test_huge_counts_stay_finite(gens, monkeypatch, tiers):
+    monkeypatch.setattr(production, 'NUMPY_MIN_TIERS', tiers)
+    gens[1]['count'] = 10 ** 6          # 40000 milestone doublings
+    production.invalidate()
+    _, income = production.rates()
+    expected_log10 = math.log10(10 ** 6 * 4 * 2.0) + 40000 * math.log10(2)
+    assert income.log10() == pytest.approx(expected_log10)
+    assert production.generator_output(1) > Big(1, 12000)
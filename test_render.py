@@ -0,0 +1,71 @@
+import pytest
+
+import render
+import state
+
+
+@pytest.fixture
+def screen(capsys, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    return capsys
+
+
+@pytest.fixture
+def room(monkeypatch):
+    grid = [[state.FLOOR_CHAR] * state.ROOM_WIDTH for _ in range(state.ROOM_HEIGHT)]
+    monkeypatch.setattr(state, 'rooms', [{'map': grid}])
+    monkeypatch.setattr(state, 'current_room_index', 0)
+    monkeypatch.setattr(state, 'current_map', grid)
+    monkeypatch.setattr(state, 'enemies', {(2, 3): {'name': 'x'}, (4, 4): {'name': 'y', 'is_boss': True}})
+    monkeypatch.setattr(state, 'TELEPORTS', {(6, 6): 'shop'})
+    monkeypatch.setattr(state, 'player_y', 1)
+    monkeypatch.setattr(state, 'player_x', 1)
+    monkeypatch.setattr(state, 'PLAYER_CHAR', '@')
+    monkeypatch.setattr(state, 'game_state', 'explore')
+    return grid
+
+
+def test_render_map_marks_player_enemies_and_teleports(screen, room):
+    render.render_map()
+    lines = screen.readouterr().out.splitlines()
+    grid = lines[1:1 + state.ROOM_HEIGHT]
+    assert grid[1][1] == '@'
+    assert grid[2][3] == render.ENEMY_CHAR
+    assert grid[4][4] == render.BOSS_CHAR
+    assert grid[6][6] == 'S'
+    # the live room grid itself is not drawn on
+    assert room[1][1] == state.FLOOR_CHAR
+
+
+def test_screens_draw_only_in_their_own_state(screen, room):
+    render.display_shop()
+    render.display_inventory()
+    assert screen.readouterr().out == ''
+
+
+@pytest.mark.parametrize('switch', ['switch_to_map', 'switch_to_menu', 'switch_to_incremental', 'switch_to_generators'])
+def test_hotkeys_wait_for_a_slot_on_the_start_menu(screen, monkeypatch, switch):
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    getattr(render, switch)()
+    assert state.game_state == 'start_menu'
+
+
+def test_first_switch_to_the_map_builds_a_floor(screen, monkeypatch):
+    for name in ('current_room_index', 'enemies', 'TELEPORTS', 'EXITS'):
+        monkeypatch.setattr(state, name, getattr(state, name))
+    monkeypatch.setattr(state, 'rooms', [])
+    monkeypatch.setattr(state, 'current_map', [[state.FLOOR_CHAR] * state.ROOM_WIDTH for _ in range(state.ROOM_HEIGHT)])
+    monkeypatch.setattr(state, 'game_state', 'menu')
+    render.switch_to_map()
+    assert len(state.rooms) == 5
+    assert state.current_map is state.rooms[state.current_room_index]['map']
+
+
+def test_item_art_is_centred(screen, monkeypatch):
+    art = ' /\\\n/__\\'
+    monkeypatch.setattr(state, 'game_state', 'inventory')
+    monkeypatch.setattr(state, 'inventory', [{'name': 'Tent', 'type': 'bag', 'ascii': art}])
+    render.display_inventory()
+    lines = screen.readouterr().out.splitlines()
+    pad = ' ' * ((render.ART_WIDTH - 4) // 2)
+    assert pad + ' /\\' in lines and pad + '/__\\' in lines
@@ -0,0 +1,50 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+import persistence
+import state
+from bignum import Big
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    """runtime imported against a fake keyboard whose hook presses Esc straight away."""
+    fake = types.ModuleType('keyboard')
+    fake.KEY_DOWN, fake.KEY_UP = 'down', 'up'
+    fake.hook = lambda cb: cb(types.SimpleNamespace(name='esc', event_type='down')) or cb
+    fake.unhook = lambda hook: None
+    monkeypatch.setitem(sys.modules, 'keyboard', fake)
+    monkeypatch.delitem(sys.modules, 'runtime', raising=False)
+    import runtime
+    monkeypatch.setattr(state, 'SHM_EXPORT', None)
+    return runtime
+
+
+def _files(save_dir):
+    return {p.name: p.read_bytes() for p in save_dir.iterdir() if p.is_file()}
+
+
+def test_quitting_from_the_start_menu_leaves_saves_alone(runtime, save_dir, monkeypatch):
+    persistence.reset_game()
+    state.count = Big(42)
+    persistence.save_game()
+    persistence.compact_save()
+    before = _files(save_dir)
+    # a fresh start: defaults in memory, nothing picked yet
+    persistence.reset_game()
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    asyncio.run(runtime.Runtime({}).main())
+    assert _files(save_dir) == before
+
+
+def test_quitting_a_game_flushes_it(runtime, save_dir, monkeypatch):
+    persistence.reset_game()
+    monkeypatch.setattr(state, 'game_state', 'menu')
+    state.count = Big(7)
+    asyncio.run(runtime.Runtime({}).main())
+    state.count = Big(0)
+    assert persistence.load_game(), persistence.last_load_error
+    assert state.count == Big(7)
@@ -0,0 +1,74 @@
+import pytest
+
+import savefmt
+from bignum import Big
+
+SAVE = {
+    'count': [1.5, 20],
+    'per_click': [3.0, 0],
+    'current_room_index': 2,
+    'player_x': 10,
+    'player_y': 4,
+    'player_hp': -3,
+    'player_max_hp': 20,
+    'map_visit_count': 1,
+    'upgrades': {'1': True, '2': False},
+    'shop': {'1': False},
+    'attack': 5,
+    'defense': 0,
+    'has_bag': True,
+    'inventory': [{'name': 'Sword', 'type': 'weapon', 'level': 1, 'ascii': ' /|\\'}] * 3,
+    'equipped_accessory': None,
+    'action_upgrades': {'execute_power': 2},
+    'equipped_weapon': {'name': 'Sword', 'level': 1},
+    'equipped_armour': None,
+    'meta_currency': 4,
+    'meta_upgrades': {'unlock_tier1': True},
+    'meta_start_per_click': 1,
+    'meta_start_attack': 0,
+    'inventory_capacity': 10,
+    'journal_seq': 7,
+    'play_time': 12.5,
+    'idle_generators': {'auto_clicker': 3},
+    'last_seen': 1700000000,
+    'run_max_count': [2.0, 0],
+}
+
+
+def test_binary_round_trip():
+    raw = savefmt.encode(SAVE)
+    assert raw.startswith(savefmt.MAGIC)
+    assert savefmt.decode(raw) == SAVE
+
+
+def test_repeated_strings_are_stored_once():
+    raw = savefmt.encode(SAVE)
+    assert raw.count(b'Sword') == 1
+
+
+def test_loads_detects_both_formats():
+    binary = savefmt.loads(savefmt.dumps(SAVE, 'binary'))
+    from_json = savefmt.loads(savefmt.dumps(SAVE, 'json'))
+    assert binary == from_json
+    assert binary['count'] == Big(1.5, 20)
+    assert from_json['count'] == Big(1.5, 20)
+
+
+def test_older_versions_still_decode():
+    # version 1 stored currency as a plain number
+    raw = savefmt.encode(dict(SAVE, count=150, per_click=2), version=1)
+    s = savefmt.coerce(savefmt.decode(raw))
+    assert s['count'] == Big(150)
+    assert 'play_time' not in s
+
+
+@pytest.mark.parametrize('raw', [
+    b'CPTS',
+    savefmt.encode(SAVE)[:-3],
+    b'CPTS\x63',
+    b'{"count": ',
+    b'[1, 2]',
+])
+def test_bad_saves_raise_save_format_error(raw):
+    with pytest.raises(savefmt.SaveFormatError):
+        savefmt.loads(raw)
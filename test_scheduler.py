@@ -0,0 +1,53 @@
+import scheduler
+
+
+def _wheel():
+    # one tick per second, starting at wall time 0
+    return scheduler.TimingWheel(tick=1.0, start=0.0)
+
+
+def test_after_fires_once_on_its_tick():
+    wheel, fired = _wheel(), []
+    wheel.after(3, fired.append, 'a')
+    assert wheel.advance(2) == 0
+    assert wheel.advance(3) == 1
+    wheel.advance(10)
+    assert fired == ['a'] and wheel.pending == 0
+
+
+def test_every_repeats_until_cancelled():
+    wheel, fired = _wheel(), []
+    timer = wheel.every(2, fired.append, 'x')
+    wheel.advance(6)
+    assert len(fired) == 3
+    wheel.cancel(timer)
+    wheel.advance(12)
+    assert len(fired) == 3 and wheel.pending == 0
+
+
+def test_timers_cascade_from_coarser_wheels():
+    wheel, fired = _wheel(), []
+    for delay in (70, scheduler.SLOTS ** 2 + 5):
+        wheel.after(delay, fired.append, delay)
+    wheel.advance(69)
+    assert fired == []
+    wheel.advance(70)
+    assert fired == [70]
+    while wheel.now < scheduler.SLOTS ** 2 + 5:   # more than one advance() can catch up
+        wheel.advance(scheduler.SLOTS ** 2 + 5)
+    assert fired == [70, scheduler.SLOTS ** 2 + 5]
+
+
+def test_catch_up_is_bounded_after_a_stall():
+    wheel, fired = _wheel(), []
+    wheel.every(1, fired.append, 1)
+    wheel.advance(scheduler.MAX_CATCH_UP * 3)
+    assert len(fired) == scheduler.MAX_CATCH_UP
+
+
+def test_a_failing_timer_does_not_stop_the_others(save_dir):
+    wheel, fired = _wheel(), []
+    wheel.after(1, lambda: 1 / 0)
+    wheel.after(1, fired.append, 'ok')
+    assert wheel.advance(1) == 2
+    assert fired == ['ok']
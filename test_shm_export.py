@@ -0,0 +1,53 @@
+import os
+from multiprocessing import shared_memory
+
+import pytest
+
+import persistence
+import shm_export
+import state
+
+
+@pytest.fixture
+def name():
+    return f'cpt_test_{os.getpid()}'
+
+
+def test_reader_sees_what_was_published(save_dir, name):
+    persistence.reset_game()
+    exporter = shm_export.Exporter(name)
+    try:
+        state.player_hp = 13
+        exporter.publish()
+        reader = shm_export.Reader(name)
+        try:
+            snap = reader.read()
+        finally:
+            reader.close()
+    finally:
+        exporter.close()
+    assert snap['hp'] == 13 and snap['seq'] == 2
+    assert snap['count'] == state.count
+    assert snap['tiles'] == shm_export.encode_tiles(state.current_map)
+
+
+def test_a_stale_segment_is_replaced(save_dir, name):
+    persistence.reset_game()
+    stale = shared_memory.SharedMemory(name=name, create=True, size=16)
+    stale.close()
+    exporter = shm_export.Exporter(name)
+    try:
+        exporter.publish()
+        assert exporter.shm.size >= shm_export.SIZE
+    finally:
+        exporter.close()
+
+
+def test_reader_rejects_other_blocks(name):
+    other = shared_memory.SharedMemory(name=name, create=True, size=shm_export.SIZE)
+    try:
+        with pytest.raises(ValueError):
+            shm_export.Reader(name)
+    finally:
+        other.close()
+        other.unlink()
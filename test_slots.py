@@ -0,0 +1,63 @@
+import os
+
+import actions
+import persistence
+import render
+import state
+from bignum import Big
+
+
+def test_slots_save_to_their_own_files(save_dir):
+    persistence.reset_game()
+    for slot, count in ((1, 10), (2, 20)):
+        persistence.select_slot(slot)
+        state.count = Big(count)
+        state.map_visit_count = slot
+        persistence.save_game()
+    assert os.path.exists(persistence.slot_path(1)) and os.path.exists(persistence.slot_path(2))
+    slots = persistence.list_slots()
+    assert slots[1]['floor'] == 1 and slots[2]['floor'] == 2
+    assert Big.from_json(slots[2]['count']) == Big(20)
+    assert slots[3] is None
+
+
+def test_compaction_refreshes_the_slot_summary(save_dir):
+    persistence.reset_game()
+    persistence.save_game()
+    state.map_visit_count = 4
+    persistence.compact_save()
+    assert persistence.list_slots()[1]['floor'] == 4
+
+
+def test_nothing_to_save_on_quit_from_the_start_menu(save_dir, monkeypatch):
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    assert persistence.prepare_final_save() is None
+    monkeypatch.setattr(state, 'game_state', 'menu')
+    assert persistence.prepare_final_save() is not None
+
+
+def test_failed_load_stays_on_the_start_menu(save_dir, monkeypatch):
+    monkeypatch.setattr(render, 'clear', lambda: None)
+    monkeypatch.setattr(state, 'game_state', 'start_menu')
+    with open(state.SAVE_FILE, 'wb') as f:
+        f.write(b'{"count": ')
+    actions.select_slot_from_menu('1')
+    assert state.game_state == 'start_menu'
+    assert persistence.last_load_error
+    with open(state.SAVE_FILE, 'rb') as f:
+        assert f.read() == b'{"count": '
+
+
+def test_switching_slots_restarts_the_journal_sequence(save_dir):
+    persistence.reset_game()
+    for n in range(5):
+        state.count = Big(n)
+        persistence.save_game()
+    with open(os.path.splitext(persistence.slot_path(3))[0] + '.journal', 'w') as f:
+        f.write('{"count": [1.0, 0], "journal_seq": 2}\n')   # stale records in slot 3
+    persistence.select_slot(2)
+    persistence.save_game()
+    assert persistence._read_snapshot(persistence.slot_path(2))['journal_seq'] == 1
+    persistence.select_slot(3)
+    persistence.save_game()
+    assert persistence._read_snapshot(persistence.slot_path(3))['journal_seq'] == 3
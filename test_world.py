@@ -0,0 +1,51 @@
+import os
+import random
+
+import persistence
+import state
+import world
+
+
+def _floor(visits=0):
+    random.seed(3)
+    return state.create_rooms(5, visits=visits)
+
+
+def test_room_round_trip():
+    for room in _floor(2):
+        decoded = world.decode_room(world.encode_room(room))
+        assert decoded['map'] == room['map']
+        assert decoded['enemies'] == room['enemies']
+        assert decoded['teleport'] == room['teleport']
+        assert decoded['exits'] == room['exits']
+        assert decoded['fountain'] == room['fountain']
+
+
+def test_world_file_decodes_rooms_on_demand(tmp_path):
+    rooms = _floor()
+    path = tmp_path / 'floor.world'
+    path.write_bytes(world.encode_world(rooms))
+    lazy = world.open_world(str(path))
+    try:
+        assert len(lazy) == len(rooms)
+        assert list.__getitem__(lazy, 3) is None
+        assert lazy[3]['map'] == rooms[3]['map']
+        assert list.__getitem__(lazy, 0) is None
+    finally:
+        lazy.detach()
+
+
+def test_save_without_world_file_loads_into_a_generated_floor(save_dir):
+    persistence.reset_game()
+    state.map_visit_count = 2
+    persistence.save_game()
+    os.remove(world.world_path())
+    # as after a restart: nothing generated yet
+    state.rooms = []
+    state.current_map = [[state.FLOOR_CHAR] * state.ROOM_WIDTH for _ in range(state.ROOM_HEIGHT)]
+    state.map_visit_count = 0
+    assert persistence.load_game(), persistence.last_load_error
+    assert len(state.rooms) == 5
+    assert state.map_visit_count == 2
+    assert state.current_map is state.rooms[state.current_room_index]['map']
+    assert state.current_map[0][1] == state.H_WALL_CHAR
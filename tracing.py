@@ -0,0 +1,186 @@
+# tracing.py
+# Event tracing for finding hitches (floor changes, saves, screens). Off by default.
+# enable() wraps the functions listed in INSTRUMENTED in place and disable() puts the
+# originals back, so with tracing off those paths run exactly the original code; the
+# explicit span() / swallowed() calls left in the game cost one flag check.
+#
+# Events go into a ring buffer of CAPACITY slots allocated up front (the oldest are
+# overwritten) and export() writes them as Chrome trace-event JSON, which
+# chrome://tracing and https://ui.perfetto.dev open directly.
+#
+# The game's best-effort `except Exception` blocks call swallowed(where): while tracing,
+# that records an instant event with the exception type, message and innermost frames,
+# instead of the error vanishing.
+import functools
+import importlib
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+CAPACITY = 1 << 16
+# frames of traceback kept on a swallowed-exception event
+EXC_FRAMES = 4
+
+# module -> (category, names); '*' means every function defined in that module
+INSTRUMENTED = {
+    'actions': ('actions', '*'),
+    'render': ('render', '*'),
+    'state': ('generation', ('create_room', 'create_rooms', 'create_map', 'create_enemy_instance',
+                             'load_room', 'sync_room')),
+    'world': ('persistence', ('prepare_world', 'write_world', 'pack_rooms')),
+    'persistence': ('persistence', ('save_game', 'load_game', 'prepare_save', 'write_save',
+                                    'compact_save', 'reset_game', 'reset_run')),
+    'loops': ('tick', ('tick',)),
+}
+
+ENABLED = False
+_ring = []
+_seq = itertools.count()
+_t0 = 0
+_patched = []     # (module, name, original)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'cat', 'args', 'start')
+
+    def __init__(self, name, cat, args):
+        self.name, self.cat, self.args = name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _record('X', self.name, self.cat, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+def _record(ph, name, cat, start_ns, dur_ns, args):
+    ring = _ring
+    if ring:
+        # itertools.count hands out slots atomically, so threads never share one
+        seq = next(_seq)
+        ring[seq % len(ring)] = (seq, ph, name, cat, start_ns, dur_ns, threading.get_ident(), args)
+
+
+def span(name: str, cat: str = 'game', **args):
+    """Context manager timing a block; a shared no-op while tracing is off."""
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, cat, args or None)
+
+
+def instant(name: str, cat: str = 'game', **args):
+    if ENABLED:
+        _record('i', name, cat, time.perf_counter_ns(), 0, args or None)
+
+
+def swallowed(where: str):
+    """Call from an `except` block that carries on: records the exception being handled."""
+    if not ENABLED:
+        return
+    exc = sys.exc_info()[1]
+    if exc is None:
+        return
+    import traceback
+    frames = traceback.extract_tb(exc.__traceback__)[-EXC_FRAMES:]
+    _record('i', f'swallowed {type(exc).__name__}', 'exception', time.perf_counter_ns(), 0, {
+        'where': where,
+        'type': type(exc).__name__,
+        'message': str(exc),
+        'frames': [f'{os.path.basename(f.filename)}:{f.lineno} {f.name}' for f in frames],
+    })
+
+
+def _wrap(fn, name, cat):
+    @functools.wraps(fn)
+    def traced(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _record('X', name, cat, start, time.perf_counter_ns() - start, None)
+    traced.__traced__ = fn
+    return traced
+
+
+def _targets(module, names):
+    if names != '*':
+        return [n for n in names if callable(getattr(module, n, None))]
+    return [n for n, v in vars(module).items()
+            if isinstance(v, type(_wrap)) and v.__module__ == module.__name__]
+
+
+def enable(capacity: int = CAPACITY, modules: dict = None):
+    """Start recording into a fresh ring buffer and instrument INSTRUMENTED."""
+    global ENABLED, _ring, _seq, _t0
+    disable()
+    _ring = [None] * max(1, capacity)
+    _seq = itertools.count()
+    _t0 = time.perf_counter_ns()
+    for mod_name, (cat, names) in (INSTRUMENTED if modules is None else modules).items():
+        try:
+            module = importlib.import_module(mod_name)
+        except ImportError:
+            continue
+        for n in _targets(module, names):
+            original = getattr(module, n)
+            _patched.append((module, n, original))
+            setattr(module, n, _wrap(original, f'{mod_name}.{n}', cat))
+    ENABLED = True
+
+
+def disable():
+    """Stop recording and restore the original functions (events are kept for export)."""
+    global ENABLED
+    ENABLED = False
+    while _patched:
+        module, n, original = _patched.pop()
+        setattr(module, n, original)
+
+
+def events() -> list:
+    """Recorded events (seq, ph, name, cat, start_ns, dur_ns, tid, args), oldest first."""
+    return sorted(e for e in _ring if e is not None)
+
+
+def export(path: str = None) -> dict:
+    """Chrome trace-event JSON for the recorded events; written to `path` if given."""
+    pid = os.getpid()
+    trace = [{'ph': 'M', 'name': 'process_name', 'pid': pid, 'tid': 0, 'args': {'name': 'game'}}]
+    recorded = events()
+    for tid in {e[6] for e in recorded}:
+        name = next((t.name for t in threading.enumerate() if t.ident == tid), str(tid))
+        trace.append({'ph': 'M', 'name': 'thread_name', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+    for _, ph, name, cat, start, dur, tid, args in recorded:
+        ev = {'ph': ph, 'name': name, 'cat': cat, 'ts': (start - _t0) / 1000, 'pid': pid, 'tid': tid}
+        if ph == 'X':
+            ev['dur'] = dur / 1000
+        else:
+            ev['s'] = 't'
+        if args:
+            ev['args'] = args
+        trace.append(ev)
+    doc = {'traceEvents': trace, 'displayTimeUnit': 'ms'}
+    if path:
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, default=repr)
+        os.replace(tmp, path)
+    return doc
@@ -0,0 +1,270 @@
+# world.py
+# Compact on-disk world: every room of the current floor is stored as a run-length
+# encoded tile grid plus an entity table (enemies, teleports, exits, fountain).
+#
+# File layout:  MAGIC | version | room count | offset table | room records
+# The offset table is fixed-width so the file can be memory-mapped and a single room
+# decoded on demand (see LazyRooms) without touching the other floors' bytes.
+import mmap
+import os
+import struct
+import state
+import savefmt
+
+MAGIC = b'CPTW'
+FORMAT_VERSION = 1
+
+# fixed tile codes; characters outside this table go to a per-room palette
+TILES = ['.', '│', '─', '^', 'T', '≈', '*', '!', 'H', 'U', ' ']
+TILE_CODES = {ch: i for i, ch in enumerate(TILES)}
+
+_HEADER = struct.Struct('<4sBI')
+_OFFSET = struct.Struct('<II')
+
+# bytes of the last world file written, so unchanged worlds are not rewritten
+_last_written = None
+
+
+def world_path():
+    """World file living next to the current save file."""
+    return os.path.splitext(state.SAVE_FILE)[0] + '.world'
+
+
+# --- rooms <-> bytes ---
+
+def encode_room(room: dict) -> bytes:
+    grid = room.get('map', [])
+    height = len(grid)
+    width = len(grid[0]) if height else 0
+    palette = []
+    extra = {}
+    runs = bytearray()
+    nruns = 0
+    prev = None
+    length = 0
+    for row in grid:
+        for ch in row:
+            code = TILE_CODES.get(ch)
+            if code is None:
+                code = extra.get(ch)
+                if code is None:
+                    code = extra[ch] = len(TILES) + len(palette)
+                    palette.append(ch)
+            if code == prev:
+                length += 1
+                continue
+            if prev is not None:
+                runs.append(prev)
+                savefmt.put_uvarint(runs, length)
+                nruns += 1
+            prev = code
+            length = 1
+    if prev is not None:
+        runs.append(prev)
+        savefmt.put_uvarint(runs, length)
+        nruns += 1
+    entities = {
+        'enemies': [[y, x, e] for (y, x), e in room.get('enemies', {}).items()],
+        'teleport': [[y, x, t] for (y, x), t in room.get('teleport', {}).items()],
+        'exits': [[y, x, d] for (y, x), d in room.get('exits', {}).items()],
+        'fountain': list(room['fountain']) if room.get('fountain') else None,
+    }
+    out = bytearray()
+    savefmt.put_uvarint(out, height)
+    savefmt.put_uvarint(out, width)
+    savefmt.put_strings(out, palette)
+    savefmt.put_uvarint(out, nruns)
+    out += runs
+    out += savefmt.encode_value(entities)
+    return bytes(out)
+
+
+def decode_room(data) -> dict:
+    height, pos = savefmt.get_uvarint(data, 0)
+    width, pos = savefmt.get_uvarint(data, pos)
+    palette, pos = savefmt.get_strings(data, pos)
+    chars = TILES + palette
+    nruns, pos = savefmt.get_uvarint(data, pos)
+    flat = []
+    for _ in range(nruns):
+        code = data[pos]
+        length, pos = savefmt.get_uvarint(data, pos + 1)
+        try:
+            flat.extend(chars[code] * length)
+        except IndexError:
+            raise savefmt.SaveFormatError(f'bad tile code {code}') from None
+    if len(flat) != height * width:
+        raise savefmt.SaveFormatError('room grid size mismatch')
+    entities = savefmt.decode_value(bytes(data[pos:]))
+    return {
+        'map': [flat[y * width:(y + 1) * width] for y in range(height)],
+        'enemies': {(y, x): e for y, x, e in entities.get('enemies', [])},
+        'teleport': {(y, x): t for y, x, t in entities.get('teleport', [])},
+        'exits': {(y, x): d for y, x, d in entities.get('exits', [])},
+        'fountain': tuple(entities['fountain']) if entities.get('fountain') else None,
+    }
+
+
+class LazyRooms(list):
+    """A rooms list whose entries are decoded from the world file on first access.
+
+    Behaves like the plain list `create_rooms` returns, so `len(state.rooms)` and
+    `state.rooms[idx]` keep working everywhere.
+    """
+
+    def __init__(self, records, source=None, view=None):
+        super().__init__([None] * len(records))
+        self._records = list(records)
+        self._source = source
+        self._view = view
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        room = super().__getitem__(idx)
+        if room is None:
+            room = decode_room(self._records[idx])
+            super().__setitem__(idx, room)
+        return room
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def record(self, idx):
+        """Encoded bytes for room `idx`, re-encoded only if it has been decoded."""
+        room = super().__getitem__(idx)
+        if room is None:
+            return bytes(self._records[idx])
+        return encode_room(room)
+
+    def detach(self):
+        """Copy still-undecoded records out of the mapped file and close it."""
+        for i, rec in enumerate(self._records):
+            if isinstance(rec, memoryview):
+                self._records[i] = bytes(rec) if super().__getitem__(i) is None else b''
+                rec.release()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._source is not None:
+            try:
+                self._source.close()
+            except (BufferError, ValueError):
+                pass
+            self._source = None
+
+
+def pack_rooms(rooms, keep=()) -> LazyRooms:
+    """Re-encode `rooms` into an in-memory LazyRooms, leaving the indices in `keep`
+    decoded (the same objects). Packed rooms are decoded again on first access."""
+    records = []
+    for i in range(len(rooms)):
+        if i in keep:
+            records.append(b'')
+        elif isinstance(rooms, LazyRooms):
+            records.append(rooms.record(i))
+        else:
+            records.append(encode_room(rooms[i]))
+    packed = LazyRooms(records)
+    for i in keep:
+        list.__setitem__(packed, i, rooms[i])
+    return packed
+
+
+def encode_world(rooms) -> bytes:
+    if isinstance(rooms, LazyRooms):
+        records = [rooms.record(i) for i in range(len(rooms))]
+    else:
+        records = [encode_room(r) for r in rooms]
+    out = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION, len(records)))
+    offset = len(out) + _OFFSET.size * len(records)
+    for rec in records:
+        out += _OFFSET.pack(offset, len(rec))
+        offset += len(rec)
+    for rec in records:
+        out += rec
+    return bytes(out)
+
+
+def open_world(path):
+    """Map a world file and return a LazyRooms over it (nothing decoded yet)."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < _HEADER.size:
+            raise savefmt.SaveFormatError('truncated world file')
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count = _HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        mm.close()
+        raise savefmt.SaveFormatError('not a world file')
+    view = memoryview(mm)
+    records = []
+    for i in range(count):
+        offset, length = _OFFSET.unpack_from(mm, _HEADER.size + i * _OFFSET.size)
+        if offset + length > size:
+            for rec in records:
+                rec.release()
+            view.release()
+            mm.close()
+            raise savefmt.SaveFormatError('truncated world file')
+        records.append(view[offset:offset + length])
+    return LazyRooms(records, source=mm, view=view)
+
+
+# --- persistence hooks ---
+
+def prepare_world():
+    """Encode the current floor for write_world; None when unchanged since the last write.
+
+    Touches live state, so call it from the game thread; write_world can run elsewhere.
+    """
+    rooms = getattr(state, 'rooms', None)
+    if not rooms:
+        return None
+    state.sync_room()
+    raw = encode_world(rooms)
+    if raw == _last_written:
+        return None
+    if isinstance(rooms, LazyRooms):
+        # release the mapping before replacing the file underneath it
+        rooms.detach()
+    return raw
+
+
+def write_world(raw):
+    """Write bytes from prepare_world to the world file."""
+    global _last_written
+    if raw is None:
+        return
+    path = world_path()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+    os.replace(tmp_path, path)
+    _last_written = raw
+
+
+def save_world():
+    """Write the current floor to the world file (skipped when nothing changed)."""
+    write_world(prepare_world())
+
+
+def reset():
+    """Forget the last written world (e.g. after switching save slot)."""
+    global _last_written
+    _last_written = None
+
+
+def load_world():
+    """Install the saved floor as `state.rooms`, decoding rooms lazily. Returns True if found."""
+    global _last_written
+    path = world_path()
+    if not os.path.exists(path):
+        return False
+    old = getattr(state, 'rooms', None)
+    if isinstance(old, LazyRooms):
+        old.detach()
+    state.rooms = open_world(path)
+    _last_written = None
+    return True